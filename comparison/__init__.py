@@ -0,0 +1,3 @@
+"""
+Supporting modules for create_competitor_comparison.py.
+"""
@@ -0,0 +1,288 @@
+"""
+Workbook writers the sheet renderer draws through.
+
+The renderer only needs a handful of operations per sheet: set column
+widths and row heights, freeze panes, append a row of (value, style
+name) cells, merge a range, add a conditional format and define a
+workbook name. Each backend implements them on top of one library:
+
+- "openpyxl": openpyxl workbooks, in standard or write-only mode, with
+  the shared styles registered as NamedStyles.
+- "xlsxwriter": XlsxWriter in constant_memory mode, which streams each
+  row to a temp file as soon as the next one starts. Named styles become
+  cached XlsxWriter formats. XlsxWriter is imported only when used.
+
+Both accept a file name or a binary file object as the target, so a
+workbook can be built straight into a BytesIO without touching disk.
+
+Rows are written in order and a row's height must be set before it is
+appended; that is what write-only and constant-memory mode require, and
+the renderer always works that way.
+"""
+
+import os
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import NamedStyle
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.workbook.defined_name import DefinedName
+
+from comparison.manifest import BACKENDS
+from comparison.parallel_save import parallel_save
+from comparison.profiling import phase
+
+
+def open_workbook(backend, target, styles, write_only=False, save_workers=None):
+    """
+    A workbook writer for target (a path or binary file object) using the
+    named backend. styles maps style names to openpyxl NamedStyles; cells
+    refer to them by name. write_only and save_workers (processes that
+    serialize the sheets, see comparison.parallel_save) only apply to
+    openpyxl.
+    """
+    if backend == "openpyxl":
+        return OpenpyxlWorkbook(target, styles, write_only, save_workers)
+    if backend == "xlsxwriter":
+        return XlsxWriterWorkbook(target, styles)
+    raise ValueError(f"Unknown backend {backend!r} (expected one of: {', '.join(BACKENDS)})")
+
+
+def is_path(target):
+    return isinstance(target, (str, os.PathLike))
+
+
+def sheet_writer(sheet, styles):
+    """sheet itself if it is already a sheet writer, else a writer for the openpyxl worksheet sheet"""
+    return sheet if isinstance(sheet, (OpenpyxlSheet, XlsxWriterSheet)) else OpenpyxlSheet(sheet, styles)
+
+
+# ---------------------------------------------------------------------------
+# openpyxl
+# ---------------------------------------------------------------------------
+
+def register_styles(wb, styles):
+    """Add named styles to an openpyxl workbook (each workbook gets its own copies)"""
+    for style in styles.values():
+        if style.name not in wb.named_styles:
+            # copy() would drop number_format, so rebuild from the parts
+            wb.add_named_style(NamedStyle(
+                name=style.name,
+                font=style.font,
+                fill=style.fill,
+                border=style.border,
+                alignment=style.alignment,
+                number_format=style.number_format,
+                protection=style.protection
+            ))
+
+
+class OpenpyxlWorkbook:
+    def __init__(self, target, styles, write_only=False, save_workers=None):
+        self.target = target
+        self.styles = styles
+        self.save_workers = save_workers
+        self.wb = Workbook(write_only=write_only)
+
+        # Remove default sheet (write-only workbooks start without one)
+        if not write_only:
+            self.wb.remove(self.wb.active)
+
+        with phase("styles"):
+            register_styles(self.wb, styles)
+
+    def add_sheet(self, title):
+        return OpenpyxlSheet(self.wb.create_sheet(title), self.styles)
+
+    def close(self):
+        if self.save_workers:
+            parallel_save(self.wb, self.target, self.save_workers)
+        else:
+            self.wb.save(self.target)
+
+
+class OpenpyxlSheet:
+    """Renderer operations on an openpyxl worksheet (normal or write-only)"""
+
+    def __init__(self, ws, styles):
+        self.ws = ws
+        self.styles = styles
+
+    @property
+    def title(self):
+        return self.ws.title
+
+    def set_width(self, col, width):
+        self.ws.column_dimensions[get_column_letter(col)].width = width
+
+    def set_height(self, row, height):
+        self.ws.row_dimensions[row].height = height
+
+    def freeze(self, ref):
+        self.ws.freeze_panes = ref
+
+    def append(self, cells):
+        """Append a row of (value, style name) cells"""
+        row = []
+        for value, style in cells:
+            cell = WriteOnlyCell(self.ws, value=value)
+            with phase("styles"):
+                cell.style = style
+            row.append(cell)
+        self.ws.append(row)
+
+    def merge(self, ref):
+        # Write-only sheets just record the range
+        if hasattr(self.ws, "merge_cells"):
+            self.ws.merge_cells(ref)
+        else:
+            self.ws.merged_cells.add(ref)
+
+    def conditional_format(self, ref, formula, style):
+        style = self.styles[style]
+        self.ws.conditional_formatting.add(ref, FormulaRule(formula=[formula], font=style.font, fill=style.fill))
+
+    def define_name(self, name, ref):
+        self.ws.parent.defined_names.add(DefinedName(name, attr_text=ref))
+
+
+# ---------------------------------------------------------------------------
+# XlsxWriter
+# ---------------------------------------------------------------------------
+
+def _color(color):
+    return "#" + color.rgb[-6:] if color is not None and isinstance(color.rgb, str) else None
+
+
+def _alignment_properties(alignment):
+    properties = {}
+    if alignment.horizontal:
+        properties["align"] = alignment.horizontal
+    if alignment.vertical:
+        properties["valign"] = "vcenter" if alignment.vertical == "center" else alignment.vertical
+    if alignment.wrap_text:
+        properties["text_wrap"] = True
+    return properties
+
+
+BORDER_STYLES = {"thin": 1, "medium": 2, "dashed": 3, "dotted": 4, "thick": 5, "double": 6, "hair": 7}
+
+
+def xlsxwriter_properties(style, differential=False):
+    """
+    XlsxWriter format properties for an openpyxl NamedStyle. With
+    differential=True only the font and fill are kept, as conditional
+    formats need.
+    """
+    font = style.font
+    properties = {}
+    if font.b:
+        properties["bold"] = True
+    if font.i:
+        properties["italic"] = True
+    if _color(font.color):
+        properties["font_color"] = _color(font.color)
+    if style.fill.fill_type == "solid":
+        properties["bg_color"] = _color(style.fill.fgColor)
+        if not differential:
+            properties["pattern"] = 1
+    if differential:
+        return properties
+
+    if font.sz:
+        properties["font_size"] = font.sz
+    if font.name:
+        properties["font_name"] = font.name
+    properties.update(_alignment_properties(style.alignment))
+    for side in ("left", "right", "top", "bottom"):
+        border = getattr(style.border, side)
+        if border is not None and border.style:
+            properties[side] = BORDER_STYLES.get(border.style, 1)
+    if style.number_format != "General":
+        properties["num_format"] = style.number_format
+    return properties
+
+
+class XlsxWriterWorkbook:
+    def __init__(self, target, styles):
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise RuntimeError("The xlsxwriter backend needs XlsxWriter (pip install XlsxWriter)") from None
+
+        # constant_memory needs a real file; in-memory targets are built in memory
+        options = {"constant_memory": True} if is_path(target) else {"in_memory": True}
+        self.wb = xlsxwriter.Workbook(target, options)
+        self.styles = styles
+        self._formats = {}
+        self._differential_formats = {}
+        self.default_format = self.wb.add_format()
+
+    def format(self, style, differential=False):
+        formats = self._differential_formats if differential else self._formats
+        if style not in formats:
+            with phase("styles"):
+                formats[style] = self.wb.add_format(xlsxwriter_properties(self.styles[style], differential))
+        return formats[style]
+
+    def add_sheet(self, title):
+        return XlsxWriterSheet(self, self.wb.add_worksheet(title))
+
+    def close(self):
+        self.wb.close()
+
+
+class XlsxWriterSheet:
+    """Renderer operations on an XlsxWriter worksheet; rows and columns are 1-based like openpyxl's"""
+
+    def __init__(self, book, ws):
+        self.book = book
+        self.ws = ws
+        self._row = 0
+        self._last_cells = []
+
+    @property
+    def title(self):
+        return self.ws.get_name()
+
+    def set_width(self, col, width):
+        self.ws.set_column(col - 1, col - 1, width)
+
+    def set_height(self, row, height):
+        self.ws.set_row(row - 1, height)
+
+    def freeze(self, ref):
+        min_col, min_row, _, _ = range_boundaries(ref)
+        self.ws.freeze_panes(min_row - 1, min_col - 1)
+
+    def append(self, cells):
+        row = self._row
+        for col, (value, style) in enumerate(cells):
+            self.ws.write(row, col, value, self.book.format(style))
+        if not cells:
+            # constant_memory only writes rows with cells, which would drop
+            # an empty row's height; an unstyled blank cell keeps the row
+            self.ws.write_blank(row, 0, None, self.book.default_format)
+        self._last_cells = cells
+        self._row += 1
+
+    def merge(self, ref):
+        """Merge a range that starts on the row just appended, keeping that row's first cell"""
+        min_col, min_row, max_col, max_row = range_boundaries(ref)
+        if min_row != self._row or not self._last_cells:
+            raise ValueError(f"{self.title}: can only merge the row just appended, not {ref}")
+        value, style = self._last_cells[0]
+        self.ws.merge_range(min_row - 1, min_col - 1, max_row - 1, max_col - 1, value, self.book.format(style))
+
+    def conditional_format(self, ref, formula, style):
+        min_col, min_row, max_col, max_row = range_boundaries(ref)
+        self.ws.conditional_format(min_row - 1, min_col - 1, max_row - 1, max_col - 1, {
+            "type": "formula",
+            "criteria": "=" + formula,
+            "format": self.book.format(style, differential=True),
+        })
+
+    def define_name(self, name, ref):
+        self.book.wb.define_name(name, "=" + ref)
@@ -0,0 +1,471 @@
+"""
+Benchmarks for the competitor comparison generator.
+
+Measures, with no network access:
+
+- wall time and peak traced memory of each tab builder in TABS,
+- loading the dataset and saving the full workbook,
+- how rendering plus saving scales with synthetic row counts (10 to 100k
+  by default) in the Revenue Streams and Quick Comparison table shapes,
+  in openpyxl standard and write-only mode and with the XlsxWriter
+  constant-memory backend,
+- wb.save() against comparison.parallel_save on the full workbook and on
+  a larger multi-sheet one (the full workbook plus synthetic tabs); the
+  workers' memory isn't traced, only the parent's,
+- the feature matrix at 100 competitors x 1,000 features with 70% of the
+  pairs rated: building the index, the Feature Matrix rows, and rendering
+  the Feature Matrix tab and all 99 head-to-head tabs. Both dimensions are
+  capped at --max-rows, so a quick run stays quick.
+
+Times are the best of --repeat runs, stored with the standard deviation
+of the runs; memory is the tracemalloc peak of one extra run, so tracing
+doesn't skew the times. Results are written as JSON and can be compared
+with a stored baseline; any metric more than --tolerance above it, and
+by more than its noise (see noise_floor()), is reported and the exit
+status is 1.
+
+The reference is BASELINE (benchmarks/baseline.json), committed with the
+code it measures and taken at --max-rows BASELINE_MAX_ROWS so a CI run
+takes about two minutes. A baseline only compares with a run at the same
+--max-rows. The regression check, as CI runs it (keeping bench.json as
+a build artifact):
+
+    python -m comparison.bench --max-rows 1000 --baseline --output bench.json
+
+A change that is meant to move the numbers, or a new CI machine, comes
+with a new baseline taken on the CI runner: its bench.json artifact, or
+the output of
+
+    python -m comparison.bench --max-rows 1000 --save-baseline
+
+committed with the change. Times depend on the machine (see the
+baseline's "meta"), so a baseline taken elsewhere is only a rough
+reference.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import openpyxl
+from openpyxl import Workbook
+
+import create_competitor_comparison as generator
+from comparison.backends import open_workbook
+from comparison.manifest import ROOT
+from comparison.parallel_save import parallel_save
+from comparison.records import RecordTable
+
+SCALING_ROWS = [10, 100, 1_000, 10_000, 100_000]
+
+# The committed baseline and the --max-rows it (and CI) runs at
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+BASELINE_MAX_ROWS = 1_000
+
+# Scaling modes: name -> (backend, write_only)
+SCALING_MODES = {
+    "standard": ("openpyxl", False),
+    "write_only": ("openpyxl", True),
+    "xlsxwriter": ("xlsxwriter", False),
+}
+
+# Rows in each synthetic tab of the large parallel-save workbook
+PARALLEL_SAVE_ROWS = 10_000
+
+# Synthetic feature matrix: competitors, features and the fraction of pairs rated
+FEATURE_MATRIX_SIZE = (100, 1_000)
+FEATURE_MATRIX_DENSITY = 0.7
+
+# Differences below these are timer and allocator noise, not regressions
+NOISE_FLOOR = {"seconds": 0.02, "peak_kib": 64}
+
+# A slowdown also has to exceed this many standard deviations of the timed runs
+NOISE_STDEVS = 3
+
+# Synthetic tables in the shape of the real ones, keyed like the dataset
+SCALING_SHAPES = {
+    "revenue_streams": (generator.REVENUE_STREAMS_SHEET, "streams"),
+    "quick_comparison": (generator.QUICK_COMPARISON_SHEET, "comparisons"),
+}
+
+
+def synthetic_streams(n):
+    """n Revenue Streams rows: six multi-line text fields each"""
+    return RecordTable.from_records(generator.Stream, (
+        generator.Stream(
+            name=f"{i}. Revenue Stream",
+            we_charge=f"{i % 20}% of ticket revenue\nOnly on 2nd+ events\n1st event FREE",
+            eventbrite="3.7% + $1.79 service fee\nPLUS 2.9% processing\nTotal: ~6.6% + $1.79",
+            others="Ticketmaster: 15-25%\nTicket Tailor: $0.26 flat\nHumanitix: 2% + $0.30",
+            win="• Significantly cheaper\n• Transparent pricing\n• No hidden fees",
+            improve="• Don't compete on fees alone\n• Emphasize net gain, not fee savings"
+        )
+        for i in range(n)
+    ))
+
+
+def synthetic_comparisons(n):
+    """n Quick Comparison rows, cycling through every winner style"""
+    winners = ["SponsorSynq", "Tie", "Eventbrite", "Depends"]
+    return RecordTable.from_records(generator.Comparison, (
+        generator.Comparison(f"Feature {i}", f"Yes ({i % 7}%)", "No", winners[i % len(winners)]) for i in range(n)
+    ))
+
+
+SYNTHETIC_TABLES = {
+    "streams": synthetic_streams,
+    "comparisons": synthetic_comparisons,
+}
+
+
+def measure(fn, setup=None, repeat=3):
+    """
+    Best wall time of fn over repeat runs, their standard deviation (0
+    for a single run) and the traced peak memory of one more run. setup()
+    builds fn's argument outside the timed region.
+    """
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        fn(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": min(times),
+        "seconds_stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+
+def new_workbook(write_only=False):
+    wb = Workbook(write_only=write_only)
+    if not write_only:
+        wb.remove(wb.active)
+    generator.register_styles(wb)
+    return wb
+
+
+def full_workbook(data):
+    wb = new_workbook()
+    for title, create_tab, _ in generator.TABS:
+        create_tab(wb.create_sheet(title), data)
+    return wb
+
+
+def bench_tabs(data, repeat):
+    results = {}
+    for title, create_tab, _ in generator.TABS:
+        results[title] = measure(
+            lambda wb, create_tab=create_tab, title=title: create_tab(wb.create_sheet(title), data),
+            setup=new_workbook,
+            repeat=repeat
+        )
+    return results
+
+
+def bench_load(repeat):
+    def load(_):
+        data = generator.Dataset()
+        for name in data:
+            data[name]
+
+    return measure(load, repeat=repeat)
+
+
+def bench_save(data, tmpdir, repeat):
+    path = os.path.join(tmpdir, "full.xlsx")
+    return measure(lambda wb: wb.save(path), setup=lambda: full_workbook(data), repeat=repeat)
+
+
+def large_workbook(data, rows):
+    """The full workbook plus two synthetic tabs of each scaling shape"""
+    wb = full_workbook(data)
+    for shape, (spec, table) in SCALING_SHAPES.items():
+        for i in range(2):
+            generator.render_sheet(wb.create_sheet(f"{shape} {i + 1}"), spec,
+                                   {table: SYNTHETIC_TABLES[table](rows)})
+    return wb
+
+
+def bench_parallel_save(data, tmpdir, repeat, workers, rows=PARALLEL_SAVE_ROWS):
+    """wb.save() against parallel_save() with workers processes"""
+    path = os.path.join(tmpdir, "parallel.xlsx")
+    workbooks = {
+        "full": lambda: full_workbook(data),
+        "large": lambda: large_workbook(data, rows),
+    }
+    results = {"workers": workers, "rows": rows}
+    for name, setup in workbooks.items():
+        results[name] = {
+            "wb_save": measure(lambda wb: wb.save(path), setup, repeat),
+            "parallel_save": measure(lambda wb: parallel_save(wb, path, workers), setup, repeat),
+        }
+        print(f"  parallel save {name:<6} wb.save {results[name]['wb_save']['seconds']:8.3f}s  "
+              f"{workers} workers {results[name]['parallel_save']['seconds']:8.3f}s", file=sys.stderr)
+    return results
+
+
+def synthetic_feature_matrix(path, competitors, features, density, seed=0):
+    """Copy the bundled dataset to path with a random feature matrix of the given size"""
+    shutil.copytree(generator.DEFAULT_DATASET, path)
+    rng = np.random.default_rng(seed)
+    rated = np.argwhere(rng.random((features, competitors)) < density)
+    scores = rng.integers(0, 4, len(rated))
+    matrix = {
+        "version": 1,
+        "competitors": [[f"Competitor {c}", f"Focus {c % 7}"] for c in range(competitors)],
+        "matrix_features": [[f"Feature {f}", f"Category {f % 12}"] for f in range(features)],
+        "ratings": [[f"Feature {f}", f"Competitor {c}", f"Level {score}", int(score)]
+                    for (f, c), score in zip(rated.tolist(), scores.tolist())],
+    }
+    with open(os.path.join(path, "feature_matrix.json"), "w", encoding="utf-8") as f:
+        json.dump(matrix, f)
+    return len(rated)
+
+
+def bench_feature_matrix(tmpdir, repeat, size=FEATURE_MATRIX_SIZE, density=FEATURE_MATRIX_DENSITY):
+    """Index build, Feature Matrix rows and tab rendering on a synthetic matrix"""
+    path = os.path.join(tmpdir, "feature_matrix")
+    competitors, features = size
+    ratings = synthetic_feature_matrix(path, competitors, features, density)
+
+    def dataset():
+        data = generator.Dataset(path)
+        for name in ("competitors", "matrix_features", "ratings"):
+            data[name]
+        return data
+
+    def indexed():
+        data = dataset()
+        data.feature_matrix
+        return data
+
+    def render(tabs):
+        data = indexed()
+        return data, new_workbook(), tabs(data)
+
+    def render_tabs(args):
+        data, wb, tabs = args
+        for title, create_tab, _ in tabs:
+            create_tab(wb.create_sheet(title), data)
+
+    feature_matrix_tab = [tab for tab in generator.TABS if tab[0] == "Feature Matrix"]
+    results = {
+        "competitors": competitors,
+        "features": features,
+        "ratings": ratings,
+        "index": measure(lambda data: data.feature_matrix, dataset, repeat),
+        "rows": measure(lambda data: (generator.feature_matrix_totals(data), generator.feature_matrix_rows(data)),
+                        indexed, repeat),
+        # Tens of thousands of cells per tab: one timed run is representative
+        "matrix_tab": measure(render_tabs, lambda: render(lambda data: feature_matrix_tab), 1),
+        "head_to_head_tabs": measure(render_tabs, lambda: render(generator.head_to_head_tabs), 1),
+    }
+    for name in ("index", "rows", "matrix_tab", "head_to_head_tabs"):
+        print(f"  feature matrix {name:<18} {results[name]['seconds']:8.3f}s  "
+              f"{results[name]['peak_kib']:10,.0f} KiB", file=sys.stderr)
+    return results
+
+
+def bench_scaling(sizes, tmpdir, repeat):
+    """Render + save time and memory for each shape, mode and row count"""
+    results = {}
+    for shape, (spec, table) in SCALING_SHAPES.items():
+        results[shape] = []
+        for mode, (backend, write_only) in SCALING_MODES.items():
+            for n in sizes:
+                data = {table: SYNTHETIC_TABLES[table](n)}
+                path = os.path.join(tmpdir, f"{shape}-{n}.xlsx")
+
+                def build(_, backend=backend, write_only=write_only, data=data, path=path):
+                    book = open_workbook(backend, path, generator.STYLES, write_only)
+                    generator.render_sheet(book.add_sheet(shape), spec, data)
+                    book.close()
+
+                # Big tables are slow enough that one timed run is representative
+                result = measure(build, repeat=repeat if n <= 1_000 else 1)
+                results[shape].append(dict(rows=n, mode=mode, **result))
+                print(f"  {shape:<18} {mode:<10} {n:>7} rows  "
+                      f"{result['seconds']:8.3f}s  {result['peak_kib']:10,.0f} KiB", file=sys.stderr)
+    return results
+
+
+def run(sizes=SCALING_ROWS, repeat=3, save_workers=None):
+    """Run every benchmark and return the results dict"""
+    feature_matrix_size = tuple(min(n, max(sizes)) for n in FEATURE_MATRIX_SIZE)
+    data = generator.load_dataset()
+    # Load every table (and the derived ones) up front so tab timings don't include it
+    for name in data:
+        data[name]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = {
+            "meta": {
+                "python": platform.python_version(),
+                "openpyxl": openpyxl.__version__,
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+                "repeat": repeat,
+                "max_rows": max(sizes),
+            },
+            "load": bench_load(repeat),
+            "tabs": bench_tabs(data, repeat),
+            "save": bench_save(data, tmpdir, repeat),
+            # At least two workers, so one CPU still measures the parallel path's overhead
+            "parallel_save": bench_parallel_save(data, tmpdir, repeat, save_workers or max(2, os.cpu_count() or 1),
+                                                 min(PARALLEL_SAVE_ROWS, max(sizes))),
+            "feature_matrix": bench_feature_matrix(tmpdir, repeat, feature_matrix_size),
+            "scaling": bench_scaling(sizes, tmpdir, repeat),
+        }
+    return results
+
+
+def flatten(results):
+    """Metric name -> value for every measurement, e.g. "tabs/Fee Breakdown/seconds" """
+    metrics = {}
+    for section in ("load", "save"):
+        for key, value in results[section].items():
+            metrics[f"{section}/{key}"] = value
+    for title, result in results["tabs"].items():
+        for key, value in result.items():
+            metrics[f"tabs/{title}/{key}"] = value
+    # Results from before the parallel save benchmark don't have it
+    for name, methods in results.get("parallel_save", {}).items():
+        if isinstance(methods, dict):
+            for method, result in methods.items():
+                for key, value in result.items():
+                    metrics[f"parallel_save/{name}/{method}/{key}"] = value
+    # Keyed by size, so runs with different --max-rows don't compare
+    matrix = results.get("feature_matrix", {})
+    for name, result in matrix.items():
+        if isinstance(result, dict):
+            for key, value in result.items():
+                metrics[f"feature_matrix/{matrix['competitors']}x{matrix['features']}/{name}/{key}"] = value
+    for shape, points in results["scaling"].items():
+        for point in points:
+            for key in ("seconds", "seconds_stdev", "peak_kib"):
+                # Results from before the spread was stored don't have it
+                if key in point:
+                    metrics[f"scaling/{shape}/{point['mode']}/{point['rows']}/{key}"] = point[key]
+    return metrics
+
+
+def noise_floor(name, current, previous):
+    """
+    The smallest difference in metric name that counts as a change:
+    NOISE_FLOOR, or for times NOISE_STDEVS standard deviations of the
+    timed runs in either result if that is more
+    """
+    floor = NOISE_FLOOR[name.rsplit("/", 1)[1]]
+    if name.endswith("/seconds"):
+        spread = max(current.get(name + "_stdev", 0.0), previous.get(name + "_stdev", 0.0))
+        floor = max(floor, NOISE_STDEVS * spread)
+    return floor
+
+
+def compare(results, baseline, tolerance):
+    """Metrics more than tolerance (a fraction) above the baseline: [(name, baseline, current)]"""
+    current = flatten(results)
+    previous = flatten(baseline)
+    return [
+        (name, previous[name], value)
+        for name, value in current.items()
+        if name in previous
+        and name.rsplit("/", 1)[1] in NOISE_FLOOR
+        and value > previous[name] * (1 + tolerance)
+        and value - previous[name] > noise_floor(name, current, previous)
+    ]
+
+
+def change(before, after):
+    """after against before: relative, or the absolute delta if before is 0"""
+    if before:
+        return f"{after / before - 1:+.0%}"
+    return f"{after - before:+,.3f}"
+
+
+def print_summary(results):
+    print(f"{'load':<30} {results['load']['seconds']:8.3f}s  {results['load']['peak_kib']:10,.0f} KiB")
+    for title, result in results["tabs"].items():
+        print(f"{'tab: ' + title:<30} {result['seconds']:8.3f}s  {result['peak_kib']:10,.0f} KiB")
+    print(f"{'save':<30} {results['save']['seconds']:8.3f}s  {results['save']['peak_kib']:10,.0f} KiB")
+    parallel = results["parallel_save"]
+    for name in ("full", "large"):
+        for method, result in parallel[name].items():
+            label = f"save {name}: " + (f"parallel ({parallel['workers']})" if method == "parallel_save" else "wb.save")
+            print(f"{label:<30} {result['seconds']:8.3f}s  {result['peak_kib']:10,.0f} KiB")
+    matrix = results["feature_matrix"]
+    for name in ("index", "rows", "matrix_tab", "head_to_head_tabs"):
+        label = f"matrix {matrix['competitors']}x{matrix['features']}: {name}"
+        print(f"{label:<30} {matrix[name]['seconds']:8.3f}s  {matrix[name]['peak_kib']:10,.0f} KiB")
+
+
+def write_json(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the competitor comparison generator")
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE", nargs="?", const=BASELINE,
+                        help="compare with a stored results file (default: benchmarks/baseline.json, "
+                             f"taken at --max-rows {BASELINE_MAX_ROWS:,})")
+    parser.add_argument("--save-baseline", metavar="FILE", nargs="?", const=BASELINE,
+                        help="store the results as the new baseline (default: benchmarks/baseline.json)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown/growth over the baseline, as a fraction (default: 0.25)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement (default: 3)")
+    parser.add_argument("--max-rows", type=int, default=SCALING_ROWS[-1],
+                        help=f"largest synthetic table (default: {SCALING_ROWS[-1]:,})")
+    parser.add_argument("--save-workers", type=int, metavar="N",
+                        help="processes for the parallel save benchmark (default: CPU count, at least 2)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        # Baselines from before max_rows was stored don't have it
+        baseline_rows = baseline["meta"].get("max_rows", args.max_rows)
+        if baseline_rows != args.max_rows:
+            parser.error(f"{args.baseline} was taken with --max-rows {baseline_rows}; run with the same to compare")
+
+    results = run([n for n in SCALING_ROWS if n <= args.max_rows], args.repeat, args.save_workers)
+    print_summary(results)
+
+    if args.output:
+        write_json(results, args.output)
+    if args.save_baseline:
+        write_json(results, args.save_baseline)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:,.3f} -> {after:,.3f} ({change(before, after)})")
+        if regressions:
+            return 1
+        print(f"✓ No regressions over {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Command line for the competitor comparison workbook.
+
+    python -m comparison build [--force] [--backend xlsxwriter] [--report html,markdown] ...
+    python -m comparison check               # exit status 1 if the workbook is stale
+    python -m comparison export-json [--output FILE]
+    python -m comparison bench [--repeat N] ...
+
+Only the standard library is imported up front. check compares the
+hashes in the workbook's manifest with the files (see
+comparison.manifest), so pre-commit and CI hooks get their answer
+without importing openpyxl or NumPy or loading the dataset; the other
+subcommands import the generator when they run.
+"""
+
+import argparse
+import sys
+
+from comparison.manifest import BACKENDS, DEFAULT_DATASET, OUTPUT_FILE, build_options, stale_reason
+from comparison.report import REPORT_FORMATS
+from comparison.reproducible import from_env as reproducible_from_env
+
+COMMANDS = ("build", "check", "export-json", "bench")
+
+
+def add_build_options(parser):
+    """The options that pick which workbook is built, shared by build and check"""
+    parser.add_argument("--output", default=OUTPUT_FILE, help=f"workbook file (default: {OUTPUT_FILE})")
+    parser.add_argument("--dataset", metavar="DIR", help="dataset directory (default: data/competitor_comparison)")
+    parser.add_argument("--backend", choices=BACKENDS, default="openpyxl",
+                        help="library that writes the workbook (default: openpyxl)")
+    parser.add_argument("--cached-values", action="store_true",
+                        help="store computed results with the formulas for viewers that don't recalculate")
+    parser.add_argument("--reproducible", action="store_true", default=None,
+                        help="fixed timestamps, entry order and compression (or set SOURCE_DATE_EPOCH)")
+
+
+def report_formats(text):
+    """Parse --report: "html,markdown" -> ["html", "markdown"]"""
+    formats = [fmt.strip() for fmt in text.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in REPORT_FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown report format(s): {', '.join(unknown)}")
+    return formats
+
+
+def build(args):
+    import create_competitor_comparison as generator
+
+    profile = "cprofile" if args.cprofile else "phases" if args.profile else None
+    generator.create_competitor_comparison(write_only=args.write_only, dataset=args.dataset, force=args.force,
+                                           output=args.output, cached_values=args.cached_values,
+                                           profile=profile, backend=args.backend,
+                                           reproducible=args.reproducible, save_workers=args.save_workers,
+                                           reports=args.report, report_dir=args.report_dir)
+    return 0
+
+
+def check(args):
+    reproducible = reproducible_from_env() if args.reproducible is None else args.reproducible
+    options = build_options(args.backend, args.cached_values, reproducible)
+    reason = stale_reason(args.output, args.dataset or DEFAULT_DATASET, options)
+    if reason is None:
+        if not args.quiet:
+            print(f"✓ Excel file up to date: {args.output}")
+        return 0
+    if not args.quiet:
+        print(f"✗ Excel file out of date: {args.output} ({reason})")
+    return 1
+
+
+def export_json(args):
+    import create_competitor_comparison as generator
+    from comparison.export import export_model, write_json
+
+    data = generator.load_dataset(args.dataset)
+    output = args.output or generator.EXPORT_NAME + ".json"
+    print(f"✓ Wrote {write_json(export_model(generator.tab_specs(data), data), output)}")
+    return 0
+
+
+def bench(args, argv):
+    from comparison import bench as benchmarks
+
+    return benchmarks.main(argv)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog="python -m comparison",
+                                     description="Build and check the SponsorSynq competitor comparison workbook")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    parser_build = commands.add_parser("build", help="build the workbook (skipped when it is up to date)")
+    add_build_options(parser_build)
+    parser_build.add_argument("--force", action="store_true",
+                              help="rebuild even if the manifest says the output is up to date")
+    parser_build.add_argument("--write-only", action="store_true",
+                              help="stream rows to disk with openpyxl write-only worksheets")
+    parser_build.add_argument("--save-workers", type=int, metavar="N",
+                              help="serialize the sheets in N worker processes when saving")
+    parser_build.add_argument("--report", type=report_formats, default=[], metavar="FORMATS",
+                              help="also write the tabs as reports: comma-separated html, markdown")
+    parser_build.add_argument("--report-dir", default=".", metavar="DIR",
+                              help="where --report writes its files (default: current directory)")
+    parser_build.add_argument("--profile", action="store_true",
+                              help="time each build phase and write a profile report next to the output")
+    parser_build.add_argument("--cprofile", action="store_true", help="like --profile, plus a cProfile dump")
+    parser_build.set_defaults(run=build)
+
+    parser_check = commands.add_parser("check", help="exit with status 1 if the workbook needs rebuilding")
+    add_build_options(parser_check)
+    parser_check.add_argument("-q", "--quiet", action="store_true", help="only set the exit status")
+    parser_check.set_defaults(run=check)
+
+    parser_export = commands.add_parser("export-json", help="export the tabs as JSON for the dashboard")
+    parser_export.add_argument("--output", metavar="FILE", help="JSON file (default: competitor_comparison.json)")
+    parser_export.add_argument("--dataset", metavar="DIR",
+                               help="dataset directory (default: data/competitor_comparison)")
+    parser_export.set_defaults(run=export_json)
+
+    # Everything after "bench" goes to comparison.bench, --help included
+    parser_bench = commands.add_parser("bench", add_help=False, help="run the benchmarks (see comparison.bench)")
+    parser_bench.set_defaults(run=bench)
+    return parser
+
+
+def main(argv=None):
+    parser = make_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.run is bench:
+        return bench(args, extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+The layout of the dataset's JSON files.
+
+The files are edited by hand and reviewed as diffs, so the tools that
+write them (the workbook importer, the matching benchmark, the live KPI
+ingest) all lay them out the same way with dataset_json(): a line per
+row of list tables and a line per field of object rows.
+"""
+
+import json
+
+
+def dataset_json(doc):
+    """A dataset file in the repo's layout: one line per list row, one line per field of object rows"""
+    def dumps(value):
+        return json.dumps(value, ensure_ascii=False)
+
+    lines = ["{"]
+    for i, (key, value) in enumerate(doc.items()):
+        comma = "," if i < len(doc) - 1 else ""
+        if not isinstance(value, list) or not value:
+            lines.append(f"  {dumps(key)}: {dumps(value)}{comma}")
+            continue
+        lines.append(f"  {dumps(key)}: [")
+        for j, row in enumerate(value):
+            row_comma = "," if j < len(value) - 1 else ""
+            if isinstance(row, dict):
+                lines.append("    {")
+                lines += [f"      {dumps(field)}: {dumps(field_value)}" + ("," if k < len(row) - 1 else "")
+                          for k, (field, field_value) in enumerate(row.items())]
+                lines.append("    }" + row_comma)
+            else:
+                lines.append(f"    {dumps(row)}{row_comma}")
+        lines.append(f"  ]{comma}")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
@@ -0,0 +1,103 @@
+"""
+JSON and columnar exports of the comparison tabs.
+
+export_model() turns the sheet specs and a dataset into plain data: one
+entry per tab with its sections in sheet order, each either a table
+({"table", "columns", "rows"}) or a list of banner lines. Formula text
+is replaced by its computed value, so the exports read the same as the
+workbook. The model is written as compact JSON for the dashboard and,
+when pyarrow is installed, as one Parquet or Arrow IPC file per table.
+"""
+
+import json
+import os
+import re
+
+from comparison.formulas import evaluate, has_formula, render_text
+
+EXPORT_VERSION = 1
+
+# Columnar formats and their file extensions (both need pyarrow)
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+FORMATS = ("json",) + tuple(COLUMNAR_FORMATS)
+
+
+def table_file_name(table):
+    """
+    File name stem for a table: parameterized tables such as
+    "head_to_head/Eventbrite" become "head_to_head__Eventbrite", and
+    characters file systems reject become "_"
+    """
+    return re.sub(r'[\\:*?"<>|]', "_", table.replace("/", "__"))
+
+
+def export_model(tabs, data):
+    """Plain-data model of tabs, a list of (title, spec) pairs, rendered from data"""
+    tabs_out = []
+    for title, spec in tabs:
+        sections = []
+        for block in spec["blocks"]:
+            if block["type"] == "table":
+                sections.append(table_section(block, data))
+            elif block["type"] == "banners":
+                sections.append({"banners": [text for text, _ in data[block["rows"]]]})
+        tabs_out.append({"title": title, "sections": sections})
+    return {"version": EXPORT_VERSION, "tabs": tabs_out}
+
+
+def table_section(block, data):
+    columns = block["columns"]
+    rows = []
+    for record in data[block["rows"]]:
+        row = []
+        for column in columns:
+            value = record[column["key"]]
+            if column.get("formula"):
+                value = evaluate(value, data.names)
+            elif has_formula(value):
+                value = render_text(value, data.names)
+            row.append(value)
+        rows.append(row)
+    return {"table": block["rows"], "columns": [column["header"] for column in columns], "rows": rows}
+
+
+def json_bytes(model):
+    """The model as compact UTF-8 JSON"""
+    return json.dumps(model, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_json(model, path):
+    """Write the model as compact UTF-8 JSON (atomically)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json_bytes(model))
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_columnar(model, directory, fmt):
+    """Write every table in the model to directory as <table>.parquet or <table>.arrow (see table_file_name())"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError(f"{fmt} export needs pyarrow (pip install pyarrow)") from None
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for tab in model["tabs"]:
+        for section in tab["sections"]:
+            if "table" not in section:
+                continue
+            table = pa.table({
+                column: [row[i] for row in section["rows"]]
+                for i, column in enumerate(section["columns"])
+            })
+            path = os.path.join(directory, table_file_name(section["table"]) + COLUMNAR_FORMATS[fmt])
+            if fmt == "parquet":
+                pq.write_table(table, path)
+            else:
+                with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            paths.append(path)
+    return paths
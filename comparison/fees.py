@@ -0,0 +1,219 @@
+"""
+Platform fee model.
+
+Each platform's pricing is a FeeSchedule: an optional monthly plan plus
+per-ticket fee components (percentage, fixed fee, optional per-ticket cap,
+who pays it, and whether a subscription or the host's first event waives
+it). FeeModel stacks the components of every platform into NumPy arrays,
+so fees for all platforms over arrays of ticket prices and volumes come
+out of one vectorized pass.
+
+Amounts in a dataset record may name an assumption (e.g.
+"PlatformFeeRate") instead of giving the number; the from_record
+constructors look them up in a dict of assumption values.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+PAYERS = ("attendee", "host")
+
+# Record fields that hold amounts
+AMOUNT_FIELDS = ("percent", "fixed", "cap", "subscription_monthly")
+
+
+def resolve_amounts(record, names, where, fields=AMOUNT_FIELDS):
+    """Copy of record with amounts (the given fields) given as assumption names replaced by their values"""
+    resolved = dict(record)
+    for field in fields:
+        value = record.get(field)
+        if isinstance(value, str):
+            if value not in names:
+                raise ValueError(f"{where}: {field} refers to unknown assumption {value!r}")
+            resolved[field] = names[value]
+    return resolved
+
+
+@dataclass(frozen=True)
+class FeeComponent:
+    label: str
+    payer: str
+    percent: float = 0.0
+    fixed: float = 0.0
+    cap: float | None = None
+    waived_by_subscription: bool = False
+    waived_first_event: bool = False
+
+    @classmethod
+    def from_record(cls, record, platform, names=None):
+        component = cls(**resolve_amounts(record, names or {}, platform))
+        if component.payer not in PAYERS:
+            raise ValueError(f"{platform}: fee '{component.label}' has unknown payer {component.payer!r}")
+        if component.percent < 0 or component.fixed < 0 or (component.cap is not None and component.cap < 0):
+            raise ValueError(f"{platform}: fee '{component.label}' has a negative amount")
+        return component
+
+
+@dataclass(frozen=True)
+class FeeSchedule:
+    name: str
+    components: tuple
+    subscription_monthly: float = 0.0
+    subscription_required: bool = False
+
+    @classmethod
+    def from_record(cls, record, names=None):
+        """Build a schedule from a fee_schedules dataset row, looking up named amounts in names"""
+        record = resolve_amounts(record, names or {}, record["name"])
+        components = tuple(FeeComponent.from_record(c, record["name"], names) for c in record["components"])
+        return cls(
+            name=record["name"],
+            components=components,
+            subscription_monthly=record["subscription_monthly"],
+            subscription_required=record["subscription_required"]
+        )
+
+
+class FeeModel:
+    """Fee schedules for a set of platforms, evaluated over NumPy arrays"""
+
+    def __init__(self, schedules):
+        self.schedules = list(schedules)
+        self.names = [schedule.name for schedule in self.schedules]
+
+        components = [(i, c) for i, schedule in enumerate(self.schedules) for c in schedule.components]
+        self._percent = np.array([c.percent for _, c in components], dtype=float)
+        self._fixed = np.array([c.fixed for _, c in components], dtype=float)
+        self._cap = np.array([np.inf if c.cap is None else c.cap for _, c in components], dtype=float)
+        self._host = np.array([c.payer == "host" for _, c in components], dtype=bool)
+        self._subscription_waives = np.array([c.waived_by_subscription for _, c in components], dtype=bool)
+        self._first_event_waives = np.array([c.waived_first_event for _, c in components], dtype=bool)
+
+        # platform x component matrix used to sum component fees per platform
+        self._owner = np.zeros((len(self.schedules), len(components)))
+        self._owner[[i for i, _ in components], np.arange(len(components))] = 1.0
+
+        self._subscription = np.array([s.subscription_monthly for s in self.schedules], dtype=float)
+        self._subscription_required = np.array([s.subscription_required for s in self.schedules], dtype=bool)
+
+    @classmethod
+    def from_records(cls, records, names=None):
+        return cls(FeeSchedule.from_record(record, names) for record in records)
+
+    def index(self, name):
+        return self.names.index(name)
+
+    def evaluate(self, price, tickets=1, subscribed=False, first_event=False, include_subscription=True):
+        """
+        Fees for every platform on one event, broadcast over price, tickets,
+        subscribed and first_event (scalars or arrays).
+
+        Returns a dict of "attendee", "host" and "total" arrays shaped
+        (platforms, *broadcast shape). The host side includes the monthly
+        plan when the host subscribes or the platform requires one, unless
+        include_subscription is False. Free tickets carry no per-ticket fees.
+        """
+        price, tickets, subscribed, first_event = np.broadcast_arrays(
+            np.asarray(price, dtype=float),
+            np.asarray(tickets, dtype=float),
+            np.asarray(subscribed, dtype=bool),
+            np.asarray(first_event, dtype=bool)
+        )
+        shape = price.shape
+        price, tickets, subscribed, first_event = (
+            a.reshape(1, -1) for a in (price, tickets, subscribed, first_event)
+        )
+
+        # (components, points)
+        per_ticket = np.minimum(self._percent[:, None] * price + self._fixed[:, None], self._cap[:, None])
+        per_ticket = np.where(price > 0, per_ticket, 0.0)
+        waived = (
+            (self._subscription_waives[:, None] & subscribed)
+            | (self._first_event_waives[:, None] & first_event)
+        )
+        amounts = np.where(waived, 0.0, per_ticket * tickets)
+
+        attendee = self._owner[:, ~self._host] @ amounts[~self._host]
+        host = self._owner[:, self._host] @ amounts[self._host]
+        if include_subscription:
+            on_plan = self._subscription_required[:, None] | subscribed
+            host = host + np.where(on_plan, self._subscription[:, None], 0.0)
+
+        out_shape = (len(self.schedules),) + shape
+        return {
+            "attendee": attendee.reshape(out_shape),
+            "host": host.reshape(out_shape),
+            "total": (attendee + host).reshape(out_shape),
+        }
+
+    def per_ticket_fees(self, prices):
+        """Total per-ticket fees (both payers, no plan, not a first event), shaped (platforms, prices)"""
+        return self.evaluate(prices, include_subscription=False)["total"]
+
+    def subscription_breakeven(self):
+        """
+        Monthly ticket sales at which each platform's plan pays for itself
+        through the percentage fees it waives; NaN where the plan waives
+        nothing.
+        """
+        waived_percent = self._owner @ np.where(self._subscription_waives, self._percent, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(waived_percent > 0, self._subscription / waived_percent, np.nan)
+
+
+def slug(name):
+    return "".join(ch if ch.isalnum() else "_" for ch in name.lower()).strip("_")
+
+
+def fee_facts(model, prices):
+    """
+    Formatted figures that dataset text can reference as {placeholders}:
+    <platform>_fee_<price> (per-ticket fees at each example price) and
+    <platform>_breakeven (monthly sales where the plan pays for itself).
+    """
+    facts = {}
+    fees = model.per_ticket_fees(prices)
+    breakeven = model.subscription_breakeven()
+    for i, name in enumerate(model.names):
+        for price, fee in zip(prices, fees[i]):
+            facts[f"{slug(name)}_fee_{price:g}"] = f"${fee:,.2f}"
+        if not np.isnan(breakeven[i]):
+            facts[f"{slug(name)}_breakeven"] = f"${breakeven[i]:,.0f}"
+    return facts
+
+
+def scenario_grid(model, prices, tickets, sponsorship, commission, sponsor_platform="SponsorSynq"):
+    """
+    Evaluate every platform over the full grid of ticket price x tickets
+    sold x plan off/on x sponsorship amount in one pass.
+
+    Returns flat arrays, one entry per scenario: the four axes ("price",
+    "tickets", "subscribed", "sponsorship"), fee arrays shaped (platforms,
+    scenarios) as returned by FeeModel.evaluate, and the sponsorship split
+    on sponsor_platform ("sponsor_to_host" and "sponsor_commission"). Only
+    that platform has a sponsor marketplace; the others bring no sponsor
+    dollars.
+    """
+    price, sold, subscribed, sponsor = (
+        axis.ravel() for axis in np.meshgrid(
+            np.asarray(prices, dtype=float),
+            np.asarray(tickets, dtype=float),
+            np.array([False, True]),
+            np.asarray(sponsorship, dtype=float),
+            indexing="ij"
+        )
+    )
+    fees = model.evaluate(price, sold, subscribed)
+
+    has_marketplace = sponsor_platform in model.names
+    sponsor_commission = sponsor * commission if has_marketplace else np.zeros_like(sponsor)
+    return {
+        "price": price,
+        "tickets": sold,
+        "subscribed": subscribed,
+        "sponsorship": sponsor,
+        **fees,
+        "sponsor_commission": sponsor_commission,
+        "sponsor_to_host": sponsor - sponsor_commission if has_marketplace else np.zeros_like(sponsor),
+    }
@@ -0,0 +1,150 @@
+"""
+Check that every backend writes the same workbook.
+
+Each workbook is read back with openpyxl and reduced to what a reader
+sees: sheet order, column widths, row heights, frozen panes, merged
+ranges (e.g. the Action Items section titles), defined names,
+conditional format ranges, and each cell's value, number format, font,
+fill, borders and alignment. diff() lists where two summaries differ.
+
+Backends store some things differently without changing how the sheet
+looks, so the summaries normalise them: colors keep only their RGB part
+(automatic and default text colors read as none), fonts without a name
+or size use the default font's, widths are compared within
+WIDTH_TOLERANCE (XlsxWriter adds its own padding when it converts
+character widths), and the hidden cells inside a merged range are
+skipped.
+
+    python create_competitor_comparison.py --check-backends
+"""
+
+import io
+
+from openpyxl import load_workbook
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import range_boundaries
+
+WIDTH_TOLERANCE = 1.0
+
+
+def color_rgb(color):
+    """RGB hex of a color; None for the automatic color (and the default text color, theme 1)"""
+    if color is None or color.type == "auto" or (color.type == "theme" and color.value == 1):
+        return None
+    if color.type == "rgb":
+        return color.rgb[-6:]
+    return f"{color.type}:{color.value}"
+
+
+def _side(side):
+    return (side.style, color_rgb(side.color)) if side is not None and side.style else None
+
+
+def _widths(ws):
+    """Column letter -> width, with ranges of columns sharing one width expanded"""
+    widths = {}
+    for dim in ws.column_dimensions.values():
+        if dim.customWidth:
+            for col in range(dim.min, dim.max + 1):
+                widths[get_column_letter(col)] = dim.width
+    return widths
+
+
+def cell_format(cell):
+    font, fill, border, alignment = cell.font, cell.fill, cell.border, cell.alignment
+    return {
+        "number_format": cell.number_format,
+        "font": (font.name or DEFAULT_FONT.name, font.sz or DEFAULT_FONT.sz, bool(font.b), bool(font.i),
+                 color_rgb(font.color)),
+        "fill": (fill.fill_type, color_rgb(fill.fgColor)) if fill.fill_type else None,
+        "border": tuple(_side(getattr(border, side)) for side in ("left", "right", "top", "bottom")),
+        "alignment": (alignment.horizontal, alignment.vertical, bool(alignment.wrap_text)),
+    }
+
+
+def merged_interior(ranges):
+    """Every cell of the merged ranges except their top-left ones"""
+    cells = set()
+    for ref in ranges:
+        min_col, min_row, max_col, max_row = range_boundaries(ref)
+        cells.update((row, col) for row in range(min_row, max_row + 1) for col in range(min_col, max_col + 1))
+        cells.discard((min_row, min_col))
+    return cells
+
+
+def summarize(content):
+    """What a reader sees of the .xlsx file content (bytes), as plain data"""
+    wb = load_workbook(io.BytesIO(content))
+    sheets = {}
+    for ws in wb.worksheets:
+        merged = sorted(str(ref) for ref in ws.merged_cells.ranges)
+        hidden = merged_interior(merged)
+        cells = {}
+        for row in ws.iter_rows():
+            for cell in row:
+                if (cell.row, cell.column) in hidden or (cell.value is None and not cell.has_style):
+                    continue
+                cells[cell.coordinate] = dict(value=cell.value, **cell_format(cell))
+        sheets[ws.title] = {
+            "widths": _widths(ws),
+            "heights": {key: dim.height for key, dim in ws.row_dimensions.items() if dim.height is not None},
+            "freeze": ws.freeze_panes,
+            "merged": merged,
+            "conditional_formats": sorted(
+                (str(cf.sqref), [formula for rule in cf.rules for formula in rule.formula])
+                for cf in ws.conditional_formatting
+            ),
+            "cells": cells,
+        }
+    names = {name: str(defined.attr_text).lstrip("=") for name, defined in wb.defined_names.items()}
+    return {"sheets": sheets, "order": wb.sheetnames, "names": names}
+
+
+def diff(expected, actual, limit=20):
+    """Differences between two summaries, as readable lines (at most limit of them)"""
+    problems = []
+    if expected["order"] != actual["order"]:
+        problems.append(f"sheet order: {expected['order']} != {actual['order']}")
+    if expected["names"] != actual["names"]:
+        problems.append(f"defined names differ: {_changed(expected['names'], actual['names'])}")
+
+    for title, sheet in expected["sheets"].items():
+        other = actual["sheets"].get(title)
+        if other is None:
+            continue
+        for key in ("heights", "freeze", "merged", "conditional_formats"):
+            if sheet[key] != other[key]:
+                problems.append(f"{title}: {key}: {sheet[key]} != {other[key]}")
+        for col in sorted(set(sheet["widths"]) | set(other["widths"])):
+            width, other_width = sheet["widths"].get(col), other["widths"].get(col)
+            if width is None or other_width is None or abs(width - other_width) > WIDTH_TOLERANCE:
+                problems.append(f"{title}: width of {col}: {width} != {other_width}")
+        for ref in _changed(sheet["cells"], other["cells"]):
+            cell, other_cell = sheet["cells"].get(ref), other["cells"].get(ref)
+            if cell is None or other_cell is None:
+                problems.append(f"{title}!{ref}: {cell} != {other_cell}")
+                continue
+            for key, value in cell.items():
+                if other_cell[key] != value:
+                    problems.append(f"{title}!{ref}: {key}: {value!r} != {other_cell[key]!r}")
+    return problems[:limit]
+
+
+def _changed(a, b):
+    return sorted(key for key in set(a) | set(b) if a.get(key) != b.get(key))
+
+
+def check_backends(build, backends, reference="openpyxl"):
+    """
+    Build the workbook with each of backends (labels build() understands)
+    through build(backend) -> bytes and compare each with the reference
+    build. Returns {backend: [differences]}; a backend with no differences
+    gets [].
+    """
+    expected = summarize(build(reference))
+    return {
+        backend: diff(expected, summarize(build(backend)))
+        for backend in backends
+        if backend != reference
+    }
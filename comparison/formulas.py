@@ -0,0 +1,329 @@
+"""
+Excel formulas for dataset text.
+
+Dataset strings may embed calculations as {=expression} or
+{=expression|format}, e.g. "Offer {=AnnualSubscription|$0}/yr". The
+expression uses workbook defined names (the Assumptions sheet) and a
+small subset of Excel: numbers, "strings", + - * / &, parentheses and
+the functions TEXT, CHAR, MIN, MAX and ROUND. The format is an Excel
+TEXT() format code.
+
+text_formula() turns such a string into a native Excel formula, so the
+workbook recalculates when an assumption changes. render_text() and
+evaluate() compute the same result in Python for cached values and for
+outputs that can't hold formulas.
+"""
+
+import io
+import os
+import re
+import zipfile
+from decimal import Decimal, ROUND_HALF_UP
+from xml.etree import ElementTree
+
+PLACEHOLDER = re.compile(r"\{=([^}|]+)(?:\|([^}]+))?\}")
+
+# Excel caps string literals inside a formula at 255 characters
+MAX_LITERAL = 255
+
+SHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def has_formula(text):
+    return isinstance(text, str) and "{=" in text
+
+
+def text_formula(template):
+    """Excel formula ("=...") producing template with its {=...} placeholders evaluated"""
+    parts = []
+    pos = 0
+    for match in PLACEHOLDER.finditer(template):
+        parts += literal_parts(template[pos:match.start()])
+        expression, fmt = match.group(1).strip(), match.group(2)
+        if fmt:
+            parts.append(f'TEXT({expression},{quote(fmt)})')
+        else:
+            parts.append(f'({expression})')
+        pos = match.end()
+    parts += literal_parts(template[pos:])
+    return "=" + "&".join(parts or ['""'])
+
+
+def formula_template(formula):
+    """
+    The template text_formula() would turn into formula: "=" + pieces
+    joined with &, each a string literal, CHAR(10), TEXT(expression,
+    "format") or a parenthesized expression. Returns None for formulas of
+    any other shape.
+    """
+    formula = formula.rstrip()
+    if not formula.startswith("="):
+        return None
+
+    # Split at the top-level &s
+    pieces = []
+    start = pos = 1
+    depth = 0
+    while pos < len(formula):
+        match = TOKEN.match(formula, pos)
+        if not match:
+            return None
+        text = match.group(match.lastgroup)
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif text == "&" and depth == 0:
+            pieces.append(formula[start:match.start()])
+            start = match.end()
+        pos = match.end()
+    pieces.append(formula[start:])
+
+    template = []
+    for piece in (piece.strip() for piece in pieces):
+        text_call = re.fullmatch(r'TEXT\((.+),\s*("(?:[^"]|"")*")\s*\)', piece, re.IGNORECASE)
+        if re.fullmatch(r'"(?:[^"]|"")*"', piece):
+            template.append(piece[1:-1].replace('""', '"'))
+        elif re.fullmatch(r"CHAR\(\s*10\s*\)", piece, re.IGNORECASE):
+            template.append("\n")
+        elif text_call:
+            template.append(placeholder(text_call.group(1).strip(), text_call.group(2)[1:-1].replace('""', '"')))
+        elif piece.startswith("(") and piece.endswith(")"):
+            template.append(placeholder(piece[1:-1].strip()))
+        else:
+            return None
+        if template[-1] is None:
+            return None
+    return "".join(template)
+
+
+def placeholder(expression, fmt=None):
+    """{=expression|fmt}, or None when the parts can't be written as a placeholder"""
+    if not expression or any(char in expression for char in "{}|") or (fmt and "}" in fmt):
+        return None
+    return f"{{={expression}|{fmt}}}" if fmt else f"{{={expression}}}"
+
+
+def literal_parts(text):
+    parts = []
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            parts.append("CHAR(10)")
+        for start in range(0, len(line), MAX_LITERAL):
+            parts.append(quote(line[start:start + MAX_LITERAL]))
+    return parts
+
+
+def quote(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def render_text(template, names):
+    """Python value of text_formula(template): the text with each placeholder filled in"""
+    def fill(match):
+        value = evaluate(match.group(1), names)
+        return excel_text(value, match.group(2)) if match.group(2) else to_text(value)
+
+    return PLACEHOLDER.sub(fill, template)
+
+
+def excel_text(value, fmt):
+    """Format a number like Excel's TEXT(); supports $, #,##0 grouping, decimals and %"""
+    match = re.fullmatch(r"(\$?)(#,##)?0(?:\.(0+))?(%?)", fmt)
+    if not match:
+        raise ValueError(f"Unsupported TEXT format: {fmt!r}")
+    currency, grouping, decimals, percent = match.groups()
+
+    number = Decimal(str(value)) * (100 if percent else 1)
+    places = len(decimals or "")
+    number = number.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+    digits = f"{abs(number):,.{places}f}" if grouping else f"{abs(number):.{places}f}"
+    sign = "-" if number < 0 else ""
+    return f"{sign}{currency}{digits}{percent}"
+
+
+def to_text(value):
+    """How Excel shows a value concatenated with &: numbers in general format"""
+    if isinstance(value, str):
+        return value
+    return f"{value:.15g}"
+
+
+# ---------------------------------------------------------------------------
+# Evaluator for the supported formula subset
+# ---------------------------------------------------------------------------
+
+TOKEN = re.compile(r'\s*(?:(?P<string>"(?:[^"]|"")*")|(?P<number>\d+(?:\.\d+)?)|'
+                   r'(?P<name>[A-Za-z_][A-Za-z0-9_.]*)|(?P<op>[-+*/&(),]))')
+
+FUNCTIONS = {
+    "TEXT": lambda value, fmt: excel_text(value, fmt),
+    "CHAR": lambda code: chr(int(code)),
+    "MIN": min,
+    "MAX": max,
+    "ROUND": lambda value, places=0: float(
+        Decimal(str(value)).quantize(Decimal(1).scaleb(-int(places)), rounding=ROUND_HALF_UP)
+    ),
+}
+
+
+def tokenize(formula):
+    tokens = []
+    pos = 0
+    formula = formula.rstrip()
+    while pos < len(formula):
+        match = TOKEN.match(formula, pos)
+        if not match:
+            raise ValueError(f"Can't parse formula at {formula[pos:]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def evaluate(formula, names):
+    """Evaluate a formula (with or without the leading '=') against a dict of defined names"""
+    tokens = tokenize(formula[1:] if formula.startswith("=") else formula)
+    parser = _Parser(tokens, names)
+    value = parser.concat()
+    if parser.pos != len(tokens):
+        raise ValueError(f"Unexpected {tokens[parser.pos][1]!r} in formula {formula!r}")
+    return value
+
+
+class _Parser:
+    # Precedence, lowest first: &, then + -, then * /, then unary minus
+
+    def __init__(self, tokens, names):
+        self.tokens = tokens
+        self.names = names
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, op=None):
+        kind, text = self.peek()
+        if kind is None or (op is not None and text != op):
+            raise ValueError(f"Expected {op or 'a value'}, got {text!r}")
+        self.pos += 1
+        return kind, text
+
+    def concat(self):
+        value = self.additive()
+        while self.peek()[1] == "&":
+            self.take("&")
+            value = to_text(value) + to_text(self.additive())
+        return value
+
+    def additive(self):
+        value = self.term()
+        while self.peek()[1] in ("+", "-"):
+            _, op = self.take()
+            right = self.term()
+            value = value + right if op == "+" else value - right
+        return value
+
+    def term(self):
+        value = self.unary()
+        while self.peek()[1] in ("*", "/"):
+            _, op = self.take()
+            right = self.unary()
+            value = value * right if op == "*" else value / right
+        return value
+
+    def unary(self):
+        if self.peek()[1] == "-":
+            self.take("-")
+            return -self.unary()
+        return self.primary()
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == "number":
+            return float(text)
+        if kind == "string":
+            return text[1:-1].replace('""', '"')
+        if kind == "op" and text == "(":
+            value = self.concat()
+            self.take(")")
+            return value
+        if kind == "name":
+            if self.peek()[1] == "(":
+                return self.call(text.upper())
+            if text not in self.names:
+                raise ValueError(f"Unknown name {text!r}")
+            return self.names[text]
+        raise ValueError(f"Unexpected {text!r}")
+
+    def call(self, function):
+        if function not in FUNCTIONS:
+            raise ValueError(f"Unsupported function {function}")
+        self.take("(")
+        args = []
+        if self.peek()[1] != ")":
+            args.append(self.concat())
+            while self.peek()[1] == ",":
+                self.take(",")
+                args.append(self.concat())
+        self.take(")")
+        return FUNCTIONS[function](*args)
+
+
+# ---------------------------------------------------------------------------
+# Cached values
+# ---------------------------------------------------------------------------
+
+def add_cached_values(path, names):
+    """
+    Store the computed result next to every formula in a saved workbook.
+
+    openpyxl writes formulas without values (XlsxWriter writes 0), so
+    viewers that don't recalculate (previews, some web viewers) show empty
+    or wrong cells. This rewrites the worksheet parts of the file at path
+    in place, evaluating each formula with evaluate() against names.
+    """
+    with open(path, "rb") as f:
+        content = cached_values_bytes(f.read(), names)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def cached_values_bytes(content, names):
+    """add_cached_values() for a workbook held in memory: returns the rewritten file"""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        members = [(info, archive.read(info.filename)) for info in archive.infolist()]
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for info, payload in members:
+            if info.filename.startswith("xl/worksheets/") and info.filename.endswith(".xml"):
+                payload = cache_sheet_values(payload, names)
+            archive.writestr(info, payload)
+    return buffer.getvalue()
+
+
+def cache_sheet_values(xml, names):
+    # Keep the part's namespace prefixes when it is written back
+    for _, (prefix, uri) in ElementTree.iterparse(io.BytesIO(xml), events=("start-ns",)):
+        ElementTree.register_namespace(prefix, uri)
+
+    root = ElementTree.fromstring(xml)
+    cell_tag, formula_tag, value_tag = (f"{{{SHEET_NS}}}{tag}" for tag in ("c", "f", "v"))
+    for cell in root.iter(cell_tag):
+        formula = cell.find(formula_tag)
+        if formula is None or not formula.text:
+            continue
+
+        value = evaluate(formula.text, names)
+        for old in cell.findall(value_tag):
+            cell.remove(old)
+        if isinstance(value, str):
+            cell.set("t", "str")
+        else:
+            cell.attrib.pop("t", None)
+        ElementTree.SubElement(cell, value_tag).text = to_text(value)
+
+    return ElementTree.tostring(root, encoding="UTF-8", xml_declaration=True)
@@ -0,0 +1,395 @@
+"""
+Read an edited comparison workbook back into the dataset.
+
+Stakeholders edit the generated workbook by hand; import_workbook() reads
+the hand-edited tabs (IMPORT_TABS) back into dataset tables so those
+edits survive the next build. The workbook is opened in openpyxl
+read-only mode and each sheet is consumed as a stream of rows, walking
+the tab's sheet spec block by block the way render_sheet() wrote it:
+
+- table blocks: the header row maps columns by their header text (so
+  moved columns still import), then one record per row up to the next
+  blank or banner row;
+- banner blocks: one {text, style} object per row that only has a first
+  cell, e.g. the Action Items core message and the HIGH/MEDIUM/LOW
+  section titles. Read-only mode doesn't expose named styles or merged
+  ranges, so the style is recognised from the cell's font and fill;
+- spacer blocks: blank rows.
+
+A cell that still holds what the generator wrote keeps the value from
+the dataset file, {placeholders} included. Edited text is taken as
+typed, and an edited formula of the shape text_formula() writes is
+turned back into {=...} placeholders. A row whose text is unchanged but
+that was restyled with a row rule's style (the Action Items "completed"
+rows) gets the value that rule tests for.
+
+diff() compares imported tables with the dataset files, matching rows
+by their first field, and apply() writes the imported tables back.
+
+    python -m comparison.importer Edited.xlsx           # show the changes
+    python -m comparison.importer Edited.xlsx --apply   # and update the dataset
+"""
+
+import argparse
+import copy
+import functools
+import json
+import os
+import sys
+from datetime import date, datetime, time
+
+from openpyxl import load_workbook
+
+import create_competitor_comparison as generator
+from comparison.dataset_files import dataset_json
+from comparison.fidelity import color_rgb
+from comparison.formulas import formula_template, to_text
+from comparison.layout import DEFAULT_FONT_SIZE
+from comparison.records import row_values
+
+# The tabs people edit; the others are computed from these and the fee model
+IMPORT_TABS = ["Revenue Streams", "Quick Comparison", "Core Differentiators", "Revenue Summary", "Action Items"]
+
+BANNER_FIELDS = {"text": "Text", "style": "Style"}
+
+
+def import_workbook(path, data=None):
+    """
+    Read the IMPORT_TABS of the workbook at path into dataset tables.
+    data is the Dataset the workbook was built from (the bundled one by
+    default). Returns ({table name: rows}, [warnings]).
+    """
+    data = data if data is not None else generator.load_dataset()
+    raw = raw_tables(data)
+    specs = dict(generator.tab_specs(data))
+    tables = {}
+    warnings = []
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        for title in IMPORT_TABS:
+            if title not in wb.sheetnames:
+                warnings.append(f"{title}: sheet not found, not imported")
+                continue
+            rows = SheetRows(wb[title])
+            for block in specs[title]["blocks"]:
+                if block["type"] == "table":
+                    tables[block["rows"]] = read_table(rows, block, data, raw, title, warnings)
+                elif block["type"] == "banners":
+                    tables[block["rows"]] = read_banners(rows, block, data, raw, title, warnings)
+                else:
+                    rows.skip_blank()
+            rows.skip_blank()
+            if rows.peek() is not None:
+                warnings.append(f"{title}: rows from {rows.number + 1} on don't follow the sheet layout "
+                                f"and were not imported")
+    finally:
+        wb.close()
+    return tables, warnings
+
+
+class SheetRows:
+    """The rows of a read-only worksheet as a stream with one row of lookahead"""
+
+    def __init__(self, ws):
+        self._rows = ws.iter_rows()
+        self._next = next(self._rows, None)
+        self.number = 0   # number of the last row taken
+
+    def peek(self):
+        return self._next
+
+    def take(self):
+        row = self._next
+        self._next = next(self._rows, None)
+        self.number += 1
+        return row
+
+    def skip_blank(self):
+        while self._next is not None and is_blank(self._next):
+            self.take()
+
+
+def is_empty(value):
+    return value is None or value == ""
+
+
+def is_blank(row):
+    return all(is_empty(cell.value) for cell in row)
+
+
+def is_banner(row):
+    """A row with only a first cell, like the merged banner rows"""
+    return bool(row) and not is_empty(row[0].value) and all(is_empty(cell.value) for cell in row[1:])
+
+
+def raw_tables(data):
+    """
+    The dataset's tables as stored in its files, without placeholders
+    filled in. Rows of record tables are objects keyed by field whatever
+    their layout in the file.
+    """
+    tables = {}
+    for filename in {generator.DATASET_SCHEMA[name]["file"] for name in generator.DATASET_SCHEMA}:
+        with open(os.path.join(data.path, filename), encoding="utf-8") as f:
+            doc = json.load(f)
+        for name, schema in generator.DATASET_SCHEMA.items():
+            if schema["file"] == filename:
+                rows = doc.get(name)
+                if "record" in schema:
+                    fields = schema["record"].FIELDS
+                    rows = [dict(zip(fields, row_values(schema["record"], row))) for row in rows]
+                tables[name] = rows
+    return tables
+
+
+def file_rows(table, rows):
+    """Field-keyed rows of a table in the layout its file uses"""
+    schema = generator.DATASET_SCHEMA[table]
+    if schema.get("layout") == "list":
+        return [[row[field] for field in schema["record"].FIELDS] for row in rows]
+    return rows
+
+
+def read_table(rows, block, data, raw, title, warnings):
+    columns = block["columns"]
+    current, current_raw = data[block["rows"]], raw[block["rows"]]
+
+    if "header_style" in block:
+        header = [cell.value for cell in rows.take() or ()]
+        positions = []
+        for column in columns:
+            if column["header"] not in header:
+                raise ValueError(f"{title}: no {column['header']!r} column in header row {rows.number}")
+            positions.append(header.index(column["header"]))
+    else:
+        positions = list(range(len(columns)))
+
+    # Current records by the cell their first column was written as
+    by_key = {}
+    for i, record in enumerate(current):
+        by_key.setdefault(generator.cell_value(columns[0], record[columns[0]["key"]]), []).append(i)
+
+    records = []
+    while rows.peek() is not None and not is_blank(rows.peek()) and not is_banner(rows.peek()):
+        row = rows.take()
+        cells = [row[i] if i < len(row) else None for i in positions]
+        values = [cell.value if cell is not None else None for cell in cells]
+        matches = by_key.get(values[0])
+        index = matches.pop(0) if matches else None
+        record = new_record(block["rows"]) if index is None else copy.copy(current_raw[index])
+
+        unchanged = set()
+        for column, cell, value in zip(columns, cells, values):
+            if index is not None and value == generator.cell_value(column, current[index][column["key"]]):
+                unchanged.add(column["key"])
+                continue
+            where = f"{title} row {rows.number}, {column['header']!r}"
+            record[column["key"]] = imported_value(column, value, where, warnings)
+
+        # A restyled row with untouched text takes the value its row rule's style stands for
+        for rule in block.get("row_rules", ()):
+            if ("equals" in rule and rule["key"] in unchanged and cells[0] is not None
+                    and rule["style"] in cell_styles(cells[0]) and record[rule["key"]] != rule["equals"]):
+                record[rule["key"]] = rule["equals"]
+        records.append(record)
+    return records
+
+
+def new_record(table):
+    return {field: "" for field in generator.DATASET_SCHEMA[table]["record"].FIELDS}
+
+
+def read_banners(rows, block, data, raw, title, warnings):
+    current, current_raw = data[block["rows"]], raw[block["rows"]]
+    banners = []
+    while rows.peek() is not None and is_banner(rows.peek()):
+        cell = rows.take()[0]
+        i = len(banners)
+        if i < len(current) and cell.value == current[i].text:
+            text = current_raw[i]["text"]
+        else:
+            text = imported_value({}, cell.value, f"{title}!{cell.coordinate}", warnings)
+
+        # Keep the current style when the formatting still matches it
+        fallback = current[i].style if i < len(current) else (banners[-1]["style"] if banners else None)
+        styles = cell_styles(cell)
+        style = fallback if fallback in styles or not styles else styles[0]
+        if style is None:
+            raise ValueError(f"{title}!{cell.coordinate}: can't tell which style this banner row has")
+        banners.append({"text": text, "style": style})
+    return banners
+
+
+def imported_value(column, value, where, warnings):
+    """Dataset value for what a cell holds"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        if not value.startswith("="):
+            return value
+        if column.get("formula"):
+            return value[1:]
+        template = formula_template(value)
+        if template is None:
+            warnings.append(f"{where}: formula {value!r} can't be written as a {{=...}} placeholder; kept as typed")
+            return value
+        return template
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return to_text(value)
+
+
+@functools.lru_cache(maxsize=None)
+def style_index():
+    """Font-and-fill signature -> names of the STYLES that have it"""
+    index = {}
+    for name, style in generator.STYLES.items():
+        index.setdefault(style_signature(style.font, style.fill), []).append(name)
+    return index
+
+
+def style_signature(font, fill):
+    return (
+        bool(font.b), bool(font.i), font.sz or DEFAULT_FONT_SIZE, color_rgb(font.color),
+        color_rgb(fill.fgColor) if fill.fill_type == "solid" else None
+    )
+
+
+def cell_styles(cell):
+    """Names of the STYLES a cell's font and fill match (several styles differ only in alignment)"""
+    return style_index().get(style_signature(cell.font, cell.fill), [])
+
+
+# ---------------------------------------------------------------------------
+# Diff and write-back
+# ---------------------------------------------------------------------------
+
+def field_names(data):
+    """Table -> {field key: column header} for the imported tables"""
+    names = {}
+    for title, spec in generator.tab_specs(data):
+        if title in IMPORT_TABS:
+            for block in spec["blocks"]:
+                if block["type"] == "table":
+                    names[block["rows"]] = {column["key"]: column["header"] for column in block["columns"]}
+                elif block["type"] == "banners":
+                    names[block["rows"]] = BANNER_FIELDS
+    return names
+
+
+def row_keys(rows):
+    """Each row's first field, numbered when it repeats: [(key, occurrence)]"""
+    seen = {}
+    keys = []
+    for row in rows:
+        key = next(iter(row.values()))
+        seen[key] = seen.get(key, 0) + 1
+        keys.append((key, seen[key]))
+    return keys
+
+
+def diff(current, imported, names=None):
+    """
+    Changes from the current tables to the imported ones, as dicts with
+    "table", "change" ("added", "removed", "changed" or "reordered"),
+    "key" (the row's first field) and, for changed fields, "field", "old"
+    and "new". names maps table -> {field: display name} (see field_names()).
+    """
+    changes = []
+    for table, rows in imported.items():
+        old_rows = current[table]
+        old_keys, new_keys = row_keys(old_rows), row_keys(rows)
+        old_by_key, new_by_key = dict(zip(old_keys, old_rows)), dict(zip(new_keys, rows))
+        fields = (names or {}).get(table, {})
+
+        # An unmatched old and new row in the same position is one edited row (e.g. a renamed key)
+        renamed = {
+            new_keys[i]: old_keys[i] for i in range(min(len(old_keys), len(new_keys)))
+            if old_keys[i] not in new_by_key and new_keys[i] not in old_by_key
+        }
+        for key in old_keys:
+            if key not in new_by_key and key not in renamed.values():
+                changes.append({"table": table, "change": "removed", "key": key[0], "old": old_by_key[key]})
+        for key in new_keys:
+            if key not in old_by_key and key not in renamed:
+                changes.append({"table": table, "change": "added", "key": key[0], "new": new_by_key[key]})
+                continue
+            old_key = renamed.get(key, key)
+            old, new = old_by_key[old_key], new_by_key[key]
+            for field in old:
+                if old[field] != new[field]:
+                    changes.append({"table": table, "change": "changed", "key": old_key[0],
+                                    "field": fields.get(field, field), "old": old[field], "new": new[field]})
+
+        kept_old = [key for key in old_keys if key in new_by_key]
+        kept_new = [key for key in new_keys if key in old_by_key]
+        if kept_old != kept_new:
+            changes.append({"table": table, "change": "reordered", "key": None})
+    return changes
+
+
+def format_change(change):
+    where = f"{change['table']}: {change['key']!r}" if change["key"] is not None else change["table"]
+    if change["change"] == "changed":
+        return f"~ {where} {change['field']}: {change['old']!r} -> {change['new']!r}"
+    if change["change"] == "reordered":
+        return f"~ {where}: rows reordered"
+    return f"{'+' if change['change'] == 'added' else '-'} {where}"
+
+
+def apply(data, imported):
+    """Write the imported tables into the dataset's files; returns the paths that changed"""
+    files = {}
+    for table in imported:
+        files.setdefault(generator.DATASET_SCHEMA[table]["file"], []).append(table)
+
+    written = []
+    for filename, tables in sorted(files.items()):
+        path = os.path.join(data.path, filename)
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+        updated = dict(doc, **{table: file_rows(table, imported[table]) for table in tables})
+        if updated == doc:
+            continue
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(dataset_json(updated))
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import an edited comparison workbook back into the dataset")
+    parser.add_argument("workbook", help="the edited .xlsx file")
+    parser.add_argument("--dataset", metavar="DIR", help="dataset directory (default: data/competitor_comparison)")
+    parser.add_argument("--apply", action="store_true", help="write the imported tables to the dataset files")
+    parser.add_argument("--json", metavar="FILE", help="also write the changes as JSON")
+    args = parser.parse_args(argv)
+
+    data = generator.load_dataset(args.dataset)
+    imported, warnings = import_workbook(args.workbook, data)
+    for warning in warnings:
+        print(f"warning: {warning}", file=sys.stderr)
+
+    changes = diff(raw_tables(data), imported, field_names(data))
+    for change in changes:
+        print(format_change(change))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(changes, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    if not changes:
+        print(f"✓ No changes in {args.workbook}")
+    elif args.apply:
+        for path in apply(data, imported):
+            print(f"✓ Updated {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
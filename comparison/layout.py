@@ -0,0 +1,164 @@
+"""
+Content-aware column widths and row heights.
+
+fit() takes every cell of a sheet as (row, column, text, metrics) and
+computes, in one pass over the cells:
+
+- a width for each "auto" column: enough for each cell's longest line to
+  fit on fit_lines lines (1 for body cells; wrapped headers use 2, so
+  long headers wrap instead of widening the column) but never narrower
+  than its longest word, plus padding, clamped to [MIN_WIDTH, max_width];
+- how many lines each wrapped cell takes at its column's width, and from
+  that the height of each row.
+
+Texts are deduplicated first and their line lengths cached, so sheets
+with many repeated values (Yes/No, prices) measure each string once.
+Wrapped line counts are cached by (text, usable width) across calls.
+The per-line arithmetic runs over NumPy arrays, so the cost is linear in
+the number of cells.
+
+Widths are Excel character units (the width of "0" in 11pt Calibri);
+heights are points. Character widths are estimated, not measured from
+font files, so results are close rather than exact.
+"""
+
+import functools
+import threading
+from typing import NamedTuple
+
+import numpy as np
+
+MIN_WIDTH = 8
+DEFAULT_MAX_WIDTH = 50
+
+# Characters of slack on each side of a cell's text
+CELL_PADDING = 2
+# Points per line of 11pt text, and extra space per row
+LINE_HEIGHT = 15.0
+ROW_PADDING = 4.0
+DEFAULT_FONT_SIZE = 11
+# Bold glyphs are about this much wider
+BOLD_WIDTH = 1.1
+# Word wrapping breaks lines early; a wrapped line holds about this much of the width
+WRAP_FILL = 0.9
+
+WRAP_CACHE_SIZE = 100_000
+_wrap_cache = {}
+# Builds on other threads (e.g. the service's) clear and fill it too
+_wrap_cache_lock = threading.Lock()
+
+
+class TextMetrics(NamedTuple):
+    width_scale: float   # character width relative to 11pt regular text
+    line_height: float   # points per line
+    wrap: bool           # the cell wraps at the column width
+    fit_lines: int       # lines the text may take when sizing its column
+
+
+def text_metrics(font_size=None, bold=False, wrap=False, fit_lines=1):
+    size = font_size or DEFAULT_FONT_SIZE
+    return TextMetrics(
+        width_scale=size / DEFAULT_FONT_SIZE * (BOLD_WIDTH if bold else 1.0),
+        line_height=LINE_HEIGHT * size / DEFAULT_FONT_SIZE,
+        wrap=wrap,
+        fit_lines=fit_lines
+    )
+
+
+@functools.lru_cache(maxsize=65536)
+def measure_text(text):
+    """(lengths of each line, length of the longest word) of text"""
+    lines = text.split("\n")
+    return tuple(len(line) for line in lines), max((len(word) for word in text.split()), default=0)
+
+
+def fit(cells, widths, max_width=DEFAULT_MAX_WIDTH):
+    """
+    Column widths and row heights for a sheet.
+
+    cells is an iterable of (row, column, text, metrics) with 0-based
+    columns; widths has one entry per column, a number (kept as is) or
+    "auto". Returns (widths, heights): the final widths as a list and a
+    dict of row -> height in points for every row with cells.
+    """
+    rows, columns, keys, style_keys = [], [], [], []
+    metrics_index = {}
+    texts = {}
+    for row, column, text, metrics in cells:
+        rows.append(row)
+        columns.append(column)
+        keys.append(texts.setdefault(text, len(texts)))
+        style_keys.append(metrics_index.setdefault(metrics, len(metrics_index)))
+
+    n_columns = len(widths)
+    auto = np.array([width == "auto" for width in widths])
+    final = np.array([MIN_WIDTH if width == "auto" else width for width in widths], dtype=float)
+    if not rows:
+        return final.tolist(), {}
+
+    rows = np.array(rows)
+    columns = np.array(columns)
+    keys = np.array(keys)
+    styles = list(metrics_index)
+    style_ids = np.array(style_keys)
+    width_scale = np.array([m.width_scale for m in styles])[style_ids]
+    line_height = np.array([m.line_height for m in styles])[style_ids]
+    wrap = np.array([m.wrap for m in styles])[style_ids]
+    fit_lines = np.array([m.fit_lines for m in styles])[style_ids]
+
+    # Line lengths of every distinct text, flattened
+    measured = [measure_text(text) for text in texts]
+    line_counts = np.array([len(lines) for lines, _ in measured])
+    longest_line = np.array([max(lines) for lines, _ in measured], dtype=float)
+    longest_word = np.array([word for _, word in measured], dtype=float)
+
+    # Widths: widest content in each auto column
+    content = np.maximum(np.ceil(longest_line[keys] / fit_lines), longest_word[keys]) * width_scale + CELL_PADDING
+    need = np.zeros(n_columns)
+    np.maximum.at(need, columns, content)
+    final = np.where(auto, np.clip(np.ceil(need), MIN_WIDTH, max_width), final)
+
+    # Wrapped line counts, per distinct (text, usable width)
+    usable = np.maximum((final[columns] - CELL_PADDING) / width_scale, 1.0)
+    lines = line_counts[keys].astype(float)
+    wrapped = np.flatnonzero(wrap)
+    if wrapped.size:
+        lines[wrapped] = wrapped_line_counts(list(texts), keys[wrapped], usable[wrapped], measured)
+
+    # Heights: tallest cell in each row
+    cell_heights = lines * line_height + ROW_PADDING
+    heights = {}
+    order = np.argsort(rows, kind="stable")
+    unique_rows, starts = np.unique(rows[order], return_index=True)
+    for row, height in zip(unique_rows.tolist(), np.maximum.reduceat(cell_heights[order], starts).tolist()):
+        heights[row] = round(height, 1)
+    return final.tolist(), heights
+
+
+def wrapped_line_counts(texts, keys, usable, measured):
+    """Lines each text takes when wrapped at usable characters, using and filling the (text, width) cache"""
+    usable = np.round(usable, 2)
+    pairs = {}
+    for key, width in zip(keys.tolist(), usable.tolist()):
+        pairs.setdefault((texts[key], width), key)
+
+    with _wrap_cache_lock:
+        counts_by_pair = {pair: _wrap_cache[pair] for pair in pairs if pair in _wrap_cache}
+    missing = [pair for pair in pairs if pair not in counts_by_pair]
+    if missing:
+        # Every line of every missing pair in one array: one line if it fits,
+        # else ceil(length / filled width)
+        lengths = [measured[pairs[pair]][0] for pair in missing]
+        counts = np.array([len(lines) for lines in lengths])
+        flat = np.fromiter((n for lines in lengths for n in lines), dtype=float, count=int(counts.sum()))
+        widths = np.repeat([width for _, width in missing], counts)
+        per_line = np.where(flat <= widths, 1, np.ceil(flat / (widths * WRAP_FILL)))
+        totals = np.bincount(np.repeat(np.arange(len(missing)), counts), weights=per_line, minlength=len(missing))
+        counts_by_pair.update(zip(missing, totals.tolist()))
+
+        with _wrap_cache_lock:
+            if len(_wrap_cache) + len(missing) > WRAP_CACHE_SIZE:
+                _wrap_cache.clear()
+            _wrap_cache.update(zip(missing, totals.tolist()))
+
+    return np.array([counts_by_pair[(texts[key], width)] for key, width in zip(keys.tolist(), usable.tolist())])
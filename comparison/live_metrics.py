@@ -0,0 +1,396 @@
+"""
+Live KPIs from the dashboard's metrics history.
+
+The dashboard logs one metrics document per co-founder per day
+(isaiah_metrics and soya_metrics in Firestore, see lib/firestore.ts).
+This module reads an NDJSON export of those documents, one JSON object
+per line with its "collection" and "id" besides the document fields, as
+a pipeline of generators:
+
+    read_ndjson()  ->  metric_documents()  ->  MetricsAggregate.consume()
+
+MetricsAggregate keeps the latest version of every document (the
+dashboard updates a day's document in place, so an export can hold
+several) and per collection and day the sum and count of every numeric
+field, recomputed for a day when one of its documents arrives or is
+replaced. Sums are exact (int or math.fsum), so they don't depend on
+the order documents were read in: a run resumed from a checkpoint gives
+the same KPIs as a full read. The KPIS
+are read from those daily buckets: the last 7 days, the 7 before them,
+the last 30 days and all time, ending on the latest day in the export.
+
+Progress is checkpointed next to the export (Name.checkpoint.json): the
+byte offset read up to, a signature of the bytes before it and the
+aggregate's state. The next run over a grown export only reads the new
+lines; an export that was rewritten or truncated is read from the start.
+A last line without a newline is only read if it is complete JSON, in
+case the export is still being written.
+
+The KPIs go into the dataset's live_kpis.json (the Live KPIs tab), like
+the matching benchmark's results, so builds don't need the export. The
+bundled numbers come from the offline fixture in data/live_metrics.
+
+    python -m comparison.live_metrics EXPORT.ndjson              # print the KPIs
+    python -m comparison.live_metrics EXPORT.ndjson --write      # and store them in the dataset
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import math
+import os
+import sys
+
+import create_competitor_comparison as generator
+from comparison.dataset_files import dataset_json
+
+RESULTS_FILE = "live_kpis.json"
+FIXTURE = os.path.join(os.path.dirname(generator.DEFAULT_DATASET), "live_metrics", "fixture_metrics.ndjson")
+
+CHECKPOINT_VERSION = 1
+# Bytes at the start of the export and before the checkpoint's offset that
+# must be unchanged for a run to resume there
+SIGNATURE_BYTES = 4096
+
+# Document fields that aren't metrics, as in components/MetricsHistory.tsx
+EXCLUDED_FIELDS = {"collection", "id", "user_id", "date", "notes", "created_at", "updated_at"}
+
+# Days in the short and long KPI windows
+WEEK = 7
+MONTH = 30
+
+# (label, collection, field, aggregate, denominator field, format, scale).
+# "sum" adds the field up over the window, "mean" averages it over the
+# documents, "ratio" divides its sum by the denominator's; the result is
+# multiplied by scale (percentages are logged as 0-100).
+KPIS = [
+    ("Revenue milestones", "soya_metrics", "revenue_milestone", "sum", None, "currency", 1),
+    ("User signups", "soya_metrics", "user_signups", "sum", None, "number", 1),
+    ("Facebook ad spend", "soya_metrics", "facebook_ads_spent", "sum", None, "currency", 1),
+    ("Ad spend per signup", "soya_metrics", "facebook_ads_spent", "ratio", "user_signups", "currency", 1),
+    ("Features shipped", "soya_metrics", "features_shipped", "sum", None, "number", 1),
+    ("App uptime", "soya_metrics", "app_uptime_percentage", "mean", None, "percent", 0.01),
+    ("Onboarding completion", "soya_metrics", "onboarding_completion_rate", "mean", None, "percent", 0.01),
+    ("Retention rate", "soya_metrics", "retention_rate", "mean", None, "percent", 0.01),
+    ("Outreach contacts", "isaiah_metrics", "outreach_contacts", "sum", None, "number", 1),
+    ("Meetings scheduled", "isaiah_metrics", "meetings_scheduled", "sum", None, "number", 1),
+    ("Outreach to meeting rate", "isaiah_metrics", "meetings_scheduled", "ratio", "outreach_contacts", "percent", 1),
+    ("Partnership emails", "isaiah_metrics", "partnership_emails", "sum", None, "number", 1),
+    ("Event host outreach", "isaiah_metrics", "event_host_outreach", "sum", None, "number", 1),
+    ("Enterprise outreach", "isaiah_metrics", "enterprise_outreach", "sum", None, "number", 1),
+]
+
+COLLECTIONS = sorted({kpi[1] for kpi in KPIS})
+
+
+def read_ndjson(path, offset=0):
+    """
+    Yield (offset after the line, document) for every line of the NDJSON
+    file at path from byte offset on. Raises ValueError for a line that
+    isn't a JSON object.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            start, offset = offset, offset + len(line)
+            if not line.strip():
+                continue
+            try:
+                doc = json.loads(line)
+            except ValueError as e:
+                if not line.endswith(b"\n"):
+                    # Still being written: leave it for the next run
+                    return
+                raise ValueError(f"{path}: invalid JSON at byte {start}: {e}") from None
+            if not isinstance(doc, dict):
+                raise ValueError(f"{path}: expected a JSON object at byte {start}")
+            yield offset, doc
+
+
+def timestamp(value):
+    """
+    Seconds since the epoch of an exported Firestore timestamp: an ISO
+    string, a number, or {"_seconds", "_nanoseconds"} / {"seconds",
+    "nanoseconds"}. 0 if there is none.
+    """
+    if isinstance(value, dict):
+        seconds = value.get("_seconds", value.get("seconds", 0))
+        return seconds + value.get("_nanoseconds", value.get("nanoseconds", 0)) / 1e9
+    if isinstance(value, str):
+        moment = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=datetime.timezone.utc)
+        return moment.timestamp()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return 0
+
+
+def metric_documents(lines, collections=COLLECTIONS):
+    """
+    Yield (offset, key, collection, updated, day, metrics) for the
+    documents of collections among lines from read_ndjson(); metrics holds
+    the numeric fields. Documents without an id are keyed as the dashboard
+    names them, by user and date.
+    """
+    for offset, doc in lines:
+        collection = doc.get("collection")
+        if collection not in collections:
+            continue
+        day = doc.get("date")
+        if not isinstance(day, str):
+            raise ValueError(f"{collection} document {doc.get('id')!r} has no date")
+        datetime.date.fromisoformat(day)
+        key = f"{collection}/{doc.get('id') or doc.get('user_id', '') + '_' + day}"
+        metrics = {
+            field: value for field, value in doc.items()
+            if field not in EXCLUDED_FIELDS and isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+        yield offset, key, collection, timestamp(doc.get("updated_at")), day, metrics
+
+
+def exact_sum(values):
+    """
+    Sum of values that doesn't depend on their order: int arithmetic, or
+    math.fsum (correctly rounded) once there is a float
+    """
+    return sum(values) if all(isinstance(value, int) for value in values) else math.fsum(values)
+
+
+class MetricsAggregate:
+    """Daily sums and counts of every metric field per collection, kept up to date document by document"""
+
+    def __init__(self):
+        # key -> [updated, collection, day, metrics] of the latest version
+        self.documents = {}
+        # (collection, day) -> {key: metrics} of the documents of that day
+        self.day_documents = {}
+        # (collection, day) -> {field: [sum, count]}, recomputed from day_documents
+        self.days = {}
+        self.records = 0
+
+    def _update(self, collection, day):
+        """
+        Recompute a day's bucket from its documents. Running totals adjusted
+        by + and - would depend on the order documents arrived in, and a run
+        resumed from a checkpoint would differ from a full read.
+        """
+        documents = self.day_documents.get((collection, day))
+        if not documents:
+            self.day_documents.pop((collection, day), None)
+            self.days.pop((collection, day), None)
+            return
+        fields = {}
+        for metrics in documents.values():
+            for field, value in metrics.items():
+                fields.setdefault(field, []).append(value)
+        self.days[(collection, day)] = {field: [exact_sum(values), len(values)] for field, values in fields.items()}
+
+    def add(self, key, collection, updated, day, metrics):
+        """Add a document version; an older version than the one held is ignored. Returns True if it was used."""
+        self.records += 1
+        previous = self.documents.get(key)
+        if previous is not None:
+            # Equal times: the later line wins, as in the export's order
+            if previous[0] > updated:
+                return False
+            _, previous_collection, previous_day, _ = previous
+            del self.day_documents[(previous_collection, previous_day)][key]
+            self._update(previous_collection, previous_day)
+        self.documents[key] = [updated, collection, day, metrics]
+        self.day_documents.setdefault((collection, day), {})[key] = metrics
+        self._update(collection, day)
+        return True
+
+    def consume(self, documents):
+        """Add everything from metric_documents(); returns the offset after the last line read, or None"""
+        offset = None
+        for offset, *document in documents:
+            self.add(*document)
+        return offset
+
+    def span(self):
+        """(first day, last day) with metrics, or (None, None)"""
+        days = [day for _, day in self.days]
+        return (min(days), max(days)) if days else (None, None)
+
+    def total(self, collection, field, first=None, last=None):
+        """[sum, count] of a field over the days from first to last (ISO dates, inclusive)"""
+        sums, count = [], 0
+        for (bucket_collection, day), bucket in self.days.items():
+            if (bucket_collection == collection and field in bucket
+                    and (first is None or day >= first) and (last is None or day <= last)):
+                sums.append(bucket[field][0])
+                count += bucket[field][1]
+        return [exact_sum(sums), count]
+
+    def to_state(self):
+        return {"records": self.records, "documents": self.documents}
+
+    @classmethod
+    def from_state(cls, state):
+        aggregate = cls()
+        aggregate.records = state["records"]
+        for key, (updated, collection, day, metrics) in state["documents"].items():
+            aggregate.documents[key] = [updated, collection, day, metrics]
+            aggregate.day_documents.setdefault((collection, day), {})[key] = metrics
+        for collection, day in aggregate.day_documents:
+            aggregate._update(collection, day)
+        return aggregate
+
+
+def kpi_value(aggregate, kpi, first=None, last=None):
+    """One of KPIS over the days from first to last, or None without the data for it"""
+    _, collection, field, how, denominator, _, scale = kpi
+    value, count = aggregate.total(collection, field, first, last)
+    if how == "mean":
+        value = value / count if count else None
+    elif how == "ratio":
+        divisor = aggregate.total(collection, denominator, first, last)[0]
+        value = value / divisor if divisor else None
+    return None if value is None else round(value * scale, 4)
+
+
+def kpi_rows(aggregate, kpis=KPIS):
+    """A live_kpis row per KPI: the windows ending on the latest day in the data, and all time"""
+    _, last = aggregate.span()
+    rows = []
+    for kpi in kpis:
+        if last is None:
+            windows = [None, None, None]
+        else:
+            end = datetime.date.fromisoformat(last)
+
+            def window(days, ago=0):
+                first = end - datetime.timedelta(days=ago + days - 1)
+                return kpi_value(aggregate, kpi, first.isoformat(), (end - datetime.timedelta(days=ago)).isoformat())
+
+            windows = [window(WEEK), window(WEEK, WEEK), window(MONTH)]
+        week, previous, month = windows
+        change = round(week / previous - 1, 4) if week is not None and previous else None
+        rows.append({
+            "kpi": kpi[0],
+            "format": kpi[5],
+            "last_week": week,
+            "previous_week": previous,
+            "change": change,
+            "last_month": month,
+            "all_time": kpi_value(aggregate, kpi),
+        })
+    return rows
+
+
+def notes(aggregate, source):
+    """Banner rows describing where the KPIs come from"""
+    first, last = aggregate.span()
+    through = f"{first} to {last}" if first else "no dated documents"
+    return [
+        ["LIVE KPIS", "title"],
+        [f"From {os.path.basename(source)}: {len(aggregate.documents):,} metrics documents, {through}", "message"],
+        [f"Last {WEEK} and {MONTH} days end on the latest day in the export; "
+         f"change is the last {WEEK} days against the {WEEK} before", "message"],
+    ]
+
+
+def checkpoint_path(export):
+    return os.path.splitext(export)[0] + ".checkpoint.json"
+
+
+def signature(path, offset):
+    """Hash of the first SIGNATURE_BYTES of the file and the SIGNATURE_BYTES before offset"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read(min(offset, SIGNATURE_BYTES)))
+        f.seek(max(0, offset - SIGNATURE_BYTES))
+        digest.update(f.read(min(offset, SIGNATURE_BYTES)))
+    return digest.hexdigest()
+
+
+def read_checkpoint(path, export):
+    """(offset, MetricsAggregate) to resume the export from, or (0, an empty one) if the checkpoint doesn't apply"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return 0, MetricsAggregate()
+    offset = checkpoint.get("offset", 0)
+    if (checkpoint.get("version") != CHECKPOINT_VERSION or offset > os.path.getsize(export)
+            or checkpoint.get("signature") != signature(export, offset)):
+        return 0, MetricsAggregate()
+    return offset, MetricsAggregate.from_state(checkpoint["state"])
+
+
+def write_checkpoint(path, export, offset, aggregate):
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "offset": offset,
+        "signature": signature(export, offset),
+        "state": aggregate.to_state(),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, separators=(",", ":"))
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def ingest(export, checkpoint=None, resume=True):
+    """
+    Read the export from its checkpoint on (from the start if resume is
+    False) and save the new checkpoint. Returns (MetricsAggregate, offset
+    resumed from, document lines read).
+    """
+    checkpoint = checkpoint or checkpoint_path(export)
+    start, aggregate = read_checkpoint(checkpoint, export) if resume else (0, MetricsAggregate())
+    records = aggregate.records
+    position = [start]
+
+    def lines():
+        # Lines of other collections move the checkpoint on too
+        for offset, doc in read_ndjson(export, start):
+            position[0] = offset
+            yield offset, doc
+
+    aggregate.consume(metric_documents(lines()))
+    write_checkpoint(checkpoint, export, position[0], aggregate)
+    return aggregate, start, aggregate.records - records
+
+
+def write_results(aggregate, source, dataset=generator.DEFAULT_DATASET):
+    """Store the KPIs (and the notes) in the dataset's RESULTS_FILE; returns its path"""
+    path = os.path.join(dataset, RESULTS_FILE)
+    doc = {"version": generator.DATASET_VERSION, "live_kpi_notes": notes(aggregate, source),
+           "live_kpis": kpi_rows(aggregate)}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(dataset_json(doc))
+    os.replace(tmp_path, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate an NDJSON export of the dashboard's metrics into KPIs")
+    parser.add_argument("export", nargs="?", default=FIXTURE,
+                        help="NDJSON export of the metrics collections (default: the offline fixture)")
+    parser.add_argument("--checkpoint", metavar="FILE", help="checkpoint file (default: next to the export)")
+    parser.add_argument("--full", action="store_true", help="ignore the checkpoint and read the whole export")
+    parser.add_argument("--write", action="store_true",
+                        help=f"store the KPIs in the dataset's {RESULTS_FILE} for the Live KPIs tab")
+    parser.add_argument("--dataset", metavar="DIR", default=generator.DEFAULT_DATASET,
+                        help="dataset directory --write updates (default: data/competitor_comparison)")
+    args = parser.parse_args(argv)
+
+    aggregate, start, records = ingest(args.export, args.checkpoint, resume=not args.full)
+    print(f"  {records:,} new document lines from byte {start:,}; "
+          f"{len(aggregate.documents):,} documents in total", file=sys.stderr)
+    for row in kpi_rows(aggregate):
+        print(f"  {row['kpi']:<26} {WEEK}d {row['last_week']!s:>10}  previous {row['previous_week']!s:>10}  "
+              f"{MONTH}d {row['last_month']!s:>10}  all {row['all_time']!s:>10}", file=sys.stderr)
+    if args.write:
+        print(f"✓ Updated {write_results(aggregate, args.export, args.dataset)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
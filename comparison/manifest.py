@@ -0,0 +1,138 @@
+"""
+Build manifests: what a workbook was built from.
+
+A manifest is saved next to each workbook (Name.manifest.json). It
+records a hash per tab of the tab's spec and tables, which the generator
+uses to report what changed, and two hashes that answer "is the workbook
+stale?" on their own:
+
+- "inputs": the generator's source files, the openpyxl version, the
+  dataset's JSON files and the build options;
+- "output": the workbook file as written.
+
+Both can be recomputed from files alone, so this module only uses the
+standard library: `python -m comparison check` answers without importing
+openpyxl or NumPy, or loading the dataset.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+
+from comparison.reproducible import build_timestamp
+
+PACKAGE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(PACKAGE)
+GENERATOR = os.path.join(ROOT, "create_competitor_comparison.py")
+
+OUTPUT_FILE = "SponsorSynq_Competitor_Comparison.xlsx"
+DEFAULT_DATASET = os.path.join(ROOT, "data", "competitor_comparison")
+
+
+def to_json(obj):
+    """comparison.records.to_json(), imported on first use: check only hashes plain data"""
+    from comparison.records import to_json
+    return to_json(obj)
+
+
+def content_hash(obj):
+    """sha256 of the canonical JSON form of obj"""
+    text = json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=to_json)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def source_hashes():
+    """Hashes of the generator script and every module of the comparison package"""
+    sources = [GENERATOR] + sorted(
+        os.path.join(PACKAGE, name) for name in os.listdir(PACKAGE) if name.endswith(".py")
+    )
+    return [file_hash(path) for path in sources]
+
+
+def library_version(name):
+    """
+    The installed version of a library, from its .dist-info directory so
+    the library isn't imported (importlib.metadata alone takes longer
+    than the whole check)
+    """
+    spec = importlib.util.find_spec(name)
+    if spec and spec.origin:
+        site = os.path.dirname(os.path.dirname(spec.origin))
+        prefix = name.lower() + "-"
+        for entry in os.listdir(site):
+            if entry.lower().startswith(prefix) and entry.endswith(".dist-info"):
+                return entry[len(prefix):-len(".dist-info")]
+    from importlib.metadata import version
+    return version(name)
+
+
+def dataset_hashes(path):
+    """[file name, hash] for every JSON file in a dataset directory"""
+    return [[name, file_hash(os.path.join(path, name))]
+            for name in sorted(os.listdir(path)) if name.endswith(".json")]
+
+
+# Libraries that can write the workbook (see comparison.backends); named
+# here so the command line can offer them without importing either
+BACKENDS = ("openpyxl", "xlsxwriter")
+
+
+def build_options(backend="openpyxl", cached_values=False, reproducible=False):
+    """The options a manifest records: the ones that change the file written"""
+    timestamp = build_timestamp() if reproducible else None
+    return {
+        "cached_values": cached_values,
+        "backend": backend,
+        "reproducible": timestamp.isoformat() if timestamp else False
+    }
+
+
+def inputs_hash(dataset, options):
+    """Hash of everything a build of the dataset directory with options reads"""
+    return content_hash([source_hashes(), library_version("openpyxl"), dataset_hashes(dataset), options])
+
+
+def manifest_path(output):
+    return os.path.splitext(output)[0] + ".manifest.json"
+
+
+def read_manifest(path):
+    """Return the manifest stored at path, or None if there isn't a readable one"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(manifest, output):
+    manifest = dict(manifest, output=file_hash(output))
+    path = manifest_path(output)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def stale_reason(output, dataset, options):
+    """
+    Why the workbook at output needs rebuilding from the dataset directory
+    with options, or None if its manifest shows it is up to date.
+    """
+    manifest = read_manifest(manifest_path(output))
+    if manifest is None:
+        return "no manifest"
+    if not os.path.exists(output):
+        return "no workbook"
+    if manifest.get("output") != file_hash(output):
+        return "workbook modified since it was built"
+    if manifest.get("inputs") != inputs_hash(dataset, options):
+        return "inputs changed"
+    return None
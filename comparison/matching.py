@@ -0,0 +1,208 @@
+"""
+Sponsor-host matching benchmark on a synthetic marketplace.
+
+synthetic_marketplace() generates N sponsors and M events with the
+attributes matching works from: a sponsor's interest in each event
+category, budget, minimum audience and the regions it covers; an event's
+category mix, expected attendance, sponsorship ask and region. score()
+is the baseline matching pass, vectorized over a batch of events against
+every sponsor:
+
+    score = category affinity x budget fit, or 0 where the sponsor
+            doesn't cover the event's region or audience size
+
+and top_matches() keeps the best TOP_K sponsors per event.
+
+benchmark() times a full pass over all events (in batches of BATCH
+events) for throughput, and single-event queries for latency
+percentiles. The results go into the dataset's matching_performance.json
+(the Matching Performance tab), so builds stay fast and reproducible;
+rerun this to refresh the numbers after changing the matcher or the
+machine it is sized for.
+
+    python -m comparison.matching                 # print the results
+    python -m comparison.matching --write         # and store them in the dataset
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+import create_competitor_comparison as generator
+from comparison.dataset_files import dataset_json
+
+CATEGORIES = 12
+REGIONS = 8
+TOP_K = 10
+
+# Events scored per batch in the full pass
+BATCH = 256
+
+# Single-event queries timed for the latency percentiles
+QUERIES = 200
+
+# (sponsors, events) measured by default
+SCALES = [(100, 1_000), (1_000, 10_000), (5_000, 20_000), (10_000, 50_000)]
+
+# The dataset file the results are stored in
+RESULTS_FILE = "matching_performance.json"
+
+
+def synthetic_marketplace(n_sponsors, n_events, seed=0):
+    """(sponsors, events): dicts of attribute arrays, the same for the same seed"""
+    rng = np.random.default_rng(seed)
+    regions = rng.random((n_sponsors, REGIONS)) < 0.3
+    regions[np.arange(n_sponsors), rng.integers(0, REGIONS, n_sponsors)] = True
+    sponsors = {
+        "interests": rng.dirichlet(np.full(CATEGORIES, 0.3), n_sponsors).astype(np.float32),
+        "budget": rng.lognormal(np.log(500), 1.0, n_sponsors).astype(np.float32),
+        "min_audience": rng.choice(np.array([0, 50, 100, 250, 500], np.float32), n_sponsors),
+        # region x sponsor, so an event's row is one lookup
+        "covers": np.ascontiguousarray(regions.T),
+    }
+    events = {
+        "categories": rng.dirichlet(np.full(CATEGORIES, 0.2), n_events).astype(np.float32),
+        "attendance": rng.lognormal(np.log(150), 0.8, n_events).astype(np.float32),
+        "ask": rng.lognormal(np.log(400), 0.7, n_events).astype(np.float32),
+        "region": rng.integers(0, REGIONS, n_events),
+    }
+    return sponsors, events
+
+
+def event_slice(events, start, stop):
+    return {name: values[start:stop] for name, values in events.items()}
+
+
+def score(sponsors, events):
+    """(events x sponsors) match scores between 0 and 1"""
+    affinity = events["categories"] @ sponsors["interests"].T
+    budget_fit = np.minimum(sponsors["budget"][None, :] / events["ask"][:, None], 1)
+    eligible = sponsors["covers"][events["region"]]
+    eligible &= events["attendance"][:, None] >= sponsors["min_audience"][None, :]
+    return np.where(eligible, affinity * budget_fit, 0)
+
+
+def top_matches(scores, k=TOP_K):
+    """(sponsor indices, scores) of the k best sponsors per event, best first"""
+    k = min(k, scores.shape[1])
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-top, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+
+def match(sponsors, events, k=TOP_K, batch=BATCH):
+    """Top matches for every event, scored batch events at a time"""
+    n_events = len(events["region"])
+    indices, scores = [], []
+    for start in range(0, n_events, batch):
+        batch_indices, batch_scores = top_matches(score(sponsors, event_slice(events, start, start + batch)), k)
+        indices.append(batch_indices)
+        scores.append(batch_scores)
+    return np.concatenate(indices), np.concatenate(scores)
+
+
+def benchmark(n_sponsors, n_events, k=TOP_K, batch=BATCH, queries=QUERIES, seed=0):
+    """Throughput of a full pass and latency percentiles of single-event queries, as a result row"""
+    sponsors, events = synthetic_marketplace(n_sponsors, n_events, seed)
+
+    start = time.perf_counter()
+    match(sponsors, events, k, batch)
+    seconds = time.perf_counter() - start
+
+    latencies = []
+    for i in np.random.default_rng(seed).choice(n_events, min(queries, n_events), replace=False):
+        query = event_slice(events, i, i + 1)
+        start = time.perf_counter()
+        top_matches(score(sponsors, query), k)
+        latencies.append(time.perf_counter() - start)
+    p50, p95, p99 = (float(value) * 1000 for value in np.percentile(latencies, [50, 95, 99]))
+
+    pairs = n_sponsors * n_events
+    return {
+        "sponsors": n_sponsors,
+        "events": n_events,
+        "pairs": pairs,
+        "seconds": round(seconds, 4),
+        "pairs_per_second": round(pairs / seconds),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+    }
+
+
+def notes(k=TOP_K):
+    """Banner rows describing what was measured, and where"""
+    return [
+        ["SPONSOR-HOST MATCHING PERFORMANCE", "title"],
+        [f"Top {k} sponsors per event by interest, budget, audience and region (synthetic data)", "message"],
+        [f"Measured {date.today().isoformat()}: Python {platform.python_version()}, NumPy {np.__version__}, "
+         f"{platform.machine() or 'unknown'}, {os.cpu_count()} CPU", "message"],
+    ]
+
+
+def run(scales=SCALES, k=TOP_K, quiet=False):
+    results = []
+    for n_sponsors, n_events in scales:
+        result = benchmark(n_sponsors, n_events, k)
+        results.append(result)
+        if not quiet:
+            print(f"  {n_sponsors:>7,} sponsors x {n_events:>7,} events  {result['seconds']:8.3f}s  "
+                  f"{result['pairs_per_second']:>13,} pairs/s  p50 {result['p50_ms']:.3f} ms  "
+                  f"p95 {result['p95_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms", file=sys.stderr)
+    return results
+
+
+def write_results(results, dataset=generator.DEFAULT_DATASET, k=TOP_K):
+    """Store results (and the notes) in the dataset's RESULTS_FILE; returns its path"""
+    path = os.path.join(dataset, RESULTS_FILE)
+    doc = {"version": generator.DATASET_VERSION, "matching_notes": notes(k), "matching_results": results}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(dataset_json(doc))
+    os.replace(tmp_path, path)
+    return path
+
+
+def parse_scales(text):
+    """Parse --scales: "100x1000,1000x10000" -> [(100, 1000), (1000, 10000)]"""
+    scales = []
+    for item in text.split(","):
+        sponsors, _, events = item.strip().lower().partition("x")
+        if not (sponsors.isdigit() and events.isdigit()):
+            raise argparse.ArgumentTypeError(f"expected SPONSORSxEVENTS, got {item!r}")
+        scales.append((int(sponsors), int(events)))
+    return scales
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sponsor-host matching on a synthetic marketplace")
+    parser.add_argument("--scales", type=parse_scales, default=SCALES,
+                        help="comma-separated SPONSORSxEVENTS sizes (default: "
+                             + ",".join(f"{s}x{e}" for s, e in SCALES) + ")")
+    parser.add_argument("--top", type=int, default=TOP_K, help=f"matches kept per event (default: {TOP_K})")
+    parser.add_argument("--write", action="store_true",
+                        help=f"store the results in the dataset's {RESULTS_FILE} for the Matching Performance tab")
+    parser.add_argument("--dataset", metavar="DIR", default=generator.DEFAULT_DATASET,
+                        help="dataset directory --write updates (default: data/competitor_comparison)")
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.scales, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    if args.write:
+        print(f"✓ Updated {write_results(results, args.dataset, args.top)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
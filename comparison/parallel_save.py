@@ -0,0 +1,154 @@
+"""
+Save an openpyxl workbook with its worksheets serialized in parallel.
+
+wb.save() writes every worksheet's XML part one after another, and
+openpyxl builds that XML in pure Python (without lxml), so threads don't
+help: the GIL serializes them. parallel_save() forks worker processes
+instead. Each one inherits the workbook (no pickling) and returns one
+sheet's XML; the parent then writes the zip exactly as wb.save() does,
+in the same part order and with the same styles.xml, taking the sheets'
+XML from the workers.
+
+openpyxl assigns a cell's style index, and a conditional format's
+differential style index, the first time a sheet is written, so a
+worker would register new ones in its own copy of the workbook only.
+prepare() registers them all in the parent first, in the order wb.save()
+would, which gives every process the same indexes and keeps the output
+identical to wb.save(). There is no shared-strings table to merge:
+openpyxl writes strings inline in each sheet.
+
+Workbooks that need anything parallel_save() doesn't handle (write-only
+mode, chartsheets, charts, images, tables, pivots, comments or
+hyperlinks), platforms without fork, and workers=1 all fall back to
+wb.save(). A save is never faster than its largest sheet, and the
+workers only pay off once the sheets are big: forking and sending the
+XML back costs a few milliseconds per sheet.
+"""
+
+import datetime
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from openpyxl.cell.cell import Cell
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.packaging.relationship import RelationshipList
+from openpyxl.styles.differential import DifferentialStyle
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.writer.excel import ExcelWriter
+
+# The workbook being saved, read by the forked workers
+_workbook = None
+
+
+def can_fork():
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def supported(wb):
+    """True if parallel_save() can write wb itself rather than falling back to wb.save()"""
+    if wb.write_only or wb.chartsheets:
+        return False
+    return not any(ws._charts or ws._images or ws._tables or ws._pivots or ws.legacy_drawing
+                   for ws in wb.worksheets)
+
+
+def prepare(wb):
+    """
+    Register every style and differential style index the worksheets use,
+    in wb.save() order. Returns False if a cell has a comment or hyperlink
+    (which the sheet writer turns into extra parts), else True.
+    """
+    # Most cells share a handful of styles: only look up the new ones
+    seen = set()
+
+    def register(style):
+        key = tuple(style)
+        if key not in seen:
+            seen.add(key)
+            wb._cell_styles.add(style)
+
+    no_dxf = DifferentialStyle()
+    for ws in wb.worksheets:
+        for dim in ws.column_dimensions.values():
+            dim.style_id
+        # Row by row, each row's own style before its cells', as WorksheetWriter.write_row()
+        dims = ws.row_dimensions
+        rows = defaultdict(list)
+        for (row, _), cell in sorted(ws._cells.items()):
+            rows[row].append(cell)
+        for row in sorted(rows.keys() | dims.keys()):
+            if row in dims:
+                dims[row].style_id
+            for cell in rows.get(row, ()):
+                if type(cell) is Cell and (cell._comment is not None or cell._hyperlink is not None):
+                    return False
+                # Cell.has_style
+                if cell._style is not None and any(cell._style):
+                    register(cell._style)
+        for cf in ws.conditional_formatting:
+            for rule in cf.rules:
+                if rule.dxf and rule.dxf != no_dxf:
+                    rule.dxfId = wb._differential_styles.add(rule.dxf)
+    return True
+
+
+def _sheet_xml(index):
+    """Worker: the XML part of the index-th worksheet of _workbook"""
+    writer = WorksheetWriter(_workbook.worksheets[index], out=BytesIO())
+    writer.write()
+    return writer.read()
+
+
+def serialize_sheets(wb, workers):
+    """The worksheets' XML parts, in sheet order, written by workers forked processes"""
+    global _workbook
+    sheets = wb.worksheets
+    # Biggest sheets first, so a big one doesn't start last
+    order = sorted(range(len(sheets)), key=lambda i: -len(sheets[i]._cells))
+    _workbook = wb
+    try:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            futures = {i: pool.submit(_sheet_xml, i) for i in order}
+            return [futures[i].result() for i in range(len(sheets))]
+    finally:
+        _workbook = None
+
+
+class _ParallelExcelWriter(ExcelWriter):
+    """ExcelWriter that takes the worksheet parts from serialize_sheets()"""
+
+    def __init__(self, workbook, archive, parts):
+        super().__init__(workbook, archive)
+        self.parts = parts
+
+    def write_worksheet(self, ws):
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+        ws._hyperlinks = []
+        ws._comments = []
+        ws._rels = RelationshipList()
+        self._archive.writestr(ws.path[1:], self.parts[ws._id - 1])
+        self.manifest.append(ws)
+
+
+def parallel_save(wb, target, workers=None):
+    """
+    Save wb to target (a path or binary file object) like wb.save(), with
+    the worksheets serialized by up to workers processes (default: one per
+    CPU). Falls back to wb.save() when that can't help or isn't supported.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(wb.worksheets))
+    if workers < 2 or not can_fork() or not supported(wb) or not prepare(wb):
+        wb.save(target)
+        return
+
+    parts = serialize_sheets(wb, workers)
+    # As openpyxl.writer.excel.save_workbook()
+    archive = ZipFile(target, "w", ZIP_DEFLATED, allowZip64=True)
+    wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    _ParallelExcelWriter(wb, archive, parts).save()
@@ -0,0 +1,181 @@
+"""
+Opt-in phase profiling for the generator.
+
+While a Profiler is running, phase(name) blocks record their wall time
+in a tree (build > tab: Revenue Streams > styles, ...), and the renderer
+counts the rows, cells, merges and named-style uses of every sheet. When
+no Profiler is running, phase() returns a shared no-op context, so the
+hooks cost next to nothing in normal builds.
+
+Profiler.write() saves:
+
+- <prefix>.profile.json: the phase tree and per-sheet counts
+- <prefix>.stacks.txt: the phase tree as collapsed stacks
+  ("build;tab: Scenario Sweep;styles 12345", self time in microseconds),
+  which flamegraph.pl, speedscope and inferno read directly
+- <prefix>.prof: a cProfile dump, when the Profiler was created with
+  cprofile=True (open it with pstats or snakeviz)
+
+Set SPONSORSYNQ_PROFILE=1 to profile builds without changing code, or
+SPONSORSYNQ_PROFILE=cprofile to also collect the cProfile dump.
+"""
+
+import cProfile
+import json
+import os
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+ENV_VAR = "SPONSORSYNQ_PROFILE"
+
+_NO_PHASE = nullcontext()
+_active = None
+
+
+def active():
+    """The running Profiler, or None when profiling is off"""
+    return _active
+
+
+def phase(name):
+    """Context manager timing a block as a phase of the running Profiler (a no-op when there isn't one)"""
+    return _NO_PHASE if _active is None else _active.phase(name)
+
+
+def from_env():
+    """Profiler settings requested through SPONSORSYNQ_PROFILE: None, "phases" or "cprofile" """
+    value = os.environ.get(ENV_VAR, "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    return "cprofile" if value == "cprofile" else "phases"
+
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        parent = self.profiler._stack[-1]
+        # Repeated phases (e.g. one per row) accumulate into one node
+        node = parent["children"].get(self.name)
+        if node is None:
+            node = parent["children"][self.name] = {"seconds": 0.0, "calls": 0, "children": {}}
+        node["calls"] += 1
+        self.node = node
+        self.profiler._stack.append(node)
+        self.start = time.perf_counter()
+        return node
+
+    def __exit__(self, *exc):
+        self.node["seconds"] += time.perf_counter() - self.start
+        self.profiler._stack.pop()
+        return False
+
+
+class Profiler:
+    """Phase timer and sheet counter; use as a context manager around a build"""
+
+    def __init__(self, cprofile=False):
+        self.root = {"seconds": 0.0, "calls": 1, "children": {}}
+        self._stack = [self.root]
+        self.sheets = {}
+        self._cprofile = cProfile.Profile() if cprofile else None
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("A Profiler is already running")
+        _active = self
+        self._start = time.perf_counter()
+        if self._cprofile:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        if self._cprofile:
+            self._cprofile.disable()
+        self.root["seconds"] = time.perf_counter() - self._start
+        _active = None
+        return False
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def sheet(self, title):
+        """Counters for one sheet"""
+        if title not in self.sheets:
+            self.sheets[title] = {"rows": 0, "cells": 0, "merges": 0, "styles": Counter()}
+        return self.sheets[title]
+
+    def count_row(self, title, cells):
+        """Count an appended row of (value, style name) cells"""
+        sheet = self.sheet(title)
+        sheet["rows"] += 1
+        sheet["cells"] += len(cells)
+        sheet["styles"].update(style for _, style in cells)
+
+    def count_merge(self, title):
+        self.sheet(title)["merges"] += 1
+
+    def report(self):
+        """The phase tree and sheet counts as plain data"""
+        def node(name, data):
+            return {
+                "name": name,
+                "seconds": round(data["seconds"], 6),
+                "calls": data["calls"],
+                "children": [node(child, value) for child, value in data["children"].items()],
+            }
+
+        sheets = {
+            title: dict(counts, styles=dict(counts["styles"].most_common()))
+            for title, counts in self.sheets.items()
+        }
+        return {"phases": node("build", self.root), "sheets": sheets}
+
+    def stacks(self):
+        """Collapsed stack lines, "a;b;c <self time in microseconds>" """
+        lines = []
+
+        def walk(path, data):
+            child_time = sum(child["seconds"] for child in data["children"].values())
+            self_us = round(max(data["seconds"] - child_time, 0.0) * 1e6)
+            if self_us:
+                lines.append(f"{';'.join(path)} {self_us}")
+            for name, child in data["children"].items():
+                walk(path + [name.replace(";", ",")], child)
+
+        walk(["build"], self.root)
+        return lines
+
+    def summary(self):
+        """Human-readable phase times and sheet counts"""
+        lines = []
+
+        def walk(name, data, depth):
+            calls = f" ({data['calls']:,} calls)" if data["calls"] > 1 else ""
+            lines.append(f"{'  ' * depth}{name:<{40 - 2 * depth}} {data['seconds']:9.4f}s{calls}")
+            for child, value in data["children"].items():
+                walk(child, value, depth + 1)
+
+        walk("build", self.root, 0)
+        for title, counts in self.sheets.items():
+            lines.append(f"{title}: {counts['rows']:,} rows, {counts['cells']:,} cells, "
+                         f"{counts['merges']:,} merges, {len(counts['styles'])} styles")
+        return "\n".join(lines)
+
+    def write(self, prefix):
+        """Save the report files next to prefix and return their paths"""
+        paths = [prefix + ".profile.json", prefix + ".stacks.txt"]
+        with open(paths[0], "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+            f.write("\n")
+        with open(paths[1], "w", encoding="utf-8") as f:
+            f.write("\n".join(self.stacks()) + "\n")
+        if self._cprofile:
+            paths.append(prefix + ".prof")
+            self._cprofile.dump_stats(paths[2])
+        return paths
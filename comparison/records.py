@@ -0,0 +1,158 @@
+"""
+Typed rows for the dataset tables.
+
+Each table's rows are a record type: a slotted dataclass declared with
+@record, whose fields are read by name (row.winner or row["winner"]) or
+by position (row[3]) and unpacked like a tuple (text, style = banner).
+Sheet specs name the fields they show, so a reordered file or a missing
+column is reported when the table is loaded instead of showing up as a
+value in the wrong column.
+
+RecordTable holds a table's rows column by column: one list per field
+rather than one object per row, which keeps large tables small (a
+100k-row table costs a handful of lists instead of 100k dicts). Rows are
+validated as they are added, iterating yields records, and column()
+returns a field's values for code that works a column at a time.
+
+    @record
+    class Comparison(Record):
+        feature: str
+        winner: str
+
+    table = RecordTable.from_rows(Comparison, [["Fees", "Tie"]])
+    table[0].winner, table.column("feature")
+"""
+
+import dataclasses
+import functools
+from collections.abc import Sequence
+
+
+class Record:
+    """Base class of the record types: field access by name or position"""
+
+    __slots__ = ()
+
+    # Set by @record
+    FIELDS = ()
+    TYPES = {}
+
+    def __getitem__(self, key):
+        return getattr(self, key if isinstance(key, str) else self.FIELDS[key])
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def to_json(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+def record(cls):
+    """Class decorator turning a Record subclass with annotated fields into a slotted dataclass"""
+    cls = dataclasses.dataclass(slots=True)(cls)
+    cls.FIELDS = tuple(field.name for field in dataclasses.fields(cls))
+    cls.TYPES = {field.name: field.type for field in dataclasses.fields(cls)}
+    return cls
+
+
+@functools.lru_cache(maxsize=None)
+def positional_record(name, fields):
+    """An untyped record type with the given field names, for computed tables"""
+    return record(type(name, (Record,), {"__annotations__": {field: object for field in fields}}))
+
+
+def row_values(record_type, row):
+    """A JSON row's values in field order (an object with exactly the record's fields, or a list), or None"""
+    fields = record_type.FIELDS
+    if isinstance(row, dict):
+        if len(row) != len(fields) or any(name not in row for name in fields):
+            return None
+        values = [row[name] for name in fields]
+    elif isinstance(row, (list, tuple)) and len(row) == len(fields):
+        values = row
+    else:
+        return None
+    types = record_type.TYPES
+    if any(not isinstance(value, types[name]) for name, value in zip(fields, values)):
+        return None
+    return values
+
+
+class RecordTable(Sequence):
+    """Rows of one record type stored as one list per field"""
+
+    __slots__ = ("record_type", "_columns")
+
+    def __init__(self, record_type, columns):
+        """columns: a list of values per field, in field order, all the same length (not copied)"""
+        if len(columns) != len(record_type.FIELDS) or len({len(column) for column in columns}) > 1:
+            raise ValueError(f"{record_type.__name__} needs {len(record_type.FIELDS)} columns of one length")
+        self.record_type = record_type
+        self._columns = list(columns)
+
+    @classmethod
+    def from_rows(cls, record_type, rows, where=None):
+        """
+        Validate JSON rows (see row_values()) and store them by column.
+        Raises ValueError naming the first bad row, prefixed with where.
+        """
+        columns = [[] for _ in record_type.FIELDS]
+        appends = [column.append for column in columns]
+        for i, row in enumerate(rows):
+            values = row_values(record_type, row)
+            if values is None:
+                types = ", ".join(f"{name}: {getattr(kind, '__name__', kind)}"
+                                  for name, kind in record_type.TYPES.items())
+                raise ValueError(f"{where or record_type.__name__}[{i}] does not match "
+                                 f"{record_type.__name__}({types})")
+            for append, value in zip(appends, values):
+                append(value)
+        return cls(record_type, columns)
+
+    @classmethod
+    def from_records(cls, record_type, records):
+        """A table of records already built (and so not checked again)"""
+        records = list(records)
+        return cls(record_type, [[getattr(row, name) for row in records] for name in record_type.FIELDS])
+
+    def __len__(self):
+        return len(self._columns[0]) if self._columns else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordTable(self.record_type, [column[index] for column in self._columns])
+        return self.record_type(*(column[index] for column in self._columns))
+
+    def __iter__(self):
+        record_type = self.record_type
+        for values in zip(*self._columns):
+            yield record_type(*values)
+
+    def __eq__(self, other):
+        return (isinstance(other, RecordTable) and self.record_type is other.record_type
+                and self._columns == other._columns)
+
+    def __repr__(self):
+        return f"RecordTable({self.record_type.__name__}, {len(self)} rows)"
+
+    def column(self, key):
+        """The values of one field (by name or position), in row order"""
+        index = self.record_type.FIELDS.index(key) if isinstance(key, str) else key
+        return self._columns[index]
+
+    def map(self, fn):
+        """A table with fn applied to every value"""
+        return RecordTable(self.record_type, [[fn(value) for value in column] for column in self._columns])
+
+    def to_json(self):
+        return [dict(zip(self.record_type.FIELDS, values)) for values in zip(*self._columns)]
+
+
+def to_json(obj):
+    """json.dumps default= hook for records and record tables"""
+    if isinstance(obj, (Record, RecordTable)):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,143 @@
+"""
+Monte Carlo model of the ambassador referral program.
+
+Each trajectory starts with a number of seed ambassadors and runs month
+by month. Every month each ambassador brings a Poisson number of
+sign-ups, each of which becomes a paying host with some probability;
+the ambassador is paid the bounty of their current tier per successful
+referral, and their tier follows their running count of successes
+(Starter, Rising, Elite, Founding in the bundled data). Referred hosts
+sell a lognormal amount every month from then on: the platform earns its
+take rate on those sales, and ambassadors in revenue-share tiers are
+paid their share of their own referrals' sales. Tiers may also carry a
+monthly perk (e.g. free Premium Analytics) that the platform gives up.
+Some new hosts become ambassadors themselves, so the referral trees
+grow.
+
+simulate() runs every trajectory at once: all ambassadors of all
+trajectories sit in flat NumPy arrays tagged with their trajectory, and
+per-trajectory totals are bincounts, so a month costs a few vectorized
+passes no matter how many trajectories there are. A million simulated
+users take about a second.
+
+Amounts may name an assumption (e.g. "PlatformFeeRate") instead of
+giving the number, as in comparison.fees.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from comparison.fees import resolve_amounts
+
+TIER_AMOUNTS = ("bounty", "rev_share", "perk_monthly")
+SIMULATION_AMOUNTS = ("host_monthly_sales", "take_rate")
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass(frozen=True)
+class ReferralTier:
+    name: str
+    min_referrals: int
+    bounty: float
+    rev_share: float = 0.0
+    perk_monthly: float = 0.0
+
+    @classmethod
+    def from_record(cls, record, names=None):
+        tier = cls(**resolve_amounts(record, names or {}, record["name"], TIER_AMOUNTS))
+        if tier.min_referrals < 0 or tier.bounty < 0 or tier.rev_share < 0 or tier.perk_monthly < 0:
+            raise ValueError(f"referral tier {tier.name!r} has a negative amount")
+        return tier
+
+
+@dataclass(frozen=True)
+class ReferralSimulation:
+    trajectories: int
+    months: int
+    seed_ambassadors: int
+    referrals_per_month: float
+    success_rate: float
+    ambassador_rate: float
+    host_monthly_sales: float
+    sales_sigma: float
+    take_rate: float
+    seed: int = 0
+
+    @classmethod
+    def from_record(cls, record, names=None):
+        settings = cls(**resolve_amounts(record, names or {}, "referral_simulation", SIMULATION_AMOUNTS))
+        for rate in ("success_rate", "ambassador_rate"):
+            if not 0 <= getattr(settings, rate) <= 1:
+                raise ValueError(f"referral_simulation: {rate} must be between 0 and 1")
+        return settings
+
+
+def simulate(tiers, settings):
+    """
+    Run settings.trajectories trajectories of the program. Returns a dict of
+    per-trajectory arrays: "users" (sign-ups, seed ambassadors included),
+    "hosts", "ambassadors", "bounties", "rev_share", "perks", "payouts"
+    (the three costs together), "platform_revenue" and "net_revenue".
+    """
+    tiers = sorted(tiers, key=lambda tier: tier.min_referrals)
+    if not tiers or tiers[0].min_referrals != 0:
+        raise ValueError("the first referral tier must start at 0 referrals")
+    thresholds = np.array([tier.min_referrals for tier in tiers])
+    bounty = np.array([tier.bounty for tier in tiers], dtype=float)
+    rev_share = np.array([tier.rev_share for tier in tiers], dtype=float)
+    perk = np.array([tier.perk_monthly for tier in tiers], dtype=float)
+
+    rng = np.random.default_rng(settings.seed)
+    n = settings.trajectories
+    # Lognormal with the given mean
+    mu = np.log(settings.host_monthly_sales) - settings.sales_sigma ** 2 / 2
+
+    # One entry per ambassador: trajectory, successful referrals so far and
+    # the monthly sales of the hosts they referred
+    owner = np.repeat(np.arange(n), settings.seed_ambassadors)
+    successes = np.zeros(len(owner), dtype=np.int64)
+    referred_sales = np.zeros(len(owner))
+
+    totals = {name: np.zeros(n) for name in ("users", "hosts", "bounties", "rev_share", "perks", "platform_revenue")}
+    totals["users"] += settings.seed_ambassadors
+    monthly_sales = np.zeros(n)
+
+    for _ in range(settings.months):
+        tier = np.searchsorted(thresholds, successes, side="right") - 1
+        signups = rng.poisson(settings.referrals_per_month, len(owner))
+        converted = rng.binomial(signups, settings.success_rate)
+
+        # Bounties go at the tier the ambassador was in when the referral landed
+        totals["users"] += np.bincount(owner, signups, n)
+        totals["bounties"] += np.bincount(owner, converted * bounty[tier], n)
+
+        referrer = np.repeat(np.arange(len(owner)), converted)
+        sales = rng.lognormal(mu, settings.sales_sigma, len(referrer))
+        referred_sales += np.bincount(referrer, sales, len(owner))
+        monthly_sales += np.bincount(owner[referrer], sales, n)
+        totals["hosts"] += np.bincount(owner[referrer], minlength=n)
+        successes += converted
+
+        # This month's sales, revenue share and perks at the updated tiers
+        tier = np.searchsorted(thresholds, successes, side="right") - 1
+        totals["platform_revenue"] += monthly_sales * settings.take_rate
+        totals["rev_share"] += np.bincount(owner, referred_sales * rev_share[tier], n)
+        totals["perks"] += np.bincount(owner, perk[tier], n)
+
+        # Some of the new hosts start referring too
+        recruits = referrer[rng.random(len(referrer)) < settings.ambassador_rate]
+        owner = np.concatenate([owner, owner[recruits]])
+        successes = np.concatenate([successes, np.zeros(len(recruits), dtype=np.int64)])
+        referred_sales = np.concatenate([referred_sales, np.zeros(len(recruits))])
+
+    totals["ambassadors"] = np.bincount(owner, minlength=n).astype(float)
+    totals["payouts"] = totals["bounties"] + totals["rev_share"] + totals["perks"]
+    totals["net_revenue"] = totals["platform_revenue"] - totals["payouts"]
+    return totals
+
+
+def summarize(values, percentiles=PERCENTILES):
+    """(mean, *percentiles) of a per-trajectory array"""
+    return (float(np.mean(values)), *(float(value) for value in np.percentile(values, percentiles)))
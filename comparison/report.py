@@ -0,0 +1,265 @@
+"""
+HTML and Markdown reports of the comparison tabs.
+
+The reports are rendered from the same specs and dataset as the workbook,
+in the same run (see create_competitor_comparison(reports=...)). Each tab
+is handed over as report sections, in sheet order: banner lines and
+tables of (value, style) cells, with formulas already evaluated. A table
+without a header continues the one before it, as on the Feature Matrix
+tab. Cells are formatted with the number format of their workbook style.
+The HTML report is one self-contained page: its CSS is generated from
+the workbook's named styles, so winners and section banners keep their
+colors. The Markdown summary shows at most MARKDOWN_ROWS rows per table.
+
+Every tab's rendered fragment is cached per format, keyed by a hash of
+the tab's inputs (the manifest's tab hash), its title and the generator
+fingerprint. A run only renders the tabs whose inputs changed and stitches
+the cached fragments of the others into the documents.
+"""
+
+import html
+import json
+import os
+import re
+
+from comparison.manifest import content_hash
+
+REPORT_FORMATS = {"html": ".html", "markdown": ".md"}
+CACHE_VERSION = 1
+
+# Rows per table in the Markdown summary; the HTML report has them all
+MARKDOWN_ROWS = 25
+
+# Workbook number formats -> Python formatting of a number
+NUMBER_FORMATS = {
+    '"$"#,##0.00': lambda value: f"-${-value:,.2f}" if value < 0 else f"${value:,.2f}",
+    "0.0%": lambda value: f"{value:.1%}",
+    "#,##0": lambda value: f"{value:,.0f}",
+    "#,##0.000": lambda value: f"{value:,.3f}",
+}
+
+
+def format_value(value, number_format=None):
+    """A cell's value as text, numbers in the style's number format"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        if number_format in NUMBER_FORMATS:
+            return NUMBER_FORMATS[number_format](value)
+        return f"{value:g}" if isinstance(value, float) else str(value)
+    return str(value)
+
+
+def slug(title):
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
+
+
+def table_width(section):
+    if section["header"] is not None:
+        return len(section["header"])
+    return len(section["rows"][0]) if section["rows"] else 0
+
+
+def merged_tables(sections):
+    """The sections with every headerless table appended to the table of the same width before it"""
+    merged = []
+    for section in sections:
+        previous = merged[-1] if merged else None
+        if ("rows" in section and section["header"] is None and previous is not None and "rows" in previous
+                and table_width(previous) == table_width(section)):
+            previous["rows"] = previous["rows"] + section["rows"]
+        else:
+            merged.append(dict(section))
+    return merged
+
+
+def color(value):
+    """#RRGGBB of an openpyxl color, or None for theme and indexed colors"""
+    rgb = getattr(value, "rgb", None)
+    return f"#{rgb[-6:]}" if isinstance(rgb, str) else None
+
+
+def style_css(styles):
+    """A CSS class per workbook named style: fill, font color and weight, horizontal alignment"""
+    rules = []
+    for name, style in styles.items():
+        declarations = []
+        if style.fill is not None and style.fill.fill_type == "solid" and color(style.fill.fgColor):
+            declarations.append(f"background:{color(style.fill.fgColor)}")
+        if style.font is not None:
+            if style.font.color is not None and color(style.font.color):
+                declarations.append(f"color:{color(style.font.color)}")
+            if style.font.b:
+                declarations.append("font-weight:bold")
+        if style.alignment is not None and style.alignment.horizontal in ("center", "left", "right"):
+            declarations.append(f"text-align:{style.alignment.horizontal}")
+        if declarations:
+            rules.append(f".s-{name}{{{';'.join(declarations)}}}")
+    return "\n".join(rules)
+
+
+PAGE_CSS = """\
+body{font-family:Calibri,Arial,sans-serif;font-size:14px;margin:2em;color:#222}
+nav ul{columns:3;padding-left:1.2em}
+section{margin-top:2.5em}
+table{border-collapse:collapse;margin:1em 0}
+th,td{border:1px solid #BFBFBF;padding:4px 8px;vertical-align:top}
+.banner{margin:.3em 0;padding:4px 8px}
+.number{text-align:right;white-space:nowrap}"""
+
+
+def html_cell(tag, value, style, number_formats):
+    text = format_value(value, number_formats.get(style))
+    classes = [f"s-{style}"] if style else []
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        classes.append("number")
+    attributes = f' class="{" ".join(classes)}"' if classes else ""
+    return f"<{tag}{attributes}>{html.escape(text).replace(chr(10), '<br>')}</{tag}>"
+
+
+def html_fragment(title, sections, number_formats):
+    """A tab as an HTML <section>"""
+    parts = [f'<section id="{slug(title)}">', f"<h2>{html.escape(title)}</h2>"]
+    for section in merged_tables(sections):
+        if "banners" in section:
+            parts += [f'<p class="banner s-{style}">{html.escape(text)}</p>' for text, style in section["banners"]]
+            continue
+        parts.append("<table>")
+        if section["header"] is not None:
+            style = section["header_style"]
+            parts.append("<thead><tr>" + "".join(html_cell("th", header, style, {}) for header in section["header"])
+                         + "</tr></thead>")
+        parts.append("<tbody>")
+        parts += ["<tr>" + "".join(html_cell("td", value, style, number_formats) for value, style in row) + "</tr>"
+                  for row in section["rows"]]
+        parts.append("</tbody></table>")
+    parts.append("</section>")
+    return "\n".join(parts) + "\n"
+
+
+def markdown_cell(text):
+    return text.replace("|", "\\|").replace("\n", "<br>")
+
+
+def markdown_fragment(title, sections, number_formats):
+    """A tab as a Markdown section, tables cut to MARKDOWN_ROWS rows"""
+    parts = [f"## {title}", ""]
+    for section in merged_tables(sections):
+        if "banners" in section:
+            # A paragraph per banner line
+            for text, style in section["banners"]:
+                if text:
+                    parts += [f"**{markdown_cell(text)}**" if style == "title" else markdown_cell(text), ""]
+            continue
+        rows = section["rows"]
+        header = section["header"] or [""] * (len(rows[0]) if rows else 0)
+        if not header:
+            continue
+        parts.append("| " + " | ".join(markdown_cell(str(text)) for text in header) + " |")
+        parts.append("|" + "---|" * len(header))
+        parts += ["| " + " | ".join(markdown_cell(format_value(value, number_formats.get(style)))
+                                    for value, style in row) + " |"
+                  for row in rows[:MARKDOWN_ROWS]]
+        if len(rows) > MARKDOWN_ROWS:
+            parts.append(f"\n*{len(rows) - MARKDOWN_ROWS:,} more rows in the workbook*")
+        parts.append("")
+    return "\n".join(parts) + "\n"
+
+
+FRAGMENT_RENDERERS = {"html": html_fragment, "markdown": markdown_fragment}
+
+
+def html_document(title, tabs, fragments, styles):
+    toc = "\n".join(f'<li><a href="#{slug(tab)}">{html.escape(tab)}</a></li>' for tab in tabs)
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+        f"<title>{html.escape(title)}</title>\n<style>\n{PAGE_CSS}\n{style_css(styles)}\n</style>\n</head>\n<body>\n"
+        f"<h1>{html.escape(title)}</h1>\n<nav><ul>\n{toc}\n</ul></nav>\n"
+        + "".join(fragments)
+        + "</body>\n</html>\n"
+    )
+
+
+def markdown_document(title, tabs, fragments, styles):
+    return f"# {title}\n\n" + "\n".join(fragments)
+
+
+DOCUMENT_RENDERERS = {"html": html_document, "markdown": markdown_document}
+
+
+class FragmentCache:
+    """Rendered fragments by key, stored as JSON; save() keeps only the ones used since loading"""
+
+    def __init__(self, path):
+        self.path = path
+        self.fragments = {}
+        self.used = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                self.fragments = cache["fragments"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, key, render):
+        """The fragment stored under key, or render()'s result (then stored). Returns (fragment, rendered)."""
+        rendered = key not in self.fragments
+        fragment = render() if rendered else self.fragments[key]
+        self.used[key] = fragment
+        return fragment, rendered
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "fragments": self.used}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def write_reports(tabs, formats, directory, name, title, styles, fingerprint):
+    """
+    Write directory/name.html and/or name.md for formats (any of
+    REPORT_FORMATS). tabs are (title, input hash, sections) with sections
+    a function returning the tab's report sections, called only if a
+    fragment has to be rendered; styles are the workbook's named styles.
+    Returns (paths written, titles of the tabs rendered).
+    """
+    unknown = set(formats) - set(REPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown report format(s): {', '.join(sorted(unknown))}")
+    os.makedirs(directory, exist_ok=True)
+    cache = FragmentCache(os.path.join(directory, name + ".fragments.json"))
+    number_formats = {style_name: style.number_format for style_name, style in styles.items()}
+
+    # Each tab's sections are built once, for whichever format renders first
+    built = {}
+
+    def tab_sections(tab_title, sections):
+        if tab_title not in built:
+            built[tab_title] = sections()
+        return built[tab_title]
+
+    paths, rendered = [], []
+    for fmt in REPORT_FORMATS:
+        if fmt not in formats:
+            continue
+        fragments = []
+        for tab_title, tab_hash, sections in tabs:
+            fragment, was_rendered = cache.get(
+                content_hash([fingerprint, fmt, tab_title, tab_hash]),
+                lambda: FRAGMENT_RENDERERS[fmt](tab_title, tab_sections(tab_title, sections), number_formats)
+            )
+            fragments.append(fragment)
+            if was_rendered and tab_title not in rendered:
+                rendered.append(tab_title)
+        path = os.path.join(directory, name + REPORT_FORMATS[fmt])
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(DOCUMENT_RENDERERS[fmt](title, [tab[0] for tab in tabs], fragments, styles))
+        os.replace(tmp_path, path)
+        paths.append(path)
+    cache.save()
+    return paths, rendered
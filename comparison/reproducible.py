@@ -0,0 +1,83 @@
+"""
+Byte-for-byte reproducible .xlsx files.
+
+openpyxl and XlsxWriter stamp every build with the current time: in the
+zip entries' modification times and in the created/modified dates of
+docProps/core.xml. Two builds of the same data therefore differ, which
+defeats ETag caching and change detection on the published file.
+
+reproducible_bytes() rewrites a finished workbook so that its bytes only
+depend on its content: both dates and every entry's time are set to one
+fixed timestamp, [Content_Types].xml comes first and the other entries
+follow in name order, and every entry is deflated at the same level with
+the same attributes. The timestamp is SOURCE_DATE_EPOCH (seconds since
+1970, the reproducible-builds.org convention) when that is set, else
+DEFAULT_TIMESTAMP. The output is stable for a given zlib build, so a
+different zlib version may compress differently.
+"""
+
+import io
+import os
+import re
+from datetime import datetime, timezone
+
+ENV_VAR = "SOURCE_DATE_EPOCH"
+
+# The earliest time a zip entry can hold
+DEFAULT_TIMESTAMP = datetime(1980, 1, 1, tzinfo=timezone.utc)
+
+COMPRESS_LEVEL = 6
+
+CORE_DATES = re.compile(rb"(<dcterms:(created|modified)\b[^>]*>)[^<]*(</dcterms:\2>)")
+
+
+def from_env():
+    """True when SOURCE_DATE_EPOCH asks for reproducible output"""
+    return bool(os.environ.get(ENV_VAR, "").strip())
+
+
+def build_timestamp():
+    """The fixed build time: SOURCE_DATE_EPOCH if set, else DEFAULT_TIMESTAMP"""
+    value = os.environ.get(ENV_VAR, "").strip()
+    if not value:
+        return DEFAULT_TIMESTAMP
+    try:
+        timestamp = datetime.fromtimestamp(int(value), timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        raise ValueError(f"{ENV_VAR} must be a number of seconds since 1970, not {value!r}") from None
+    return max(timestamp, DEFAULT_TIMESTAMP)
+
+
+def reproducible_bytes(content, timestamp=None):
+    """The .xlsx file content (bytes) with its timestamps, entry order and compression fixed"""
+    # Imported here: comparison.manifest uses build_timestamp() for the fast staleness check
+    import zipfile
+
+    timestamp = timestamp or build_timestamp()
+    date = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ").encode("ascii")
+
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        members = [(info.filename, archive.read(info.filename)) for info in archive.infolist()]
+    members.sort(key=lambda member: (member[0] != "[Content_Types].xml", member[0]))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for filename, payload in members:
+            if filename == "docProps/core.xml":
+                payload = CORE_DATES.sub(lambda match: match.group(1) + date + match.group(3), payload)
+            info = zipfile.ZipInfo(filename, date_time=timestamp.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 0
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, payload, compresslevel=COMPRESS_LEVEL)
+    return buffer.getvalue()
+
+
+def make_reproducible(path, timestamp=None):
+    """reproducible_bytes() for the workbook saved at path, rewritten in place"""
+    with open(path, "rb") as f:
+        content = reproducible_bytes(f.read(), timestamp)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
@@ -0,0 +1,304 @@
+"""
+Local HTTP service that builds comparison workbooks on demand.
+
+The generator is imported and warmed up once (a first build fills the
+style, layout and fingerprint caches), so a request only pays for its
+own build, and repeated requests for the same thing are served from an
+LRU cache of finished responses. Responses are keyed by the dataset's
+content hash plus the request parameters; editing a dataset file changes
+its hash, so stale workbooks are never served. Concurrent requests for a
+key that is still building wait for that build instead of starting
+their own.
+
+    GET /workbook.xlsx   the workbook
+    GET /comparison.json the JSON export of the same tabs (see comparison.export)
+    GET /health          cache statistics
+
+Query parameters:
+
+    dataset=NAME         a dataset directory under --datasets (default: the bundled data)
+    backend=NAME         openpyxl or xlsxwriter (workbook only; default: openpyxl)
+    cached_values=1      store formula results (workbook only)
+
+Workbooks are built reproducibly (see comparison.reproducible), so a
+restarted service sends the same bytes for the same request. Responses
+carry an ETag, and a matching If-None-Match gets 304.
+
+    python -m comparison.service --port 8765
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import create_competitor_comparison as generator
+from comparison.backends import BACKENDS
+from comparison.export import export_model, json_bytes
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 32
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+JSON_TYPE = "application/json; charset=utf-8"
+
+BOOLEAN_VALUES = {"1": True, "true": True, "yes": True, "0": False, "false": False, "no": False}
+
+
+class RequestError(ValueError):
+    """A bad request; the message is sent back with a 400"""
+
+
+class ResponseCache:
+    """
+    LRU cache of finished responses. get() builds a missing entry once:
+    callers asking for a key that is already being built wait for that
+    build, and a failed build is not cached.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.coalesced = 0
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            future = self._pending.get(key)
+            building = future is None
+            if building:
+                future = self._pending[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not building:
+            return future.result()
+
+        try:
+            value = build()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending[key]
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": sum(len(body) for body, _ in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+class GeneratorService:
+    """Builds and caches responses; the HTTP handler only parses requests and writes results"""
+
+    def __init__(self, dataset_root=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.dataset_root = os.path.realpath(dataset_root) if dataset_root else None
+        self.cache = ResponseCache(cache_size)
+        # dataset path -> (file signature, content hash, Dataset)
+        self._datasets = {}
+        self._datasets_lock = threading.Lock()
+
+    def warm_up(self):
+        """Build (and cache) the default workbook so imports and caches are ready for the first request"""
+        self.workbook({})
+
+    def dataset_path(self, name):
+        if not name:
+            return os.path.realpath(generator.DEFAULT_DATASET)
+        if self.dataset_root is None:
+            raise RequestError("this service only serves the bundled dataset (start it with --datasets)")
+        path = os.path.realpath(os.path.join(self.dataset_root, name))
+        if os.path.dirname(path) != self.dataset_root or not os.path.isdir(path):
+            raise RequestError(f"unknown dataset {name!r}")
+        return path
+
+    def dataset(self, name):
+        """(content hash, Dataset) for a dataset name, reloaded when its files change"""
+        path = self.dataset_path(name)
+        files = sorted({schema["file"] for schema in generator.DATASET_SCHEMA.values()})
+        signature = []
+        for filename in files:
+            try:
+                stat = os.stat(os.path.join(path, filename))
+            except OSError:
+                raise RequestError(f"dataset {name!r} has no {filename}") from None
+            signature.append((filename, stat.st_mtime_ns, stat.st_size))
+
+        with self._datasets_lock:
+            cached = self._datasets.get(path)
+            if cached and cached[0] == signature:
+                return cached[1], cached[2]
+
+            digest = generator.content_hash([
+                [filename, generator.file_hash(os.path.join(path, filename))] for filename in files
+            ])
+            # A touched but unchanged dataset keeps its loaded tables
+            data = cached[2] if cached and cached[1] == digest else generator.Dataset(path)
+            self._datasets[path] = (signature, digest, data)
+            return digest, data
+
+    def workbook(self, params):
+        """(body, etag) of the workbook for the request parameters"""
+        backend = params.pop("backend", "openpyxl")
+        if backend not in BACKENDS:
+            raise RequestError(f"unknown backend {backend!r} (expected one of: {', '.join(BACKENDS)})")
+        cached_values = parse_bool("cached_values", params.pop("cached_values", "0"))
+        digest, data = self.dataset(params.pop("dataset", None))
+        check_unused(params)
+
+        key = ("xlsx", digest, backend, cached_values)
+        return self.cache.get(key, lambda: (
+            generator.workbook_bytes(data, backend, cached_values, reproducible=True),
+            generator.content_hash(list(key))[:32]
+        ))
+
+    def export_json(self, params):
+        """(body, etag) of the JSON export for the request parameters"""
+        digest, data = self.dataset(params.pop("dataset", None))
+        check_unused(params)
+
+        key = ("json", digest)
+        return self.cache.get(key, lambda: (
+            json_bytes(export_model(generator.tab_specs(data), data)),
+            generator.content_hash(list(key))[:32]
+        ))
+
+
+def parse_bool(name, value):
+    if value.lower() not in BOOLEAN_VALUES:
+        raise RequestError(f"{name} must be 0 or 1, not {value!r}")
+    return BOOLEAN_VALUES[value.lower()]
+
+
+def check_unused(params):
+    if params:
+        raise RequestError(f"unknown parameter(s): {', '.join(sorted(params))}")
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "SponsorSynqComparison/1"
+
+    # path -> (service method, content type, download name)
+    ROUTES = {
+        "/workbook.xlsx": ("workbook", XLSX_TYPE, generator.OUTPUT_FILE),
+        "/comparison.json": ("export_json", JSON_TYPE, None),
+    }
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self.send_body(HTTPStatus.OK, JSON_TYPE, json_bytes({"status": "ok", "cache": self.service.cache.stats()}))
+            return
+        if url.path not in self.ROUTES:
+            self.send_error_json(HTTPStatus.NOT_FOUND, f"no such resource: {url.path}")
+            return
+
+        method, content_type, filename = self.ROUTES[url.path]
+        query = parse_qs(url.query, keep_blank_values=True)
+        params = {key: values[-1] for key, values in query.items()}
+        start = time.perf_counter()
+        try:
+            body, etag = getattr(self.service, method)(params)
+        except RequestError as e:
+            self.send_error_json(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        except ValueError as e:
+            # Invalid dataset contents
+            self.send_error_json(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+            return
+
+        etag = f'"{etag}"'
+        headers = {"ETag": etag, "X-Build-Seconds": f"{time.perf_counter() - start:.4f}"}
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if filename:
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        self.send_body(HTTPStatus.OK, content_type, body, headers)
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def send_body(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_body(status, JSON_TYPE, json_bytes({"error": message}))
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, dataset_root=None, cache_size=DEFAULT_CACHE_SIZE,
+                quiet=False, warm_up=True):
+    """A ThreadingHTTPServer serving a GeneratorService; call serve_forever() on it"""
+    service = GeneratorService(dataset_root, cache_size)
+    if warm_up:
+        service.warm_up()
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.service = service
+    server.quiet = quiet
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve competitor comparison workbooks over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    parser.add_argument("--datasets", metavar="DIR",
+                        help="directory whose subdirectories can be requested with ?dataset=NAME")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help=f"responses kept in the LRU cache (default: {DEFAULT_CACHE_SIZE})")
+    parser.add_argument("--quiet", action="store_true", help="don't log requests")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.datasets, args.cache_size, args.quiet)
+    print(f"✓ Serving on http://{args.host}:{server.server_address[1]}/workbook.xlsx", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,623 +3,2061 @@
 Generate SponsorSynq Competitor Comparison Excel Spreadsheet
 """
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+import sys
+
+# The subcommands of python -m comparison (build, check, ...) work here too.
+# They are dispatched before the imports below so that check answers from
+# the manifest without loading NumPy and openpyxl; build imports this
+# module again through comparison.cli.
+if __name__ == "__main__" and len(sys.argv) > 1:
+    from comparison import cli
+
+    if sys.argv[1] in cli.COMMANDS:
+        sys.exit(cli.main(sys.argv[1:]))
+
+import argparse
+import functools
+import io
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter, quote_sheetname
+
+from comparison import backends, fidelity, profiling
+from comparison.backends import BACKENDS, is_path, open_workbook, sheet_writer
+from comparison.export import COLUMNAR_FORMATS, FORMATS, export_model, write_columnar, write_json
+from comparison.feature_matrix import FeatureMatrix
+from comparison.fees import FeeModel, fee_facts, scenario_grid
+from comparison.referrals import ReferralSimulation, ReferralTier, simulate, summarize
+from comparison.formulas import (add_cached_values, cached_values_bytes, evaluate, excel_text, has_formula,
+                                 render_text, text_formula, to_text)
+from comparison.layout import DEFAULT_MAX_WIDTH, fit, text_metrics
+from comparison.manifest import (DEFAULT_DATASET, OUTPUT_FILE, build_options, content_hash, file_hash, inputs_hash,
+                                 library_version, manifest_path, read_manifest, source_hashes, stale_reason,
+                                 write_manifest)
+from comparison.profiling import phase
+from comparison.records import Record, RecordTable, positional_record, record
+from comparison.report import REPORT_FORMATS, write_reports
+from comparison.reproducible import build_timestamp, make_reproducible, reproducible_bytes
+from comparison.reproducible import from_env as reproducible_from_env
+
+
+def solid_fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+CENTERED = Alignment(horizontal="center", vertical="center")
+CENTERED_WRAP = Alignment(horizontal="center", vertical="center", wrap_text=True)
+TOP_WRAP = Alignment(vertical="top", wrap_text=True)
+MIDDLE_WRAP = Alignment(vertical="center", wrap_text=True)
+
+# Shared style registry. Every cell in the workbook uses one of these named
+# styles; register_styles() adds them to a workbook once and cells are then
+# assigned by name, so no style objects are built inside the row loops.
+STYLES = {style.name: style for style in [
+    # Table headers and bodies
+    NamedStyle(name="header", fill=solid_fill("1F4E78"),
+               font=Font(color="FFFFFF", bold=True, size=12), alignment=CENTERED_WRAP),
+    NamedStyle(name="body", font=DEFAULT_FONT, alignment=TOP_WRAP, border=THIN_BORDER),
+    NamedStyle(name="body_center", font=DEFAULT_FONT, alignment=MIDDLE_WRAP, border=THIN_BORDER),
+    NamedStyle(name="currency", font=DEFAULT_FONT, alignment=MIDDLE_WRAP, border=THIN_BORDER,
+               number_format='"$"#,##0.00'),
+    NamedStyle(name="percent", font=DEFAULT_FONT, alignment=MIDDLE_WRAP, border=THIN_BORDER,
+               number_format='0.0%'),
+    NamedStyle(name="number", font=DEFAULT_FONT, alignment=MIDDLE_WRAP, border=THIN_BORDER,
+               number_format='#,##0'),
+    NamedStyle(name="decimal", font=DEFAULT_FONT, alignment=MIDDLE_WRAP, border=THIN_BORDER,
+               number_format='#,##0.000'),
+    NamedStyle(name="row_label", fill=solid_fill("E7E6E6"),
+               font=Font(bold=True, size=11), alignment=TOP_WRAP, border=THIN_BORDER),
+    NamedStyle(name="row_label_accent", fill=solid_fill("4472C4"),
+               font=Font(bold=True, size=11, color="FFFFFF"), alignment=TOP_WRAP, border=THIN_BORDER),
+
+    # Winner / highlight cells
+    NamedStyle(name="winner_green", fill=solid_fill("C6EFCE"),
+               font=Font(bold=True, color="006100"), alignment=MIDDLE_WRAP, border=THIN_BORDER),
+    NamedStyle(name="winner_yellow", fill=solid_fill("FFEB9C"),
+               font=Font(bold=True, color="9C6500"), alignment=MIDDLE_WRAP, border=THIN_BORDER),
+    NamedStyle(name="winner_red", fill=solid_fill("FFC7CE"),
+               font=Font(bold=True, color="9C0006"), alignment=MIDDLE_WRAP, border=THIN_BORDER),
+
+    # Action Items
+    NamedStyle(name="title", fill=solid_fill("C00000"),
+               font=Font(color="FFFFFF", bold=True, size=14), alignment=CENTERED),
+    NamedStyle(name="message", font=Font(bold=True, size=11), alignment=CENTERED),
+    NamedStyle(name="message_emphasis", font=Font(bold=True, size=12, color="C00000"), alignment=CENTERED),
+    NamedStyle(name="section_high", fill=solid_fill("C00000"),
+               font=Font(color="FFFFFF", bold=True, size=12), alignment=CENTERED),
+    NamedStyle(name="section_medium", fill=solid_fill("FF9900"),
+               font=Font(color="FFFFFF", bold=True, size=12), alignment=CENTERED),
+    NamedStyle(name="section_low", fill=solid_fill("70AD47"),
+               font=Font(color="FFFFFF", bold=True, size=12), alignment=CENTERED),
+    NamedStyle(name="priority_high", fill=solid_fill("FFC7CE"), font=Font(bold=True), alignment=CENTERED_WRAP),
+    NamedStyle(name="priority_medium", fill=solid_fill("FFEB9C"), font=Font(bold=True), alignment=CENTERED_WRAP),
+    NamedStyle(name="priority_low", fill=solid_fill("C6EFCE"), font=Font(bold=True), alignment=CENTERED_WRAP),
+    NamedStyle(name="completed", fill=solid_fill("E2EFDA"),
+               font=Font(color="70AD47", italic=True), alignment=TOP_WRAP, border=THIN_BORDER),
+]}
+
+
+def register_styles(wb):
+    """Add the shared named styles to an openpyxl workbook (each workbook gets its own copies)"""
+    backends.register_styles(wb, STYLES)
+
+
+def create_competitor_comparison(write_only=False, dataset=None, force=False, output=OUTPUT_FILE, quiet=False,
+                                 cached_values=False, profile=None, backend="openpyxl", reproducible=None,
+                                 save_workers=None, reports=(), report_dir="."):
+    """
+    Build the comparison workbook and save it to output (in the current
+    directory by default).
+
+    With write_only=True the sheets are openpyxl write-only worksheets: each
+    row is streamed to disk as it is appended instead of being kept in memory
+    until save. Content and formatting are the same in both modes.
+
+    backend picks the library that writes the file: "openpyxl" (default) or
+    "xlsxwriter", which streams rows in constant memory (see
+    comparison.backends). output may also be a binary file object such as
+    a BytesIO; the workbook is then always built and no manifest is kept.
+
+    dataset is a Dataset or a dataset directory; the bundled data is used
+    when it is None.
+
+    Figures that come from the Assumptions sheet are written as Excel
+    formulas, so editing an assumption in Excel updates every tab. openpyxl
+    saves formulas without results; cached_values=True also stores the
+    computed values for viewers that don't recalculate.
+
+    reproducible=True writes the same bytes for the same inputs: fixed
+    timestamps, entry order and compression (see comparison.reproducible),
+    so the file can be cached by ETag and deduplicated by hash. When it is
+    None, setting SOURCE_DATE_EPOCH turns it on.
+
+    save_workers > 1 serializes the sheets in that many worker processes
+    when an openpyxl workbook is saved (see comparison.parallel_save); the
+    file's content is the same.
+
+    reports lists any of "html" and "markdown" (see comparison.report): the
+    same tabs are also written to report_dir as a self-contained HTML page
+    (competitor_comparison.html) and a Markdown summary
+    (competitor_comparison.md). Only tabs whose inputs changed since the
+    last report are rendered again; the reports are written even when the
+    workbook is up to date.
+
+    The build is skipped when the manifest saved next to the output shows
+    that neither the inputs nor the output file have changed since the last
+    run; force=True always rebuilds. Returns True if the workbook was written.
+
+    profile="phases" (or True) times the build phases (data load, each tab,
+    style application, dimensions, save) and counts cells and styles per
+    sheet; profile="cprofile" adds a cProfile dump. The report files are
+    written next to output (see comparison.profiling). When profile is None
+    the SPONSORSYNQ_PROFILE environment variable decides. Profiled builds
+    always rebuild.
+    """
+    if profile is None:
+        profile = profiling.from_env()
+    if reproducible is None:
+        reproducible = reproducible_from_env()
+    if not profile:
+        return build_workbook(write_only, dataset, force, output, quiet, cached_values, backend, reproducible,
+                              save_workers, reports, report_dir)
+
+    profiler = profiling.Profiler(cprofile=profile == "cprofile")
+    with profiler:
+        built = build_workbook(write_only, dataset, True, output, quiet, cached_values, backend, reproducible,
+                               save_workers, reports, report_dir)
+    paths = profiler.write(os.path.splitext(output if is_path(output) else OUTPUT_FILE)[0])
+    if not quiet:
+        print(profiler.summary())
+        print(f"  Profile: {', '.join(paths)}")
+    return built
+
+
+def build_workbook(write_only, dataset, force, output, quiet, cached_values, backend="openpyxl", reproducible=False,
+                   save_workers=None, reports=(), report_dir="."):
+    """The build behind create_competitor_comparison(), split into profiler phases"""
+    timestamp = build_timestamp() if reproducible else None
+    options = build_options(backend, cached_values, reproducible)
+    to_file = is_path(output)
+    if to_file and not force and not reports and not isinstance(dataset, Mapping):
+        # Same sources, dataset files and options as the last build: nothing to load
+        with phase("manifest"):
+            stale = stale_reason(output, load_dataset(dataset).path, options)
+        if stale is None:
+            if not quiet:
+                print(f"✓ Excel file up to date: {output}")
+            return False
+
+    with phase("load"):
+        data = dataset if isinstance(dataset, Mapping) else load_dataset(dataset)
+        if profiling.active():
+            # Read every table now so the tab timings don't include it
+            for name in data:
+                data[name]
+
+    tabs = None
+    if reports:
+        with phase("reports"):
+            tabs = tab_hashes(data)
+            paths, rendered = write_report_files(data, reports, report_dir, tabs)
+        if not quiet:
+            for path in paths:
+                print(f"✓ Wrote {path} ({len(rendered)} of {len(tabs)} tabs rendered)")
+
+    if to_file:
+        with phase("manifest"):
+            manifest = build_manifest(data, options, tabs)
+            previous = read_manifest(manifest_path(output))
+            changed = changed_tabs(manifest, previous, output)
+        if not changed and not force:
+            if not quiet:
+                print(f"✓ Excel file up to date: {output}")
+            return False
+
+    # Streams get the finished file in one write, after the archive is rewritten
+    target = output if to_file else io.BytesIO()
+    book = open_workbook(backend, target, STYLES, write_only, save_workers)
+
+    for title, create_tab, _ in workbook_tabs(data):
+        with phase(f"tab: {title}"):
+            create_tab(book.add_sheet(title), data)
 
-def create_competitor_comparison():
-    wb = Workbook()
+    # Save the workbook
+    with phase("save"):
+        book.close()
+    if not to_file:
+        content = target.getvalue()
+        if cached_values:
+            with phase("cached values"):
+                content = cached_values_bytes(content, data.names)
+        if reproducible:
+            with phase("reproducible"):
+                content = reproducible_bytes(content, timestamp)
+        output.write(content)
+        return True
+
+    if cached_values:
+        with phase("cached values"):
+            add_cached_values(output, data.names)
+    if reproducible:
+        with phase("reproducible"):
+            make_reproducible(output, timestamp)
+    with phase("manifest"):
+        write_manifest(manifest, output)
+    if not quiet:
+        print(f"✓ Excel file created: {output}")
+        if previous and changed:
+            print(f"  Changed: {', '.join(changed)}")
+    return True
+
+
+def workbook_bytes(dataset=None, backend="openpyxl", cached_values=False, reproducible=False):
+    """Build the workbook in memory and return the .xlsx file's bytes"""
+    buffer = io.BytesIO()
+    create_competitor_comparison(dataset=dataset, output=buffer, quiet=True, cached_values=cached_values,
+                                 profile=False, backend=backend, reproducible=reproducible)
+    return buffer.getvalue()
+
+
+EXPORT_NAME = "competitor_comparison"
+
+
+def export_outputs(formats, export_dir=".", write_only=False, dataset=None, force=False, output=OUTPUT_FILE,
+                   cached_values=False, backend="openpyxl", reproducible=None):
+    """
+    Write the workbook plus JSON and/or columnar exports of the same tabs.
+
+    The dataset is loaded and turned into an export model once; the
+    workbook build, the JSON file (export_dir/competitor_comparison.json)
+    and each columnar format (export_dir/competitor_comparison/<table>.parquet
+    or .arrow) are then written concurrently. formats is any of "json",
+    "parquet" and "arrow". Returns the paths written.
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(sorted(unknown))}")
+
+    data = dataset if isinstance(dataset, Mapping) else load_dataset(dataset)
+    model = export_model(tab_specs(data), data)
+    os.makedirs(export_dir, exist_ok=True)
+
+    with ThreadPoolExecutor() as pool:
+        workbook = pool.submit(create_competitor_comparison, write_only, data, force, output,
+                               cached_values=cached_values, backend=backend, reproducible=reproducible)
+        exports = []
+        if "json" in formats:
+            exports.append(pool.submit(write_json, model, os.path.join(export_dir, EXPORT_NAME + ".json")))
+        for fmt in COLUMNAR_FORMATS:
+            if fmt in formats:
+                exports.append(pool.submit(write_columnar, model, os.path.join(export_dir, EXPORT_NAME), fmt))
+
+        paths = [output] if workbook.result() else []
+        for future in exports:
+            result = future.result()
+            paths += result if isinstance(result, list) else [result]
+    return paths
+
+
+def variant_output_name(variant):
+    """
+    Deterministic file name for a variant config: the output stem plus the
+    slugified variant "name", or a hash of the config when it has no name.
+    """
+    name = variant.get("name")
+    suffix = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") if name else content_hash(variant)[:12]
+    stem, ext = os.path.splitext(OUTPUT_FILE)
+    return f"{stem}-{suffix}{ext}"
+
+
+def build_variant(variant, output_dir, force=False):
+    """Build one variant workbook; runs in a worker process. Returns (output, built, seconds)."""
+    output = os.path.join(output_dir, variant_output_name(variant))
+    start = time.perf_counter()
+    built = create_competitor_comparison(
+        write_only=variant.get("write_only", False),
+        dataset=variant.get("dataset"),
+        force=force,
+        output=output,
+        quiet=True,
+        cached_values=variant.get("cached_values", False),
+        backend=variant.get("backend", "openpyxl"),
+        reproducible=variant.get("reproducible")
+    )
+    return output, built, time.perf_counter() - start
+
+
+def build_variants(variants, output_dir=".", max_workers=None, force=False):
+    """
+    Build one workbook per variant config across a process pool.
+
+    A variant is a dict with an optional "name", "dataset" directory,
+    "backend" and "write_only", "cached_values" and "reproducible" flags;
+    each one is written to output_dir under variant_output_name(). Worker
+    processes are reused between variants, so the style registry, loaded
+    datasets and generator fingerprint are set up once per worker rather
+    than once per workbook. Variants whose manifest is up to date are
+    skipped unless force is set.
+
+    Prints a progress line per finished variant and returns one result dict
+    per variant, in input order.
+    """
+    outputs = [variant_output_name(variant) for variant in variants]
+    duplicates = sorted({name for name in outputs if outputs.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Variants map to the same output file: {', '.join(duplicates)}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    results = [None] * len(variants)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(build_variant, variant, output_dir, force): i
+            for i, variant in enumerate(variants)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            output, built, seconds = future.result()
+            results[futures[future]] = {"output": output, "built": built, "seconds": seconds}
+            status = "built" if built else "up to date"
+            print(f"[{done}/{len(variants)}] {os.path.basename(output)}: {status} in {seconds:.2f}s")
+
+    elapsed = time.perf_counter() - start
+    busy = sum(result["seconds"] for result in results)
+    print(f"✓ {len(variants)} variants in {elapsed:.2f}s "
+          f"({busy:.2f}s of build time, {busy / elapsed if elapsed else 0:.1f}x parallel)")
+    return results
+
+
+# Builds compared by check_backends(): label -> (backend, write_only, to a file)
+BACKEND_CHECKS = {
+    "openpyxl": ("openpyxl", False, True),
+    "openpyxl write-only": ("openpyxl", True, True),
+    "openpyxl in memory": ("openpyxl", False, False),
+    "xlsxwriter": ("xlsxwriter", False, True),
+    "xlsxwriter in memory": ("xlsxwriter", False, False),
+}
+
+
+def backend_check_bytes(data, label):
+    """The .xlsx bytes of the BACKEND_CHECKS build called label"""
+    backend, write_only, to_file = BACKEND_CHECKS[label]
+    if not to_file:
+        return workbook_bytes(data, backend)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = os.path.join(tmpdir, OUTPUT_FILE)
+        create_competitor_comparison(write_only, data, output=output, quiet=True, profile=False, backend=backend)
+        with open(output, "rb") as f:
+            return f.read()
+
+
+def check_backends(dataset=None):
+    """
+    Build with every backend and mode, to a file and in memory, and print
+    how each differs from the standard openpyxl output. True if none do.
+    """
+    data = dataset if isinstance(dataset, Mapping) else load_dataset(dataset)
+    results = fidelity.check_backends(functools.partial(backend_check_bytes, data), BACKEND_CHECKS)
+    for label, problems in results.items():
+        if problems:
+            print(f"✗ {label} differs from openpyxl:")
+            for problem in problems:
+                print(f"  {problem}")
+        else:
+            print(f"✓ {label} matches openpyxl")
+    return not any(results.values())
+
+
+def compare_memory():
+    """
+    Build the workbook in both modes and print the peak traced memory of
+    each. The builds go to a temporary directory, leaving the workbook and
+    manifest in the current directory alone.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = os.path.join(tmpdir, OUTPUT_FILE)
+        for write_only in (False, True):
+            tracemalloc.start()
+            create_competitor_comparison(write_only=write_only, force=True, output=output, quiet=True)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[write_only] = peak
+
+    print(f"Peak memory (standard):   {results[False] / 1024:,.0f} KiB")
+    print(f"Peak memory (write-only): {results[True] / 1024:,.0f} KiB")
+    return results
+
+
+def append_row(sheet, cells):
+    """Append a row of (value, style name) cells"""
+    sheet.append(cells)
+    if profiling.active():
+        profiling.active().count_row(sheet.title, cells)
+
+
+def merge_row(sheet, row, last_col):
+    """Merge a row from column A to last_col"""
+    with phase("merges"):
+        sheet.merge(f'A{row}:{get_column_letter(last_col)}{row}')
+    if profiling.active():
+        profiling.active().count_merge(sheet.title)
+
+
+# ---------------------------------------------------------------------------
+# Sheet renderer
+#
+# A sheet spec is a dict with the column "widths" and a list of "blocks"
+# rendered top to bottom. A width may be "auto" (or "widths" may be "auto"
+# for every column) to size the column to its content, up to the spec's
+# "max_width"; a table's "row_height" may be "auto" to fit each row,
+# header included, to its wrapped text (see comparison.layout).
+#
+#   {"type": "table", "columns": [...], "rows": <table name>, ...}
+#       Optional header row plus one row per record. Each column has a
+#       "header", a "key" into the record (dict key or list index) and an
+#       optional "style" overriding the block's "row_style". Column "rules"
+#       and block "row_rules" pick a different style from the cell value.
+#       A column with "formula": true writes its values as formulas (the
+#       value without the leading "="). "names" defines a workbook name for
+#       the cell in "column" of each row, taken from the record's "key".
+#       "conditional_formats" adds Excel conditional formatting over the
+#       written rows, e.g. {"rule": "row_min", "first": 5, "last": 10,
+#       "style": "winner_green"} highlights the smallest value of columns
+#       5-10 in each row.
+#   {"type": "banners", "rows": <table name>, "merge": <last column>}
+#       One merged row per [text, style] pair.
+#   {"type": "spacer", "height": <points>}
+#       An empty row.
+#
+# A rule is {"style": name} plus one test on the value: "equals",
+# "contains" or "icontains" (case-insensitive). The first matching rule wins.
+# A column rule with a "key" tests that field of the record instead of the
+# cell's own value.
+#
+# Text containing {=...} placeholders is written as an Excel formula (see
+# comparison.formulas), so it follows the Assumptions sheet.
+#
+# A spec may also set "freeze" to a cell reference for the frozen panes.
+#
+# Sheets are drawn through a writer from comparison.backends, so the same
+# specs render with openpyxl or XlsxWriter.
+# ---------------------------------------------------------------------------
+
+def rule_matches(rule, value):
+    if "equals" in rule:
+        return value == rule["equals"]
+    if "contains" in rule:
+        return rule["contains"] in value
+    if "icontains" in rule:
+        return rule["icontains"].lower() in value.lower()
+    raise ValueError(f"Unknown rule: {rule}")
+
+
+def match_rules(rules, value, record=None):
+    """Return the style of the first rule matching value (or the record field named by its "key"), or None"""
+    for rule in rules:
+        if rule_matches(rule, record[rule["key"]] if "key" in rule else value):
+            return rule["style"]
+    return None
+
+
+def render_sheet(sheet, spec, data=None):
+    """
+    Render a sheet spec onto sheet, a backend sheet writer or an openpyxl
+    worksheet, pulling block rows from data (the bundled dataset by default)
+    """
+    if data is None:
+        data = load_dataset()
+    sheet = sheet_writer(sheet, STYLES)
+
+    # Set column widths (streaming writers need them before the first row)
+    widths, heights = sheet_layout(spec, data)
+    with phase("dimensions"):
+        for col, width in enumerate(widths, 1):
+            sheet.set_width(col, width)
+        if "freeze" in spec:
+            sheet.freeze(spec["freeze"])
+
+    row = 1
+    for block in spec["blocks"]:
+        row = BLOCK_RENDERERS[block["type"]](sheet, block, data, row, heights)
+
+
+def table_rows(block, data):
+    """Yield (record, [(value, style), ...]) for each record of a table block, with the style rules applied"""
+    columns = block["columns"]
+
+    # Styles are resolved once per column; only columns with rules are
+    # looked at again for each cell
+    column_styles = [column.get("style", block["row_style"]) for column in columns]
+    row_rules = block.get("row_rules")
+
+    # Record tables hand over whole columns, so cells are read without a
+    # lookup per value
+    table = data[block["rows"]]
+    if isinstance(table, RecordTable):
+        row_values = zip(*(table.column(column["key"]) for column in columns))
+    else:
+        row_values = ([item[column["key"]] for column in columns] for item in table)
+
+    for item, item_values in zip(table, row_values):
+        styles = column_styles
+        if row_rules:
+            for rule in row_rules:
+                if rule_matches(rule, item[rule["key"]]):
+                    styles = [rule["style"]] * len(columns)
+                    break
+
+        values = []
+        for column, style, value in zip(columns, styles, item_values):
+            if "rules" in column:
+                style = match_rules(column["rules"], value, item) or style
+            values.append((value, style))
+        yield item, values
+
+
+def render_table(sheet, block, data, row, heights):
+    columns = block["columns"]
+    auto_height = block.get("row_height") == "auto"
+
+    if "header_style" in block:
+        if auto_height:
+            with phase("dimensions"):
+                sheet.set_height(row, heights[row])
+        append_row(sheet, [(column["header"], block["header_style"]) for column in columns])
+        row += 1
 
-    # Remove default sheet
-    wb.remove(wb.active)
+    first_row = row
+    for item, values in table_rows(block, data):
+        cells = [(cell_value(column, value), style) for column, (value, style) in zip(columns, values)]
+
+        # Row heights must be set before the row is written
+        if "row_height" in block:
+            with phase("dimensions"):
+                sheet.set_height(row, heights[row] if auto_height else block["row_height"])
+        append_row(sheet, cells)
+        if "names" in block:
+            define_name(sheet, item[block["names"]["key"]], block["names"]["column"], row)
+        row += 1
 
-    # TAB 1: REVENUE STREAMS
-    ws1 = wb.create_sheet("Revenue Streams")
-    create_revenue_streams_tab(ws1)
+    if row > first_row:
+        for conditional in block.get("conditional_formats", ()):
+            with phase("conditional formats"):
+                add_conditional_format(sheet, conditional, first_row, row - 1)
 
-    # TAB 2: QUICK COMPARISON
-    ws2 = wb.create_sheet("Quick Comparison")
-    create_quick_comparison_tab(ws2)
+    return row
 
-    # TAB 3: CORE DIFFERENTIATORS
-    ws3 = wb.create_sheet("Core Differentiators")
-    create_core_differentiators_tab(ws3)
 
-    # TAB 4: REVENUE SUMMARY
-    ws4 = wb.create_sheet("Revenue Summary")
-    create_revenue_summary_tab(ws4)
+def cell_value(column, value):
+    """What a table cell holds for a record value: formula columns and {=...} text become formulas"""
+    if column.get("formula"):
+        return "=" + value
+    if has_formula(value):
+        return text_formula(value)
+    return value
 
-    # TAB 5: ACTION ITEMS
-    ws5 = wb.create_sheet("Action Items")
-    create_action_items_tab(ws5)
 
-    # Save the workbook
-    wb.save("SponsorSynq_Competitor_Comparison.xlsx")
-    print("✓ Excel file created: SponsorSynq_Competitor_Comparison.xlsx")
+def add_conditional_format(sheet, conditional, first_row, last_row):
+    """Apply a table block's conditional format to rows first_row..last_row"""
+    if conditional["rule"] != "row_min":
+        raise ValueError(f"Unknown conditional format: {conditional}")
 
+    first = get_column_letter(conditional["first"])
+    last = get_column_letter(conditional["last"])
+    # Relative row, absolute columns: each cell is compared with its own row
+    formula = f"{first}{first_row}=MIN(${first}{first_row}:${last}{first_row})"
+    sheet.conditional_format(f"{first}{first_row}:{last}{last_row}", formula, conditional["style"])
 
-def create_revenue_streams_tab(ws):
-    """Create Tab 1: Revenue Streams"""
 
-    # Headers
-    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True, size=12)
-
-    ws['A1'] = "Revenue Stream"
-    ws['B1'] = "What We Charge"
-    ws['C1'] = "What Eventbrite Charges"
-    ws['D1'] = "What Others Charge"
-    ws['E1'] = "Where We Win"
-    ws['F1'] = "Where We Need to Improve"
-
-    for col in range(1, 7):
-        cell = ws.cell(1, col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    # Revenue Stream Data
-    streams = [
-        {
-            "name": "1. Processing Fee",
-            "we_charge": "~3% + $0.30 per ticket\nPassed to attendee\nStandard, expected",
-            "eventbrite": "3.7% + $1.79 service fee\nPLUS 2.9% processing\nTotal: ~6.6% + $1.79\nOn $20 ticket: $3.11",
-            "others": "Ticketmaster: 15-25%\nTicket Tailor: $0.26 flat\nHumanitix: 2% + $0.30",
-            "win": "• Significantly cheaper than Eventbrite & Ticketmaster\n• Transparent pricing\n• No hidden fees",
-            "improve": "• Don't compete on fees alone\n• Our story: 'Pay $50 in fees, get $500 in sponsors'\n• Emphasize net gain, not fee savings"
-        },
-        {
-            "name": "2. Platform Fee",
-            "we_charge": "5% of ticket revenue\nOnly on 2nd+ events\n1st event FREE\nWaived with $19/mo subscription",
-            "eventbrite": "~6.6% + $1.79 per ticket\nChanged pricing 11 times\nRemoved free tier in 2023\nConfusing structure",
-            "others": "Meetup: $16-22/mo required\nFacebook Events: Free (no ticketing)\nEventcube: Similar to us",
-            "win": "• Simple & transparent\n• Cheaper than Eventbrite\n• First event free builds trust\n• Subscription waives entirely",
-            "improve": "• Publicly commit to pricing stability\n• Never surprise users like Eventbrite did\n• Emphasize 'pay only when you win'"
-        },
-        {
-            "name": "3. Monthly Subscription",
-            "we_charge": "$19/month for Pro\nWaives 5% fee entirely\nIncludes Premium Analytics ($7 value)\nBreakeven: $380/mo in sales",
-            "eventbrite": "Pro plans: $15-100/month\nFor email marketing limits\nDoes NOT waive fees\nYou pay subscription AND fees",
-            "others": "Meetup: $16-22/mo required\nNo free tier\nPay even if event flops",
-            "win": "• Subscription SAVES money\n• Eventbrite double-dips\n• Meetup charges even with no revenue\n• We reward active hosts",
-            "improve": "• Offer annual discount ($190/yr vs $228)\n• Show savings in dashboard monthly\n• Turn subscription into psychological win"
-        },
-        {
-            "name": "4. Sponsor Commission",
-            "we_charge": "12% of sponsor allocations\nTaken before host payout\n$100 = $12 to us, $88 to host\nAutomatic, no invoice",
-            "eventbrite": "NOTHING\nNo sponsor marketplace exists\nHosts find sponsors alone\nCold emails, agencies, luck",
-            "others": "Agencies: 15-25% + retainers\nInfluencer platforms: 10-20%\nTicketmaster: No marketplace",
-            "win": "• ONLY platform with sponsor marketplace\n• Eventbrite can't compete here\n• 12% vs 15-25% agencies\n• Accessible to any event size",
-            "improve": "• Matching algorithm must be excellent\n• Verification system must be robust\n• Show ROI metrics to sponsors\n• Prove 12% is worth it"
-        },
-        {
-            "name": "5. Featured Placement",
-            "we_charge": "$29 flat fee\n14 days priority placement\nSponsors appear first\n'Featured' badge",
-            "eventbrite": "Eventbrite Ads: CPC/CPM model\n$50-500+ campaigns\nFor events→attendees\nNot sponsors→hosts",
-            "others": "LinkedIn: $30-100 boost\nIndeed: $5-25/day\nInstagram: $1+/day",
-            "win": "• Simple flat pricing\n• No bidding or budgets\n• Specifically for sponsor-host connections\n• Different use case than competitors",
-            "improve": "• Test price tiers ($15/7d, $29/14d, $49/30d)\n• Track & display performance\n• Prove Featured = more acceptances"
-        },
-        {
-            "name": "6. Instant Payout",
-            "we_charge": "1.5% of payout amount\nSame-day deposit\nStandard (3-5 days) is free\nCompletely optional",
-            "eventbrite": "Standard: 5 business days\nNO instant option\nNeed money faster? Too bad.",
-            "others": "Stripe direct: 1%\nDoorDash: $1.99 flat\nUber: $0.85\nPayPal: 1.75%",
-            "win": "• We offer it - Eventbrite doesn't\n• Competitive with PayPal\n• Meaningful differentiation",
-            "improve": "• Consider flat fee for large payouts\n• Implement cap: 1.5% max $15\n• Communicate value: 'Pay DJ tonight'"
-        },
+def define_name(sheet, name, col, row):
+    """Add a workbook defined name pointing at one cell of sheet"""
+    sheet.define_name(name, f"{quote_sheetname(sheet.title)}!${get_column_letter(col)}${row}")
+
+
+def render_banners(sheet, block, data, row, heights):
+    for text, style in data[block["rows"]]:
+        append_row(sheet, [(text, style)])
+        merge_row(sheet, row, block["merge"])
+        row += 1
+    return row
+
+
+def render_spacer(sheet, block, data, row, heights):
+    with phase("dimensions"):
+        sheet.set_height(row, block["height"])
+    sheet.append([])
+    return row + 1
+
+
+@functools.lru_cache(maxsize=None)
+def style_metrics(style, header=False):
+    """Text measurement settings for a named style; wrapped headers may take two lines"""
+    named = STYLES[style]
+    wrap = bool(named.alignment.wrap_text)
+    return text_metrics(named.font.sz, named.font.b, wrap, fit_lines=2 if header and wrap else 1)
+
+
+def display_text(column, value, style, data):
+    """The text a cell shows, for measuring: formulas evaluated, numbers in the style's format"""
+    if column.get("formula"):
+        value = evaluate(value, data.names)
+    elif has_formula(value):
+        return render_text(value, data.names)
+    if value is None or isinstance(value, str):
+        return value or ""
+
+    number_format = STYLES[style].number_format
+    if number_format == "General":
+        return to_text(value)
+    return excel_text(value, number_format.replace('"', ""))
+
+
+def layout_cells(spec, data):
+    """(row, column, text, metrics) for every table cell of a spec, with rows numbered as render_sheet does"""
+    row = 1
+    for block in spec["blocks"]:
+        if block["type"] == "table":
+            columns = block["columns"]
+            if "header_style" in block:
+                metrics = style_metrics(block["header_style"], header=True)
+                for col, column in enumerate(columns):
+                    yield row, col, column["header"], metrics
+                row += 1
+            for _, values in table_rows(block, data):
+                for col, (column, (value, style)) in enumerate(zip(columns, values)):
+                    yield row, col, display_text(column, value, style, data), style_metrics(style)
+                row += 1
+        elif block["type"] == "banners":
+            row += len(data[block["rows"]])
+        else:
+            row += 1
+
+
+def sheet_layout(spec, data):
+    """
+    Column widths and {row: height} for a spec. Content is only measured
+    when the spec asks for an "auto" width or row height.
+    """
+    widths = spec["widths"]
+    if widths == "auto":
+        widths = ["auto"] * max(len(block["columns"]) for block in spec["blocks"] if block["type"] == "table")
+    if "auto" not in widths and not any(block.get("row_height") == "auto" for block in spec["blocks"]):
+        return widths, {}
+
+    with phase("layout"):
+        return fit(layout_cells(spec, data), widths, spec.get("max_width", DEFAULT_MAX_WIDTH))
+
+
+BLOCK_RENDERERS = {
+    "table": render_table,
+    "banners": render_banners,
+    "spacer": render_spacer,
+}
+
+
+# ---------------------------------------------------------------------------
+# Dataset
+#
+# Tab content lives in versioned JSON files under data/competitor_comparison/
+# so the numbers can change without touching this script. Each file holds
+# one or more tables, keyed by the names the sheet specs below refer to.
+# ---------------------------------------------------------------------------
+
+DATASET_VERSION = 1
+
+# Row types of the tables (see comparison.records)
+
+@record
+class Stream(Record):
+    name: str
+    we_charge: str
+    eventbrite: str
+    others: str
+    win: str
+    improve: str
+
+
+@record
+class Comparison(Record):
+    feature: str
+    sponsorsynq: str
+    eventbrite: str
+    winner: str
+
+
+@record
+class Differentiator(Record):
+    name: str
+    means: str
+    matters: str
+
+
+@record
+class Revenue(Record):
+    stream: str
+    who_pays: str
+    amount: str
+    triggers: str
+    competitors: str
+
+
+@record
+class Banner(Record):
+    text: str
+    style: str
+
+
+@record
+class ActionItem(Record):
+    area: str
+    what: str
+    why: str
+    priority: str
+
+
+@record
+class Assumption(Record):
+    name: str
+    label: str
+    value: int | float
+    format: str
+
+
+@record
+class Calculation(Record):
+    name: str
+    label: str
+    formula: str
+    format: str
+
+
+@record
+class MatchingResult(Record):
+    sponsors: int
+    events: int
+    pairs: int
+    seconds: int | float
+    pairs_per_second: int
+    p50_ms: int | float
+    p95_ms: int | float
+    p99_ms: int | float
+
+
+# Written by comparison.live_metrics; None (a blank cell) where the export has no data for a window
+@record
+class LiveKpi(Record):
+    kpi: str
+    format: str
+    last_week: int | float | None
+    previous_week: int | float | None
+    change: int | float | None
+    last_month: int | float | None
+    all_time: int | float | None
+
+
+@record
+class ReferralSummary(Record):
+    metric: str
+    format: str
+    mean: float
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+
+
+@record
+class Competitor(Record):
+    name: str
+    focus: str
+
+
+@record
+class MatrixFeature(Record):
+    name: str
+    category: str
+
+
+@record
+class Rating(Record):
+    feature: str
+    competitor: str
+    value: str
+    score: int | float
+
+
+@record
+class HeadToHead(Record):
+    feature: str
+    category: str
+    ours: str
+    theirs: str
+    winner: str
+    outcome: str
+
+
+# File and row type of every table. Record tables are stored as objects
+# keyed by field, or as lists in field order where "layout" is "list".
+# "fields" describes tables of plain object rows by the type(s) of each
+# key, and "object" marks a table that is a single settings object
+# instead of a list of rows.
+DATASET_SCHEMA = {
+    "streams": {"file": "revenue_streams.json", "record": Stream},
+    "comparisons": {"file": "quick_comparison.json", "record": Comparison, "layout": "list"},
+    "differentiators": {"file": "core_differentiators.json", "record": Differentiator},
+    "revenues": {"file": "revenue_summary.json", "record": Revenue, "layout": "list"},
+    "core_message": {"file": "action_items.json", "record": Banner, "layout": "list"},
+    "high_priority_title": {"file": "action_items.json", "record": Banner, "layout": "list"},
+    "high_priority": {"file": "action_items.json", "record": ActionItem, "layout": "list"},
+    "medium_priority_title": {"file": "action_items.json", "record": Banner, "layout": "list"},
+    "medium_priority": {"file": "action_items.json", "record": ActionItem, "layout": "list"},
+    "low_priority_title": {"file": "action_items.json", "record": Banner, "layout": "list"},
+    "low_priority": {"file": "action_items.json", "record": ActionItem, "layout": "list"},
+    "fee_schedules": {
+        "file": "fees.json",
+        "fields": {
+            "name": str,
+            "subscription_monthly": (int, float, str),
+            "subscription_required": bool,
+            "components": list
+        }
+    },
+    "scenario_sweep": {
+        "file": "fees.json",
+        "object": {
+            "ticket_prices": list,
+            "tickets_sold": list,
+            "sponsorship": list,
+            "sponsor_commission": (int, float, str)
+        }
+    },
+    "referral_tiers": {
+        "file": "referral_program.json",
+        "fields": {
+            "name": str,
+            "min_referrals": int,
+            "bounty": (int, float, str),
+            "rev_share": (int, float, str),
+            "perk_monthly": (int, float, str)
+        }
+    },
+    "referral_simulation": {
+        "file": "referral_program.json",
+        "object": {
+            "trajectories": int,
+            "months": int,
+            "seed_ambassadors": int,
+            "referrals_per_month": (int, float),
+            "success_rate": (int, float),
+            "ambassador_rate": (int, float),
+            "host_monthly_sales": (int, float, str),
+            "sales_sigma": (int, float),
+            "take_rate": (int, float, str),
+            "seed": int
+        }
+    },
+    "competitors": {"file": "feature_matrix.json", "record": Competitor, "layout": "list"},
+    "matrix_features": {"file": "feature_matrix.json", "record": MatrixFeature, "layout": "list"},
+    "ratings": {"file": "feature_matrix.json", "record": Rating, "layout": "list"},
+    "matching_notes": {"file": "matching_performance.json", "record": Banner, "layout": "list"},
+    "matching_results": {"file": "matching_performance.json", "record": MatchingResult},
+    "live_kpi_notes": {"file": "live_kpis.json", "record": Banner, "layout": "list"},
+    "live_kpis": {"file": "live_kpis.json", "record": LiveKpi},
+    "assumptions": {"file": "assumptions.json", "record": Assumption},
+    "calculations": {"file": "assumptions.json", "record": Calculation},
+}
+
+# Excel defined names: no spaces, and nothing that reads as a cell reference
+DEFINED_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*")
+CELL_REFERENCE = re.compile(r"[A-Za-z]{1,3}[0-9]+|[RrCc][0-9]*")
+
+FACT_PLACEHOLDER = re.compile(r"\{([A-Za-z0-9_]+)\}")
+
+# Ticket prices the fee examples are computed at
+FEE_EXAMPLE_PRICES = [10, 20, 50, 100]
+
+
+class Dataset(Mapping):
+    """
+    Tab data read from a dataset directory.
+
+    A file is parsed and validated the first time one of its tables is
+    used, then kept for the life of the Dataset. Tables in DERIVED_TABLES
+    are computed from the others on first use, and so are the tables of
+    DERIVED_TABLE_FAMILIES, which take an argument after a slash
+    ("head_to_head/Eventbrite").
+
+    Text values may contain {placeholders} for computed fee figures (see
+    comparison.fees.fee_facts), e.g. "Breakeven: {sponsorsynq_breakeven}",
+    and {=...} formulas over the assumptions (see comparison.formulas),
+    e.g. "{=SponsorCommissionRate|0%} of sponsor allocations". Fee schedule
+    amounts may name an assumption instead of giving a number.
+
+    A Dataset can be shared between threads (the service's requests, a
+    build and its exports): loading and computing tables happen under a
+    lock, so each is done once.
+    """
+
+    def __init__(self, path=DEFAULT_DATASET):
+        self.path = path
+        # Reentrant: derived tables and properties read other tables
+        self._lock = threading.RLock()
+        self._tables = {}
+        self._fee_model = None
+        self._facts = None
+        self._names = None
+        self._referrals = None
+        self._feature_matrix = None
+
+    def __getitem__(self, name):
+        # Tables are only ever added, so one already there is read without the lock
+        table = self._tables.get(name)
+        if table is not None:
+            return table
+        with self._lock:
+            if name not in self._tables:
+                family, _, argument = name.partition("/")
+                if name in DERIVED_TABLES:
+                    self._tables[name] = DERIVED_TABLES[name](self)
+                elif name in DATASET_SCHEMA:
+                    self._load(DATASET_SCHEMA[name]["file"])
+                elif argument and family in DERIVED_TABLE_FAMILIES:
+                    self._tables[name] = DERIVED_TABLE_FAMILIES[family](self, argument)
+                else:
+                    raise KeyError(name)
+            return self._tables[name]
+
+    def __iter__(self):
+        yield from DATASET_SCHEMA
+        yield from DERIVED_TABLES
+
+    def __len__(self):
+        return len(DATASET_SCHEMA) + len(DERIVED_TABLES)
+
+    @property
+    def fee_model(self):
+        with self._lock:
+            if self._fee_model is None:
+                self._fee_model = FeeModel.from_records(self["fee_schedules"], self.names)
+        return self._fee_model
+
+    @property
+    def names(self):
+        """Values of the Assumptions sheet's defined names: the inputs, then each calculation in order"""
+        with self._lock:
+            if self._names is None:
+                path = os.path.join(self.path, DATASET_SCHEMA["assumptions"]["file"])
+                names = {}
+                for row in itertools.chain(self["assumptions"], self["calculations"]):
+                    name = row.name
+                    if not DEFINED_NAME.fullmatch(name) or CELL_REFERENCE.fullmatch(name) or name in names:
+                        raise ValueError(f"{path}: invalid or duplicate assumption name {name!r}")
+                    if isinstance(row, Calculation):
+                        try:
+                            names[name] = evaluate(row.formula, names)
+                        except (ValueError, ZeroDivisionError) as e:
+                            raise ValueError(f"{path}: can't evaluate {name}: {e}") from None
+                    else:
+                        names[name] = row.value
+                self._names = names
+        return self._names
+
+    @property
+    def referral_settings(self):
+        return ReferralSimulation.from_record(self["referral_simulation"], self.names)
+
+    @property
+    def referrals(self):
+        """Per-trajectory results of the referral program simulation (see comparison.referrals.simulate)"""
+        with self._lock:
+            if self._referrals is None:
+                tiers = [ReferralTier.from_record(record, self.names) for record in self["referral_tiers"]]
+                self._referrals = simulate(tiers, self.referral_settings)
+        return self._referrals
+
+    @property
+    def feature_matrix(self):
+        """The competitor x feature ratings, indexed (see comparison.feature_matrix)"""
+        with self._lock:
+            if self._feature_matrix is None:
+                competitors = self["competitors"].column("name")
+                if len(competitors) < 2:
+                    raise ValueError(f"{self.path}: the feature matrix needs at least two competitors")
+                ratings = self["ratings"]
+                try:
+                    self._feature_matrix = FeatureMatrix(competitors, self["matrix_features"].column("name"), zip(
+                        *(ratings.column(key) for key in ("feature", "competitor", "value", "score"))
+                    ))
+                except ValueError as e:
+                    path = os.path.join(self.path, DATASET_SCHEMA["ratings"]["file"])
+                    raise ValueError(f"{path}: {e}") from None
+        return self._feature_matrix
+
+    @property
+    def facts(self):
+        with self._lock:
+            if self._facts is None:
+                self._facts = fee_facts(self.fee_model, FEE_EXAMPLE_PRICES)
+        return self._facts
+
+    def _load(self, filename):
+        path = os.path.join(self.path, filename)
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+
+        if doc.get("version") != DATASET_VERSION:
+            raise ValueError(f"{path}: expected dataset version {DATASET_VERSION}, got {doc.get('version')!r}")
+
+        for name, schema in DATASET_SCHEMA.items():
+            if schema["file"] == filename:
+                table = validate_table(path, name, doc.get(name), schema)
+                if "object" not in schema:
+                    table = self._fill_placeholders(path, name, table)
+                self._tables[name] = table
+
+    def _fill_placeholders(self, path, name, table):
+        # {=...} formulas are left for the renderer
+        def fact(match):
+            if match.group(1) not in self.facts:
+                raise ValueError(f"{path}: bad placeholder in {name}: {match.group(0)!r}")
+            return self.facts[match.group(1)]
+
+        def fill(value):
+            if not isinstance(value, str) or "{" not in value:
+                return value
+            return FACT_PLACEHOLDER.sub(fact, value)
+
+        if isinstance(table, RecordTable):
+            return table.map(fill)
+        return [{key: fill(value) for key, value in row.items()} for row in table]
+
+
+def validate_table(path, name, rows, schema):
+    """
+    Check rows against a DATASET_SCHEMA entry, raising ValueError on the
+    first bad row. Record tables come back as a RecordTable.
+    """
+    if "object" in schema:
+        fields = schema["object"]
+        if not (isinstance(rows, dict)
+                and sorted(rows) == sorted(fields)
+                and all(isinstance(rows[key], types) for key, types in fields.items())):
+            raise ValueError(f"{path}: '{name}' does not match the schema {schema}")
+        return rows
+
+    if not isinstance(rows, list):
+        raise ValueError(f"{path}: '{name}' must be a list of rows")
+
+    if "record" in schema:
+        return RecordTable.from_rows(schema["record"], rows, f"{path}: {name}")
+
+    fields = schema["fields"]
+    for i, row in enumerate(rows):
+        if not (isinstance(row, dict)
+                and sorted(row) == sorted(fields)
+                and all(isinstance(row[key], types) for key, types in fields.items())):
+            raise ValueError(f"{path}: {name}[{i}] does not match the schema {schema}")
+
+    return rows
+
+
+def fee_breakdown_rows(data):
+    """Per-ticket fees at each example price, monthly plan and plan breakeven, one row per platform"""
+    model = data.fee_model
+    fees = model.per_ticket_fees(FEE_EXAMPLE_PRICES)
+    breakeven = model.subscription_breakeven()
+
+    rows = []
+    for i, schedule in enumerate(model.schedules):
+        rows.append(
+            [schedule.name]
+            + [round(float(fee), 2) for fee in fees[i]]
+            + [schedule.subscription_monthly or None,
+               None if breakeven[i] != breakeven[i] else round(float(breakeven[i]), 2)]
+        )
+    return rows
+
+
+def scenario_sweep_rows(data):
+    """
+    One row per price x tickets x plan x sponsorship scenario: the four
+    axes, then total, host and attendee cost for every platform, then the
+    sponsorship split. The whole grid is computed in one batch.
+    """
+    sweep = data["scenario_sweep"]
+    commission = sweep["sponsor_commission"]
+    if isinstance(commission, str):
+        commission = data.names[commission]
+    grid = scenario_grid(
+        data.fee_model,
+        sweep["ticket_prices"],
+        sweep["tickets_sold"],
+        sweep["sponsorship"],
+        commission
+    )
+    numbers = [
+        grid["price"][None, :],
+        grid["tickets"][None, :],
+        grid["sponsorship"][None, :],
+        grid["total"],
+        grid["host"],
+        grid["attendee"],
+        grid["sponsor_to_host"][None, :],
+        grid["sponsor_commission"][None, :],
+    ]
+    # Each array row is already one table column, so no transpose is needed
+    columns = np.concatenate(numbers).round(2).tolist()
+
+    # Tickets sold are whole numbers; the plan flag goes in as text
+    columns[1] = [int(tickets) for tickets in columns[1]]
+    columns.insert(2, ["Yes" if subscribed else "No" for subscribed in grid["subscribed"].tolist()])
+
+    platforms = range(len(grid["total"]))
+    fields = (
+        ["price", "tickets", "plan", "sponsorship"]
+        + [f"{kind}_{i}" for kind in ("total", "host", "attendee") for i in platforms]
+        + ["sponsor_to_host", "sponsor_commission"]
+    )
+    return RecordTable(positional_record("ScenarioRow", tuple(fields)), columns)
+
+
+# Referral simulation results shown on the Referral Simulation tab:
+# (label, format, key in the simulate() results)
+REFERRAL_METRICS = [
+    ("Referred sign-ups", "number", "users"),
+    ("Paying hosts referred", "number", "hosts"),
+    ("Ambassadors at the end", "number", "ambassadors"),
+    ("Referral bounties", "currency", "bounties"),
+    ("Promoter revenue share", "currency", "rev_share"),
+    ("Tier perks given", "currency", "perks"),
+    ("Total payout cost", "currency", "payouts"),
+    ("Platform revenue from referred hosts", "currency", "platform_revenue"),
+    ("Platform net revenue", "currency", "net_revenue"),
+]
+
+
+def referral_summary_rows(data):
+    """Mean and percentiles over the simulated trajectories of each of REFERRAL_METRICS"""
+    results = data.referrals
+    return RecordTable.from_records(ReferralSummary, (
+        ReferralSummary(label, fmt, *(round(value, 2) for value in summarize(results[key])))
+        for label, fmt, key in REFERRAL_METRICS
+    ))
+
+
+def referral_notes_rows(data):
+    """Banner rows for the Referral Simulation tab: what was simulated, and how often the program pays off"""
+    settings, results = data.referral_settings, data.referrals
+    payback = float(np.mean(results["net_revenue"] > 0))
+    revenue = float(results["platform_revenue"].sum())
+    # No referred revenue at all (e.g. no seed ambassadors): there is no share to show
+    cost_share = f"{float(results['payouts'].sum()) / revenue:.1%}" if revenue else "n/a"
+    return RecordTable.from_rows(Banner, [
+        ["AMBASSADOR REFERRAL PROGRAM SIMULATION", "title"],
+        [f"{settings.trajectories:,} Monte Carlo runs x {settings.months} months from "
+         f"{settings.seed_ambassadors} seed ambassadors each: {int(results['users'].sum()):,} simulated users",
+         "message"],
+        [f"Totals per run. Net positive in {payback:.0%} of runs; payouts cost {cost_share} of the revenue "
+         f"referred hosts bring",
+         "message"],
+    ])
+
+
+# Rows above the features on the Feature Matrix tab: (label, per-competitor
+# array of the FeatureMatrix, whether higher is better)
+FEATURE_MATRIX_TOTALS = [
+    ("Features rated", "rated", True),
+    ("Features led", "wins", True),
+    ("Outright wins", "outright_wins", True),
+    ("Average rank", "mean_rank", False),
+]
+
+
+def matrix_record(competitors):
+    """Row type of the Feature Matrix tab: feature, category, a value and a leader flag per competitor, winner, outcome"""
+    n = len(competitors)
+    return positional_record("MatrixRow", ("feature", "category", *(f"competitor_{i}" for i in range(n)),
+                                           *(f"leader_{i}" for i in range(n)), "winner", "outcome"))
+
+
+def leader_label(names):
+    """Winner column text for the competitors that share the top score"""
+    if len(names) <= 1:
+        return names[0] if names else ""
+    return f"Tie: {', '.join(names)}" if len(names) <= 3 else f"{len(names)}-way tie"
+
+
+def feature_matrix_rows(data):
+    """One row per feature: every competitor's rating, which of them lead, and how the first competitor fares"""
+    matrix = data.feature_matrix
+    columns = (
+        [matrix.features, data["matrix_features"].column("category")]
+        + matrix.value_columns()
+        + matrix.leader_columns()
+        + [[leader_label(names) for names in matrix.leader_names()], matrix.outcomes(matrix.competitors[0])]
+    )
+    return RecordTable(matrix_record(matrix.competitors), columns)
+
+
+def feature_matrix_totals(data):
+    """The FEATURE_MATRIX_TOTALS rows: rank aggregates per competitor, with the best of each marked"""
+    matrix = data.feature_matrix
+    rows = []
+    for label, attribute, higher in FEATURE_MATRIX_TOTALS:
+        values = getattr(matrix, attribute)
+        # Competitors without ratings have no average rank
+        comparable = np.where(np.isnan(values), -np.inf if higher else np.inf, values)
+        leads = comparable == (comparable.max() if higher else comparable.min())
+        names = [name for name, lead in zip(matrix.competitors, leads.tolist()) if lead]
+        outcome = "loss" if not leads[0] else "win" if len(names) == 1 else "tie"
+        # NaN (no ratings) is left blank
+        shown = [None if value != value else round(value, 2) for value in values.tolist()]
+        rows.append([label, None, *shown, *leads.tolist(), leader_label(names), outcome])
+    return RecordTable.from_rows(matrix_record(matrix.competitors), rows)
+
+
+def head_to_head_rows(data, rival):
+    """The features rated for the first competitor or rival, with both ratings and the winner of each"""
+    matrix = data.feature_matrix
+    home = matrix.competitors[0]
+    if rival == home or rival not in matrix.competitor_index:
+        raise KeyError(f"head_to_head/{rival}")
+    features, outcomes = matrix.head_to_head(home, rival)
+    features, outcomes = features.tolist(), outcomes.tolist()
+    categories = data["matrix_features"].column("category")
+    ours, theirs = matrix.column(home), matrix.column(rival)
+    winners = {1: home, 0: "Tie", -1: rival}
+    results = {1: "win", 0: "tie", -1: "loss"}
+    return RecordTable(HeadToHead, [
+        [matrix.features[i] for i in features],
+        [categories[i] for i in features],
+        [ours[i] for i in features],
+        [theirs[i] for i in features],
+        [winners[outcome] for outcome in outcomes],
+        [results[outcome] for outcome in outcomes],
+    ])
+
+
+def head_to_head_notes_rows(data, rival):
+    """Banner rows for a head-to-head tab: who the rival is, and the tally"""
+    home = data.feature_matrix.competitors[0]
+    outcomes = data[f"head_to_head/{rival}"].column("outcome")
+    focus = dict(zip(data["competitors"].column("name"), data["competitors"].column("focus")))
+    return RecordTable.from_rows(Banner, [
+        [f"{home} vs {rival}".upper(), "title"],
+        [f"{rival}: {focus[rival]}", "message"],
+        [f"{home} leads on {outcomes.count('win')} of the {len(outcomes)} features rated for either, "
+         f"{rival} on {outcomes.count('loss')}, {outcomes.count('tie')} tied", "message"],
+    ])
+
+
+# Tables computed from the loaded ones
+DERIVED_TABLES = {
+    "fee_breakdown": fee_breakdown_rows,
+    "scenario_sweep_rows": scenario_sweep_rows,
+    "referral_summary": referral_summary_rows,
+    "referral_notes": referral_notes_rows,
+    "feature_matrix_rows": feature_matrix_rows,
+    "feature_matrix_totals": feature_matrix_totals,
+}
+
+# Tables computed per argument: "head_to_head/Eventbrite" is
+# head_to_head_rows(data, "Eventbrite")
+DERIVED_TABLE_FAMILIES = {
+    "head_to_head": head_to_head_rows,
+    "head_to_head_notes": head_to_head_notes_rows,
+}
+
+
+_datasets = {}
+
+
+def load_dataset(path=None):
+    """Return the Dataset for a directory (the bundled data by default), reusing one already loaded"""
+    path = os.path.realpath(path or DEFAULT_DATASET)
+    if path not in _datasets:
+        _datasets[path] = Dataset(path)
+    return _datasets[path]
+
+
+# ---------------------------------------------------------------------------
+# Incremental builds
+#
+# The manifest records a hash of every tab's inputs (its spec and the tables
+# it renders) together with a fingerprint of the generator, plus a hash of
+# the workbook that was written. If all of them still match, the build is
+# skipped. It also records a hash of the raw inputs (sources, dataset files
+# and options), which comparison.manifest checks from the files alone: an
+# unchanged build is then skipped before the dataset is even loaded.
+#
+# openpyxl numbers shared strings and cell styles across the whole workbook,
+# so a sheet's XML part depends on every sheet before it. Copying unchanged
+# parts out of the previous archive would leave them pointing at the wrong
+# strings and styles, so any change rebuilds the full workbook; the manifest
+# reports which tabs caused it.
+# ---------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def generator_fingerprint():
+    """Hash of this script, the comparison package and the openpyxl version, so code changes invalidate old outputs"""
+    return content_hash([source_hashes(), library_version("openpyxl"), DATASET_VERSION])
+
+
+def spec_tables(spec):
+    """Names of the dataset tables a sheet spec renders"""
+    return sorted({block["rows"] for block in spec["blocks"] if "rows" in block})
+
+
+def tab_specs(data):
+    """(title, spec) for every tab, with spec functions applied to data"""
+    return [(title, spec(data) if callable(spec) else spec) for title, _, spec in workbook_tabs(data)]
+
+
+def tab_hashes(data):
+    """Hash of every tab's spec and the tables it renders, by title"""
+    tabs = {}
+    for title, spec in tab_specs(data):
+        tables = {name: data[name] for name in spec_tables(spec)}
+        tabs[title] = content_hash([spec, tables])
+    return tabs
+
+
+def build_manifest(data, options=None, tabs=None):
+    """The manifest of a build of data with options; tabs are its tab_hashes() if already computed"""
+    manifest = {"generator": generator_fingerprint(), "options": options or {}, "tabs": tabs or tab_hashes(data)}
+    # Only a dataset read from a directory can be checked against its files
+    if isinstance(data, Dataset):
+        manifest["inputs"] = inputs_hash(data.path, options or {})
+    return manifest
+
+
+def changed_tabs(manifest, previous, output):
+    """
+    Titles of the tabs that need rebuilding: all of them when there is no
+    previous manifest, the generator or build options changed or the output file is missing
+    or was modified after it was written.
+    """
+    titles = list(manifest["tabs"])
+    if (previous is None
+            or previous.get("generator") != manifest["generator"]
+            or previous.get("options", {}) != manifest["options"]
+            or not os.path.exists(output)
+            or previous.get("output") != file_hash(output)):
+        return titles
+
+    previous_tabs = previous.get("tabs", {})
+    return [title for title in titles if previous_tabs.get(title) != manifest["tabs"][title]]
+
+
+# ---------------------------------------------------------------------------
+# Reports
+#
+# The HTML report and Markdown summary (see comparison.report) are rendered
+# from the same specs and dataset as the workbook. Each tab's fragment is
+# cached under its manifest hash, so a build only renders the changed tabs.
+# ---------------------------------------------------------------------------
+
+REPORT_TITLE = "SponsorSynq Competitor Comparison"
+
+
+def report_sections(spec, data):
+    """A tab's blocks as comparison.report sections: banner lines, and tables of (value, style) cells"""
+    sections = []
+    for block in spec["blocks"]:
+        if block["type"] == "banners":
+            sections.append({"banners": [(text, style) for text, style in data[block["rows"]]]})
+        elif block["type"] == "table":
+            columns = block["columns"]
+            rows = []
+            for _, cells in table_rows(block, data):
+                row = []
+                for column, (value, style) in zip(columns, cells):
+                    # Formulas are shown as their results, like the JSON export
+                    if column.get("formula"):
+                        value = evaluate(value, data.names)
+                    elif has_formula(value):
+                        value = render_text(value, data.names)
+                    row.append((value, style))
+                rows.append(row)
+            sections.append({
+                "header": [column["header"] for column in columns] if "header_style" in block else None,
+                "header_style": block.get("header_style"),
+                "rows": rows
+            })
+    return sections
+
+
+def write_report_files(data, formats, directory=".", tabs=None):
+    """
+    Write the reports in formats (any of REPORT_FORMATS) to directory as
+    competitor_comparison.html / .md. tabs are the tab_hashes() of data if
+    already computed. Returns (paths written, titles of the tabs rendered).
+    """
+    tabs = tabs or tab_hashes(data)
+    report_tabs = [(title, tabs[title], functools.partial(report_sections, spec, data))
+                   for title, spec in tab_specs(data)]
+    return write_reports(report_tabs, formats, directory, EXPORT_NAME, REPORT_TITLE, STYLES,
+                         generator_fingerprint())
+
+
+REVENUE_STREAMS_SHEET = {
+    "widths": "auto",
+    "max_width": 35,
+    "blocks": [
         {
-            "name": "7. Premium Analytics",
-            "we_charge": "$7/month standalone\nFree with Pro subscription\nTraffic sources, timing, feedback\nExportable reports",
-            "eventbrite": "Basic: Free\nAdvanced: Bundled in $15-100/mo Pro\nCan't buy separately",
-            "others": "Mixpanel: $20+/mo (general tool)\nSplash: $100s/mo (enterprise)\nGoogle Analytics: Free (not event-specific)",
-            "win": "• Event-specific at low price\n• $7/mo accessible to all\n• Free with subscription adds value",
-            "improve": "• Make insights actionable\n• Connect to recommended actions\n• Add sponsor-specific analytics\n• Create feedback loop"
-        },
+            "type": "table",
+            "rows": "streams",
+            "header_style": "header",
+            "row_style": "body",
+            "row_height": "auto",
+            "columns": [
+                {"header": "Revenue Stream", "key": "name", "style": "row_label"},
+                {"header": "What We Charge", "key": "we_charge"},
+                {"header": "What Eventbrite Charges", "key": "eventbrite"},
+                {"header": "What Others Charge", "key": "others"},
+                {"header": "Where We Win", "key": "win"},
+                {"header": "Where We Need to Improve", "key": "improve"}
+            ]
+        }
+    ]
+}
+
+QUICK_COMPARISON_SHEET = {
+    "widths": "auto",
+    "max_width": 35,
+    "blocks": [
         {
-            "name": "8. Event Boost",
-            "we_charge": "$15 for 7 days\nPriority in sponsor discovery\nCompletely optional",
-            "eventbrite": "Eventbrite Ads: $50-500+\nVariable CPC/CPM\nFor events→attendees only",
-            "others": "Instagram boost: $7-70/week\nFacebook boost: ~$14/week\nBoth for attendees, not sponsors",
-            "win": "• Designed to attract SPONSORS\n• Unique product\n• $15 boost → sponsor offers\n• Direct ROI vs random reach",
-            "improve": "• Track & display performance\n• Show if boost → more offers\n• Offer tiers: $10/3d, $15/7d, $25/14d"
-        },
+            "type": "table",
+            "rows": "comparisons",
+            "header_style": "header",
+            "row_style": "body_center",
+            "row_height": "auto",
+            "columns": [
+                {"header": "Feature", "key": "feature"},
+                {"header": "SponsorSynq", "key": "sponsorsynq"},
+                {"header": "Eventbrite", "key": "eventbrite"},
+                {"header": "Winner", "key": "winner", "rules": [
+                    # Color code winners
+                    {"equals": "SponsorSynq", "style": "winner_green"},
+                    {"equals": "Tie", "style": "winner_yellow"},
+                    {"equals": "Eventbrite", "style": "winner_red"}
+                ]}
+            ]
+        }
+    ]
+}
+
+CORE_DIFFERENTIATORS_SHEET = {
+    "widths": "auto",
+    "max_width": 45,
+    "blocks": [
         {
-            "name": "9. Enterprise Licensing",
-            "we_charge": "$10K-25K/year\nCustom branding\nAdmin dashboards\nCompliance features",
-            "eventbrite": "Custom pricing\n$10Ks-$100Ks/year\nFocus: Corporations, festivals\nNot designed for universities",
-            "others": "Presence: $10K-50K/yr (no ticketing)\nCampusLabs: $15K-75K/yr (no sponsors)\nMeetup Pro: $2.5K+/yr",
-            "win": "• All-in-one: ticketing + sponsors + management\n• Others need multiple tools\n• Designed for student events",
-            "improve": "• Build admin/compliance features\n• Approval workflows, audit trails\n• SIS integration\n• Develop case studies"
-        },
+            "type": "table",
+            "rows": "differentiators",
+            "header_style": "header",
+            "row_style": "body",
+            "row_height": "auto",
+            "columns": [
+                {"header": "Differentiator", "key": "name", "style": "row_label_accent"},
+                {"header": "What It Means", "key": "means"},
+                {"header": "Why It Matters", "key": "matters"}
+            ]
+        }
+    ]
+}
+
+REVENUE_SUMMARY_SHEET = {
+    "widths": "auto",
+    "max_width": 35,
+    "blocks": [
         {
-            "name": "10. Ambassador Program",
-            "we_charge": "Tiered rewards:\n• Starter: $15/referral\n• Rising: $20 + free Analytics\n• Elite: $25 + 1% rev share\n• Founding: $30 + 2% rev share",
-            "eventbrite": "Give $10, Get $10\nCaps at $50 total\nNo tiers\nNo revenue share\nOne-time only",
-            "others": "Uber: $5-20 one-time\nDropbox: Storage bonus\nAirbnb: Travel credit\nAll one-time, no ongoing",
-            "win": "• Tiered = gamification\n• Revenue share = ongoing stake\n• No cap on earnings\n• Ambassadors help referrals succeed",
-            "improve": "• Surface program prominently\n• Show earnings on dashboard\n• Create leaderboards\n• Make Founding feel like achievement"
+            "type": "table",
+            "rows": "revenues",
+            "header_style": "header",
+            "row_style": "body_center",
+            "row_height": "auto",
+            "columns": [
+                {"header": "Stream", "key": "stream"},
+                {"header": "Who Pays", "key": "who_pays"},
+                {"header": "Amount", "key": "amount"},
+                {"header": "When It Triggers", "key": "triggers"},
+                {"header": "Competitors Have This?", "key": "competitors", "rules": [
+                    # Highlight unique offerings
+                    {"contains": "NO - ", "style": "winner_green"},
+                    {"icontains": "unique", "style": "winner_green"}
+                ]}
+            ]
         }
     ]
+}
 
-    row = 2
-    for stream in streams:
-        ws[f'A{row}'] = stream['name']
-        ws[f'B{row}'] = stream['we_charge']
-        ws[f'C{row}'] = stream['eventbrite']
-        ws[f'D{row}'] = stream['others']
-        ws[f'E{row}'] = stream['win']
-        ws[f'F{row}'] = stream['improve']
-
-        # Style the row
-        name_fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
-        ws[f'A{row}'].fill = name_fill
-        ws[f'A{row}'].font = Font(bold=True, size=11)
-
-        for col in range(1, 7):
-            cell = ws.cell(row, col)
-            cell.alignment = Alignment(vertical="top", wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
+FEE_BREAKDOWN_SHEET = {
+    "widths": "auto",
+    "max_width": 24,
+    "blocks": [
+        {
+            "type": "table",
+            "rows": "fee_breakdown",
+            "header_style": "header",
+            "row_style": "currency",
+            "row_height": "auto",
+            "columns": (
+                [{"header": "Platform", "key": 0, "style": "row_label"}]
+                + [
+                    {"header": f"Fees on ${price} Ticket", "key": i}
+                    for i, price in enumerate(FEE_EXAMPLE_PRICES, 1)
+                ]
+                + [
+                    {"header": "Monthly Plan", "key": len(FEE_EXAMPLE_PRICES) + 1},
+                    {"header": "Plan Pays For Itself At (Monthly Sales)", "key": len(FEE_EXAMPLE_PRICES) + 2}
+                ]
             )
+        }
+    ]
+}
+
+def scenario_sweep_sheet(data):
+    """Spec for the Scenario Sweep tab; its columns depend on the platforms in the fee model"""
+    platforms = data.fee_model.names
+    n = len(platforms)
+
+    columns = [
+        {"header": "Ticket Price", "key": 0, "style": "currency"},
+        {"header": "Tickets Sold", "key": 1},
+        {"header": "Subscribed?", "key": 2},
+        {"header": "Sponsorship", "key": 3, "style": "currency"},
+    ]
+    for offset, label in ((4, "Total Cost"), (4 + n, "Host Pays"), (4 + 2 * n, "Attendees Pay")):
+        columns += [
+            {"header": f"{platform} {label}", "key": offset + i, "style": "currency"}
+            for i, platform in enumerate(platforms)
+        ]
+    columns += [
+        {"header": "SponsorSynq Sponsor $ to Host", "key": 4 + 3 * n, "style": "currency"},
+        {"header": "SponsorSynq Sponsor Commission", "key": 5 + 3 * n, "style": "currency"},
+    ]
 
-        row += 1
-
-    # Set column widths
-    ws.column_dimensions['A'].width = 20
-    ws.column_dimensions['B'].width = 30
-    ws.column_dimensions['C'].width = 30
-    ws.column_dimensions['D'].width = 30
-    ws.column_dimensions['E'].width = 35
-    ws.column_dimensions['F'].width = 35
-
-    # Set row heights
-    for i in range(2, row):
-        ws.row_dimensions[i].height = 100
-
+    return {
+        "widths": "auto",
+        "max_width": 16,
+        "freeze": "E2",
+        "blocks": [
+            {
+                "type": "table",
+                "rows": "scenario_sweep_rows",
+                "header_style": "header",
+                "row_style": "body_center",
+                "row_height": "auto",
+                "columns": columns,
+                # Cheapest platform (lowest total cost) in each scenario
+                "conditional_formats": [
+                    {"rule": "row_min", "first": 5, "last": 4 + n, "style": "winner_green"}
+                ]
+            }
+        ]
+    }
+
+
+REFERRAL_SUMMARY_VALUE_STYLE = [{"key": "format", "equals": "currency", "style": "currency"}]
+
+# The referral program simulated with comparison.referrals, using the tiers
+# and settings in referral_program.json; amounts over the simulated months
+REFERRAL_SIMULATION_SHEET = {
+    "widths": "auto",
+    "max_width": 40,
+    "blocks": [
+        {"type": "banners", "rows": "referral_notes", "merge": 7},
+        {"type": "spacer", "height": 5},
+        {
+            "type": "table",
+            "rows": "referral_summary",
+            "header_style": "header",
+            "row_style": "number",
+            "row_height": "auto",
+            "columns": [
+                {"header": "Metric", "key": "metric", "style": "row_label"},
+                {"header": "Mean", "key": "mean", "rules": REFERRAL_SUMMARY_VALUE_STYLE},
+                {"header": "5th Percentile", "key": "p5", "rules": REFERRAL_SUMMARY_VALUE_STYLE},
+                {"header": "25th Percentile", "key": "p25", "rules": REFERRAL_SUMMARY_VALUE_STYLE},
+                {"header": "Median", "key": "p50", "rules": REFERRAL_SUMMARY_VALUE_STYLE},
+                {"header": "75th Percentile", "key": "p75", "rules": REFERRAL_SUMMARY_VALUE_STYLE},
+                {"header": "95th Percentile", "key": "p95", "rules": REFERRAL_SUMMARY_VALUE_STYLE}
+            ]
+        }
+    ]
+}
 
-def create_quick_comparison_tab(ws):
-    """Create Tab 2: Quick Comparison"""
 
-    # Headers
-    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True, size=12)
-
-    ws['A1'] = "Feature"
-    ws['B1'] = "SponsorSynq"
-    ws['C1'] = "Eventbrite"
-    ws['D1'] = "Winner"
-
-    for col in range(1, 5):
-        cell = ws.cell(1, col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    # Comparison data
-    comparisons = [
-        ["Processing Fee", "~3% + $0.30", "~6.6% + $1.79", "SponsorSynq"],
-        ["Platform Fee", "5% (waivable)", "~6.6% + $1.79 (not waivable)", "SponsorSynq"],
-        ["First Event", "FREE", "Fees apply", "SponsorSynq"],
-        ["Subscription Waives Fees?", "YES", "NO (double-dip)", "SponsorSynq"],
-        ["Sponsor Marketplace", "YES (built-in)", "NO", "SponsorSynq"],
-        ["Sponsor Matching AI", "YES", "NO", "SponsorSynq"],
-        ["Instant Payout", "YES (1.5%)", "NO", "SponsorSynq"],
-        ["Pricing Changes Since 2007", "0 (we're new)", "11 times", "SponsorSynq"],
-        ["Referral Program Cap", "UNLIMITED + rev share", "$50 max", "SponsorSynq"],
-        ["Free Event Posting", "YES", "YES (restored after backlash)", "Tie"],
-        ["Brand Recognition", "New/Unknown", "Industry Leader", "Eventbrite"],
-        ["Enterprise Clients", "Building", "Established", "Eventbrite"],
-        ["Global Infrastructure", "Building", "180+ countries", "Eventbrite"]
+# Measured by comparison.matching on synthetic marketplace data and stored in
+# the dataset; run python -m comparison.matching --write to refresh it.
+MATCHING_PERFORMANCE_SHEET = {
+    "widths": "auto",
+    "max_width": 18,
+    "blocks": [
+        {"type": "banners", "rows": "matching_notes", "merge": 8},
+        {"type": "spacer", "height": 5},
+        {
+            "type": "table",
+            "rows": "matching_results",
+            "header_style": "header",
+            "row_style": "number",
+            "row_height": "auto",
+            "columns": [
+                {"header": "Sponsors", "key": "sponsors"},
+                {"header": "Events", "key": "events"},
+                {"header": "Pairs Scored", "key": "pairs"},
+                {"header": "Full Pass (s)", "key": "seconds", "style": "decimal"},
+                {"header": "Pairs / Second", "key": "pairs_per_second"},
+                {"header": "Query p50 (ms)", "key": "p50_ms", "style": "decimal"},
+                {"header": "Query p95 (ms)", "key": "p95_ms", "style": "decimal"},
+                {"header": "Query p99 (ms)", "key": "p99_ms", "style": "decimal"}
+            ]
+        }
     ]
+}
+
+
+# Aggregated by comparison.live_metrics from an NDJSON export of the
+# dashboard's metrics and stored in the dataset; run
+# python -m comparison.live_metrics EXPORT --write to refresh it.
+LIVE_KPI_VALUE_STYLE = [
+    {"key": "format", "equals": "currency", "style": "currency"},
+    {"key": "format", "equals": "percent", "style": "percent"}
+]
+
+LIVE_KPIS_SHEET = {
+    "widths": "auto",
+    "max_width": 30,
+    "blocks": [
+        {"type": "banners", "rows": "live_kpi_notes", "merge": 6},
+        {"type": "spacer", "height": 5},
+        {
+            "type": "table",
+            "rows": "live_kpis",
+            "header_style": "header",
+            "row_style": "number",
+            "row_height": "auto",
+            "columns": [
+                {"header": "KPI", "key": "kpi", "style": "row_label"},
+                {"header": "Last 7 Days", "key": "last_week", "rules": LIVE_KPI_VALUE_STYLE},
+                {"header": "Previous 7 Days", "key": "previous_week", "rules": LIVE_KPI_VALUE_STYLE},
+                {"header": "Change", "key": "change", "style": "percent"},
+                {"header": "Last 30 Days", "key": "last_month", "rules": LIVE_KPI_VALUE_STYLE},
+                {"header": "All Time", "key": "all_time", "rules": LIVE_KPI_VALUE_STYLE}
+            ]
+        }
+    ]
+}
 
-    row = 2
-    for comp in comparisons:
-        ws[f'A{row}'] = comp[0]
-        ws[f'B{row}'] = comp[1]
-        ws[f'C{row}'] = comp[2]
-        ws[f'D{row}'] = comp[3]
-
-        # Color code winners
-        winner_fill_green = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-        winner_fill_yellow = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-        winner_fill_red = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-
-        if comp[3] == "SponsorSynq":
-            ws[f'D{row}'].fill = winner_fill_green
-            ws[f'D{row}'].font = Font(bold=True, color="006100")
-        elif comp[3] == "Tie":
-            ws[f'D{row}'].fill = winner_fill_yellow
-            ws[f'D{row}'].font = Font(bold=True, color="9C6500")
-        elif comp[3] == "Eventbrite":
-            ws[f'D{row}'].fill = winner_fill_red
-            ws[f'D{row}'].font = Font(bold=True, color="9C0006")
-
-        for col in range(1, 5):
-            cell = ws.cell(row, col)
-            cell.alignment = Alignment(vertical="center", wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-
-        row += 1
 
-    # Set column widths
-    ws.column_dimensions['A'].width = 30
-    ws.column_dimensions['B'].width = 30
-    ws.column_dimensions['C'].width = 35
-    ws.column_dimensions['D'].width = 20
+# Winner cells colored by how the first competitor (SponsorSynq) fares
+OUTCOME_STYLES = [
+    {"key": "outcome", "equals": "win", "style": "winner_green"},
+    {"key": "outcome", "equals": "tie", "style": "winner_yellow"},
+    {"key": "outcome", "equals": "loss", "style": "winner_red"}
+]
 
 
-def create_core_differentiators_tab(ws):
-    """Create Tab 3: Core Differentiators"""
+def feature_matrix_sheet(data):
+    """Spec for the Feature Matrix tab: a column per competitor, the rank totals above the features"""
+    competitors = data.feature_matrix.competitors
+    columns = [
+        {"header": "Feature", "key": "feature", "style": "row_label"},
+        {"header": "Category", "key": "category"}
+    ]
+    # Each feature's leaders (and each total's best) highlighted
+    columns += [
+        {"header": name, "key": f"competitor_{i}",
+         "rules": [{"key": f"leader_{i}", "equals": True, "style": "winner_green"}]}
+        for i, name in enumerate(competitors)
+    ]
+    columns.append({"header": "Leader", "key": "winner", "rules": OUTCOME_STYLES})
+    return {
+        "widths": "auto",
+        "max_width": 24,
+        # Header and totals stay in view, and so do the feature names
+        "freeze": f"C{len(FEATURE_MATRIX_TOTALS) + 2}",
+        "blocks": [
+            {
+                "type": "table",
+                "rows": "feature_matrix_totals",
+                "header_style": "header",
+                "row_style": "body_center",
+                "columns": columns
+            },
+            {
+                "type": "table",
+                "rows": "feature_matrix_rows",
+                "row_style": "body_center",
+                "row_height": "auto",
+                "columns": columns
+            }
+        ]
+    }
+
+
+def head_to_head_sheet(rival, data):
+    """Spec for the head-to-head tab of the first competitor against rival"""
+    home = data.feature_matrix.competitors[0]
+    return {
+        "widths": "auto",
+        "max_width": 35,
+        "blocks": [
+            {"type": "banners", "rows": f"head_to_head_notes/{rival}", "merge": 5},
+            {"type": "spacer", "height": 5},
+            {
+                "type": "table",
+                "rows": f"head_to_head/{rival}",
+                "header_style": "header",
+                "row_style": "body_center",
+                "row_height": "auto",
+                "columns": [
+                    {"header": "Feature", "key": "feature", "style": "row_label"},
+                    {"header": "Category", "key": "category"},
+                    {"header": home, "key": "ours"},
+                    {"header": rival, "key": "theirs"},
+                    {"header": "Winner", "key": "winner", "rules": OUTCOME_STYLES}
+                ]
+            }
+        ]
+    }
+
+
+# Inputs first, then the figures calculated from them. Every value cell gets
+# a workbook defined name that the other tabs' formulas refer to.
+ASSUMPTIONS_SHEET = {
+    "widths": "auto",
+    "max_width": 45,
+    "freeze": "A2",
+    "blocks": [
+        {
+            "type": "table",
+            "rows": "assumptions",
+            "header_style": "header",
+            "row_style": "body_center",
+            "row_height": "auto",
+            "names": {"key": "name", "column": 2},
+            "columns": [
+                {"header": "Assumption", "key": "label", "style": "row_label"},
+                {"header": "Value", "key": "value", "style": "currency", "rules": [
+                    {"key": "format", "equals": "percent", "style": "percent"}
+                ]},
+                {"header": "Name", "key": "name"}
+            ]
+        },
+        {"type": "spacer", "height": 10},
+        {
+            "type": "table",
+            "rows": "calculations",
+            "header_style": "header",
+            "row_style": "body_center",
+            "row_height": "auto",
+            "names": {"key": "name", "column": 2},
+            "columns": [
+                {"header": "Calculated", "key": "label", "style": "row_label"},
+                {"header": "Value", "key": "formula", "style": "currency", "formula": True, "rules": [
+                    {"key": "format", "equals": "percent", "style": "percent"}
+                ]},
+                {"header": "Name", "key": "name"}
+            ]
+        }
+    ]
+}
 
-    # Headers
-    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True, size=12)
 
-    ws['A1'] = "Differentiator"
-    ws['B1'] = "What It Means"
-    ws['C1'] = "Why It Matters"
+ACTION_ITEM_COLUMNS = [
+    {"header": "Area", "key": "area"},
+    {"header": "What To Build/Do", "key": "what"},
+    {"header": "Why It Matters", "key": "why"},
+    {"header": "Priority", "key": "priority"}
+]
 
-    for col in range(1, 4):
-        cell = ws.cell(1, col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+ACTION_ITEMS_SHEET = {
+    "widths": "auto",
+    "max_width": 45,
+    "blocks": [
+        {"type": "banners", "rows": "core_message", "merge": 4},
+        {"type": "spacer", "height": 5},
 
-    # Differentiator data
-    differentiators = [
-        {
-            "name": "1. SPONSOR MARKETPLACE",
-            "means": "We have one. They don't.",
-            "matters": "• Hosts make money they'd never find otherwise\n• This is our #1 differentiator\n• Eventbrite literally cannot compete"
-        },
+        {"type": "banners", "rows": "high_priority_title", "merge": 4},
         {
-            "name": "2. REVENUE PLATFORM vs TICKETING PLATFORM",
-            "means": "We help hosts MAKE money\nThey just help hosts SELL tickets",
-            "matters": "• Different value proposition entirely\n• We're not a cheaper Eventbrite\n• We're a different category"
-        },
-        {
-            "name": "3. SUBSCRIPTION ACTUALLY SAVES MONEY",
-            "means": "Our $19/mo waives fees\nTheir $15-100/mo doesn't",
-            "matters": "• Eventbrite double-dips\n• We reward active hosts\n• Clear economic value"
-        },
-        {
-            "name": "4. FIRST EVENT FREE",
-            "means": "Zero risk to try\nExperience value before paying",
-            "matters": "• Builds trust\n• Removes 'what if it doesn't work' anxiety\n• Converts skeptics"
+            "type": "table",
+            "rows": "high_priority",
+            "header_style": "priority_high",
+            "row_style": "body",
+            "row_height": "auto",
+            "columns": ACTION_ITEM_COLUMNS,
+            # Style completed items differently
+            "row_rules": [{"key": "priority", "equals": "COMPLETED", "style": "completed"}]
         },
+        {"type": "spacer", "height": 5},
+
+        {"type": "banners", "rows": "medium_priority_title", "merge": 4},
         {
-            "name": "5. PRICING STABILITY",
-            "means": "We won't surprise users\nThey've changed 11 times",
-            "matters": "• Eventbrite destroyed trust\n• We can win on reliability\n• Public commitment matters"
+            "type": "table",
+            "rows": "medium_priority",
+            "header_style": "priority_medium",
+            "row_style": "body",
+            "row_height": "auto",
+            "columns": ACTION_ITEM_COLUMNS
         },
+        {"type": "spacer", "height": 5},
+
+        {"type": "banners", "rows": "low_priority_title", "merge": 4},
         {
-            "name": "6. AMBASSADOR PROGRAM",
-            "means": "Tiered rewards + revenue share\nTheirs caps at $50",
-            "matters": "• Creates true evangelists\n• Ongoing stake in platform success\n• Organic growth engine"
+            "type": "table",
+            "rows": "low_priority",
+            "header_style": "priority_low",
+            "row_style": "body",
+            "row_height": "auto",
+            "columns": ACTION_ITEM_COLUMNS
         }
     ]
+}
 
-    row = 2
-    for diff in differentiators:
-        ws[f'A{row}'] = diff['name']
-        ws[f'B{row}'] = diff['means']
-        ws[f'C{row}'] = diff['matters']
-
-        # Style
-        name_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        ws[f'A{row}'].fill = name_fill
-        ws[f'A{row}'].font = Font(bold=True, size=11, color="FFFFFF")
-
-        for col in range(1, 4):
-            cell = ws.cell(row, col)
-            cell.alignment = Alignment(vertical="top", wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
 
-        row += 1
+def create_revenue_streams_tab(ws, data=None):
+    """Create Tab 1: Revenue Streams"""
+    render_sheet(ws, REVENUE_STREAMS_SHEET, data)
 
-    # Set column widths
-    ws.column_dimensions['A'].width = 40
-    ws.column_dimensions['B'].width = 35
-    ws.column_dimensions['C'].width = 45
 
-    # Set row heights
-    for i in range(2, row):
-        ws.row_dimensions[i].height = 75
+def create_quick_comparison_tab(ws, data=None):
+    """Create Tab 2: Quick Comparison"""
+    render_sheet(ws, QUICK_COMPARISON_SHEET, data)
 
 
-def create_revenue_summary_tab(ws):
-    """Create Tab 4: Revenue Summary"""
+def create_feature_matrix_tab(ws, data=None):
+    """Create the Feature Matrix tab: every competitor's rating of every feature, with the leaders marked"""
+    if data is None:
+        data = load_dataset()
+    render_sheet(ws, feature_matrix_sheet(data), data)
 
-    # Headers
-    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True, size=12)
-
-    ws['A1'] = "Stream"
-    ws['B1'] = "Who Pays"
-    ws['C1'] = "Amount"
-    ws['D1'] = "When It Triggers"
-    ws['E1'] = "Competitors Have This?"
-
-    for col in range(1, 6):
-        cell = ws.cell(1, col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    # Revenue summary data
-    revenues = [
-        ["Processing Fee", "Attendee", "~3% + $0.30", "Every ticket", "YES - but higher"],
-        ["Platform Fee", "Host", "5%", "2nd+ event, non-subscriber", "YES - but not waivable"],
-        ["Subscription", "Host", "$19/month", "Optional, waives 5% fee", "YES - but doesn't waive fees"],
-        ["Sponsor Commission", "Sponsor", "12%", "Every sponsorship deal", "NO - we're the only one"],
-        ["Featured Placement", "Sponsor", "$29", "Optional add-on", "NO - unique product"],
-        ["Instant Payout", "Host", "1.5%", "Optional, on-demand", "NO - Eventbrite doesn't offer"],
-        ["Premium Analytics", "Host", "$7/month", "Optional (free w/ Pro)", "PARTIAL - bundled only"],
-        ["Event Boost", "Host", "$15", "Optional, per event", "NO - unique to sponsors"],
-        ["Enterprise License", "University", "$10K-25K/year", "Annual contract", "YES - but no sponsor integration"],
-        ["Ambassador Program", "N/A (we pay)", "Credits + rev share", "Successful referrals", "WEAK - Eventbrite caps at $50"]
-    ]
 
-    row = 2
-    for rev in revenues:
-        ws[f'A{row}'] = rev[0]
-        ws[f'B{row}'] = rev[1]
-        ws[f'C{row}'] = rev[2]
-        ws[f'D{row}'] = rev[3]
-        ws[f'E{row}'] = rev[4]
-
-        # Highlight unique offerings
-        unique_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-        if "NO - " in rev[4] or "unique" in rev[4].lower():
-            ws[f'E{row}'].fill = unique_fill
-            ws[f'E{row}'].font = Font(bold=True, color="006100")
-
-        for col in range(1, 6):
-            cell = ws.cell(row, col)
-            cell.alignment = Alignment(vertical="center", wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
+def create_head_to_head_tab(rival, ws, data=None):
+    """Create the head-to-head tab of SponsorSynq (the first competitor) against rival"""
+    if data is None:
+        data = load_dataset()
+    render_sheet(ws, head_to_head_sheet(rival, data), data)
 
-        row += 1
 
-    # Set column widths
-    ws.column_dimensions['A'].width = 25
-    ws.column_dimensions['B'].width = 15
-    ws.column_dimensions['C'].width = 20
-    ws.column_dimensions['D'].width = 30
-    ws.column_dimensions['E'].width = 35
+def create_core_differentiators_tab(ws, data=None):
+    """Create Tab 3: Core Differentiators"""
+    render_sheet(ws, CORE_DIFFERENTIATORS_SHEET, data)
 
 
-def create_action_items_tab(ws):
-    """Create Tab 5: Action Items"""
+def create_revenue_summary_tab(ws, data=None):
+    """Create Tab 4: Revenue Summary"""
+    render_sheet(ws, REVENUE_SUMMARY_SHEET, data)
 
-    # Title
-    title_fill = PatternFill(start_color="C00000", end_color="C00000", fill_type="solid")
-    title_font = Font(color="FFFFFF", bold=True, size=14)
-
-    ws.merge_cells('A1:D1')
-    ws['A1'] = "THE CORE MESSAGE"
-    ws['A1'].fill = title_fill
-    ws['A1'].font = title_font
-    ws['A1'].alignment = Alignment(horizontal="center", vertical="center")
-
-    ws.merge_cells('A2:D2')
-    ws['A2'] = "We are NOT a cheaper Eventbrite."
-    ws['A2'].font = Font(bold=True, size=12, color="C00000")
-    ws['A2'].alignment = Alignment(horizontal="center", vertical="center")
-
-    ws.merge_cells('A3:D3')
-    ws['A3'] = "We are a REVENUE GENERATION platform."
-    ws['A3'].font = Font(bold=True, size=12, color="C00000")
-    ws['A3'].alignment = Alignment(horizontal="center", vertical="center")
-
-    ws.merge_cells('A4:D4')
-    ws['A4'] = "Eventbrite is just a TICKETING platform."
-    ws['A4'].font = Font(bold=True, size=11)
-    ws['A4'].alignment = Alignment(horizontal="center", vertical="center")
-
-    ws.merge_cells('A5:D5')
-    ws['A5'] = "Hosts who use us make more money because sponsors find them automatically."
-    ws['A5'].font = Font(bold=True, size=11)
-    ws['A5'].alignment = Alignment(horizontal="center", vertical="center")
-
-    ws.merge_cells('A6:D6')
-    ws['A6'] = "That's the story. That's how we win."
-    ws['A6'].font = Font(bold=True, size=12, color="C00000")
-    ws['A6'].alignment = Alignment(horizontal="center", vertical="center")
-
-    # Spacing
-    ws.row_dimensions[7].height = 5
-
-    # HIGH PRIORITY Section
-    high_header_fill = PatternFill(start_color="C00000", end_color="C00000", fill_type="solid")
-    high_header_font = Font(color="FFFFFF", bold=True, size=12)
-
-    ws.merge_cells('A8:D8')
-    ws['A8'] = "HIGH PRIORITY"
-    ws['A8'].fill = high_header_fill
-    ws['A8'].font = high_header_font
-    ws['A8'].alignment = Alignment(horizontal="center", vertical="center")
-
-    ws['A9'] = "Area"
-    ws['B9'] = "What To Build/Do"
-    ws['C9'] = "Why It Matters"
-    ws['D9'] = "Priority"
-
-    for col in range(1, 5):
-        cell = ws.cell(9, col)
-        cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    high_priority = [
-        ["✓ Sponsor Matching", "Build excellent AI matching algorithm", "Our 12% commission must feel justified by quality matches", "COMPLETED"],
-        ["✓ Verification System", "Robust photo upload + attendance tracking", "Sponsors need proof their money worked", "COMPLETED"],
-        ["✓ Dashboard Savings Display", "Show subscribers monthly savings vs 5%", "Psychological win every month", "COMPLETED"],
-        ["Ambassador Visibility", "Prominently feature program in UI", "Users won't discover it unless we surface it", "HIGH"],
-        ["Event Collaboration/Co-hosting", "Multi-host event collaboration system:\n• Primary & secondary event hosts\n• Real-time ticket revenue tracking for all hosts\n• Customizable revenue split (50/50, 60/40, etc.)\n• Primary host controls fund distribution\n• Venue payment tracking/metrics\n• Multi-city tour dashboard\n• Track all events under one tour umbrella", "Game-changer for large-scale events and tours. Creates network effects - hosts bring other hosts. Differentiates us from all competitors who only support single-host events.", "HIGH"],
-        ["Promoter Referral System", "Role-based promoter program:\n• Event hosts assign 'promoter' roles\n• Unique tracking links/QR codes per promoter\n• Track ticket sales by promoter link\n• Automatic commission payouts\n• Works like affiliate program but for event promotion\n• Promoters share on Instagram/TikTok stories", "Viral growth engine. Turns every event into distributed sales team. Promoters are incentivized to drive ticket sales. Event hosts get free marketing.", "HIGH"],
-        ["Landing Page Overhaul", "PRICING: Only 2 tiers:\n• Free: Unlimited events, basic features\n• $100/mo: Money-making features (was $19)\n\nMESSAGING:\n• Focus on ROI, not features\n• 'Save X, Make Y' psychology\n• Fewer words, clearer value\n• Show savings/earnings potential per feature\n\nCOMPETITOR COMPARISON:\n• REMOVE from landing page entirely\n• Move to post-signup dashboard\n• Only show after they're already users\n• Prevent competitors from copying our strategy", "Simplicity converts better. People don't want subscriptions - they want to 'pay when they get paid' or see clear ROI. Hiding competitor intel protects our competitive advantage.", "HIGH"],
-        ["Venue Partnership System", "Venue integration features:\n• Venues can create accounts\n• Event hosts connect their venue\n• Transparent revenue sharing dashboard\n• Track bar/food/door splits in real-time\n• Simple fund distribution\n\nVENUE LOCK-IN STRATEGY:\n• Partner with venues to require SponsorSynq\n• 'Want to use our venue? Use SponsorSynq'\n• Creates vendor lock-in\n• Eliminates competition with Eventbrite/Posh\n• Market domination through venue partnerships", "This is the ULTIMATE competitive moat. If venues require SponsorSynq, event hosts have no choice. We stop competing on features and own the distribution channel. Venue adoption = market domination.", "HIGH"],
-        ["Revenue Stream Documentation", "Comprehensive revenue analysis:\n• Document ALL current revenue streams\n• Platform fee, processing, sponsorship commission, etc.\n• Strategy for free events (no ticket sales)\n• How to monetize users who don't charge for tickets?\n• Options: Sponsorship-only commission, require subscription, tiered free limits\n• Question: Is free platform usage okay if it brings brand awareness?\n• Alternative revenue from free event hosts?", "Need clarity on business model edge cases. Free events still have value (brand awareness, sponsor discovery) but need strategy to ensure sustainable revenue. Must balance growth with monetization.", "HIGH"]
-    ]
 
-    row = 10
-    for item in high_priority:
-        ws[f'A{row}'] = item[0]
-        ws[f'B{row}'] = item[1]
-        ws[f'C{row}'] = item[2]
-        ws[f'D{row}'] = item[3]
-
-        # Style completed items differently
-        if item[3] == "COMPLETED":
-            completed_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
-            for col in range(1, 5):
-                ws.cell(row, col).fill = completed_fill
-                ws.cell(row, col).font = Font(color="70AD47", italic=True)
-
-        for col in range(1, 5):
-            cell = ws.cell(row, col)
-            cell.alignment = Alignment(vertical="top", wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
+def create_fee_breakdown_tab(ws, data=None):
+    """Create the Fee Breakdown tab: fees computed from the fee model"""
+    render_sheet(ws, FEE_BREAKDOWN_SHEET, data)
 
-        row += 1
 
-    # Set row heights for high priority items (more content now)
-    for i in range(10, row):
-        ws.row_dimensions[i].height = 120
-
-    # Spacing
-    ws.row_dimensions[row].height = 5
-    row += 1
-
-    # MEDIUM PRIORITY Section
-    med_header_fill = PatternFill(start_color="FF9900", end_color="FF9900", fill_type="solid")
-    med_header_font = Font(color="FFFFFF", bold=True, size=12)
-
-    ws.merge_cells(f'A{row}:D{row}')
-    ws[f'A{row}'] = "MEDIUM PRIORITY"
-    ws[f'A{row}'].fill = med_header_fill
-    ws[f'A{row}'].font = med_header_font
-    ws[f'A{row}'].alignment = Alignment(horizontal="center", vertical="center")
-
-    row += 1
-    ws[f'A{row}'] = "Area"
-    ws[f'B{row}'] = "What To Build/Do"
-    ws[f'C{row}'] = "Why It Matters"
-    ws[f'D{row}'] = "Priority"
-
-    for col in range(1, 5):
-        cell = ws.cell(row, col)
-        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    row += 1
-    medium_priority = [
-        ["Performance Tracking", "Track Boost & Featured Placement results", "Need data to prove these upgrades work", "MEDIUM"],
-        ["Instant Payout Cap", "Implement 1.5% with $15 max", "Makes instant payout attractive for large payouts", "MEDIUM"],
-        ["Annual Subscription", "Offer $190/year option", "Locks in committed hosts, improves predictability", "MEDIUM"],
-        ["Tiered Boost Options", "$10/3d, $15/7d, $25/14d", "Flexibility for different event timelines", "MEDIUM"]
-    ]
+def create_scenario_sweep_tab(ws, data=None):
+    """Create the Scenario Sweep tab: every platform's costs over a price x volume x plan grid"""
+    if data is None:
+        data = load_dataset()
+    render_sheet(ws, scenario_sweep_sheet(data), data)
 
-    for item in medium_priority:
-        ws[f'A{row}'] = item[0]
-        ws[f'B{row}'] = item[1]
-        ws[f'C{row}'] = item[2]
-        ws[f'D{row}'] = item[3]
-
-        for col in range(1, 5):
-            cell = ws.cell(row, col)
-            cell.alignment = Alignment(vertical="top", wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
 
-        row += 1
+def create_referral_simulation_tab(ws, data=None):
+    """Create the Referral Simulation tab: Monte Carlo payout and revenue distributions of the ambassador program"""
+    render_sheet(ws, REFERRAL_SIMULATION_SHEET, data)
 
-    # Spacing
-    ws.row_dimensions[row].height = 5
-    row += 1
-
-    # LOW PRIORITY Section
-    low_header_fill = PatternFill(start_color="70AD47", end_color="70AD47", fill_type="solid")
-    low_header_font = Font(color="FFFFFF", bold=True, size=12)
-
-    ws.merge_cells(f'A{row}:D{row}')
-    ws[f'A{row}'] = "LOW PRIORITY"
-    ws[f'A{row}'].fill = low_header_fill
-    ws[f'A{row}'].font = low_header_font
-    ws[f'A{row}'].alignment = Alignment(horizontal="center", vertical="center")
-
-    row += 1
-    ws[f'A{row}'] = "Area"
-    ws[f'B{row}'] = "What To Build/Do"
-    ws[f'C{row}'] = "Why It Matters"
-    ws[f'D{row}'] = "Priority"
-
-    for col in range(1, 5):
-        cell = ws.cell(row, col)
-        cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    row += 1
-    low_priority = [
-        ["Enterprise Compliance", "Approval workflows, audit trails, SIS integration", "Required for university sales", "LOW"],
-        ["Leaderboards", "Show top ambassadors", "Creates competition, shows what's possible", "LOW"]
-    ]
 
-    for item in low_priority:
-        ws[f'A{row}'] = item[0]
-        ws[f'B{row}'] = item[1]
-        ws[f'C{row}'] = item[2]
-        ws[f'D{row}'] = item[3]
-
-        for col in range(1, 5):
-            cell = ws.cell(row, col)
-            cell.alignment = Alignment(vertical="top", wrap_text=True)
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
+def create_matching_performance_tab(ws, data=None):
+    """Create the Matching Performance tab: measured sponsor-host matching throughput and latency"""
+    render_sheet(ws, MATCHING_PERFORMANCE_SHEET, data)
+
+
+def create_live_kpis_tab(ws, data=None):
+    """Create the Live KPIs tab: the dashboard's logged metrics over the latest week, month and all time"""
+    render_sheet(ws, LIVE_KPIS_SHEET, data)
 
-        row += 1
 
-    # Set column widths
-    ws.column_dimensions['A'].width = 25
-    ws.column_dimensions['B'].width = 40
-    ws.column_dimensions['C'].width = 45
-    ws.column_dimensions['D'].width = 12
+def create_assumptions_tab(ws, data=None):
+    """Create the Assumptions tab: the named inputs the revenue tabs' formulas use"""
+    render_sheet(ws, ASSUMPTIONS_SHEET, data)
+
+
+def create_action_items_tab(ws, data=None):
+    """Create Tab 5: Action Items"""
+    render_sheet(ws, ACTION_ITEMS_SHEET, data)
+
+
+# Workbook tabs in order: (sheet title, builder, spec or function of the dataset returning one)
+TABS = [
+    ("Revenue Streams", create_revenue_streams_tab, REVENUE_STREAMS_SHEET),
+    ("Quick Comparison", create_quick_comparison_tab, QUICK_COMPARISON_SHEET),
+    ("Feature Matrix", create_feature_matrix_tab, feature_matrix_sheet),
+    ("Core Differentiators", create_core_differentiators_tab, CORE_DIFFERENTIATORS_SHEET),
+    ("Revenue Summary", create_revenue_summary_tab, REVENUE_SUMMARY_SHEET),
+    ("Fee Breakdown", create_fee_breakdown_tab, FEE_BREAKDOWN_SHEET),
+    ("Scenario Sweep", create_scenario_sweep_tab, scenario_sweep_sheet),
+    ("Referral Simulation", create_referral_simulation_tab, REFERRAL_SIMULATION_SHEET),
+    ("Matching Performance", create_matching_performance_tab, MATCHING_PERFORMANCE_SHEET),
+    ("Live KPIs", create_live_kpis_tab, LIVE_KPIS_SHEET),
+    ("Action Items", create_action_items_tab, ACTION_ITEMS_SHEET),
+    ("Assumptions", create_assumptions_tab, ASSUMPTIONS_SHEET),
+]
+
+# Characters Excel doesn't allow in sheet titles, which are at most 31 long
+SHEET_TITLE_FORBIDDEN = re.compile(r"[\[\]:*?/\\]")
+SHEET_TITLE_LENGTH = 31
+
+
+def head_to_head_tabs(data):
+    """(title, builder, spec) of a "vs <rival>" tab for every competitor after the first"""
+    tabs = []
+    for rival in data.feature_matrix.competitors[1:]:
+        title = SHEET_TITLE_FORBIDDEN.sub("-", f"vs {rival}")[:SHEET_TITLE_LENGTH]
+        tabs.append((title, functools.partial(create_head_to_head_tab, rival),
+                     functools.partial(head_to_head_sheet, rival)))
+    # Excel compares sheet titles ignoring case
+    seen, duplicates = set(), []
+    for title, _, _ in TABS + tabs:
+        if title.lower() in seen:
+            duplicates.append(title)
+        seen.add(title.lower())
+    if duplicates:
+        raise ValueError(f"competitor names give duplicate sheet titles: {', '.join(duplicates)}")
+    return tabs
+
+
+def workbook_tabs(data):
+    """TABS followed by the head-to-head tabs of the dataset's competitors"""
+    return TABS + head_to_head_tabs(data)
 
 
 if __name__ == "__main__":
-    create_competitor_comparison()
+    parser = argparse.ArgumentParser(description="Generate the SponsorSynq competitor comparison workbook")
+    parser.add_argument("--write-only", action="store_true",
+                        help="stream rows to disk with openpyxl write-only worksheets")
+    parser.add_argument("--backend", choices=BACKENDS, default="openpyxl",
+                        help="library that writes the workbook (default: openpyxl)")
+    parser.add_argument("--check-backends", action="store_true",
+                        help="build with every backend in memory and report any differences in the output")
+    parser.add_argument("--compare-memory", action="store_true",
+                        help="build in both modes and report peak memory")
+    parser.add_argument("--dataset", metavar="DIR",
+                        help="dataset directory (default: data/competitor_comparison)")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild even if the manifest says the output is up to date")
+    parser.add_argument("--cached-values", action="store_true",
+                        help="store computed results with the formulas for viewers that don't recalculate")
+    parser.add_argument("--reproducible", action="store_true", default=None,
+                        help="fixed timestamps, entry order and compression, so the same inputs give the same "
+                             "bytes (or set SOURCE_DATE_EPOCH)")
+    parser.add_argument("--save-workers", type=int, metavar="N",
+                        help="serialize the sheets in N worker processes when saving (openpyxl standard mode)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each build phase and write a profile report next to the output "
+                             "(or set SPONSORSYNQ_PROFILE=1)")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="like --profile, plus a cProfile dump")
+    parser.add_argument("--export", metavar="FORMATS",
+                        help=f"also export the tabs, concurrently with the workbook; "
+                             f"comma-separated list of {', '.join(FORMATS)}")
+    parser.add_argument("--export-dir", default=".",
+                        help="where --export writes its files (default: current directory)")
+    parser.add_argument("--report", metavar="FORMATS",
+                        help=f"also write the tabs as reports in the same build; "
+                             f"comma-separated list of {', '.join(REPORT_FORMATS)}")
+    parser.add_argument("--report-dir", default=".",
+                        help="where --report writes its files (default: current directory)")
+    parser.add_argument("--variants", metavar="FILE",
+                        help="JSON list of variant configs to build in parallel")
+    parser.add_argument("--output-dir", default=".",
+                        help="where --variants writes its workbooks (default: current directory)")
+    parser.add_argument("--jobs", type=int,
+                        help="worker processes for --variants (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.check_backends:
+        sys.exit(0 if check_backends(args.dataset) else 1)
+    elif args.compare_memory:
+        compare_memory()
+    elif args.variants:
+        with open(args.variants, encoding="utf-8") as f:
+            variants = json.load(f)
+        # Dataset paths in the variants file are relative to the file
+        base = os.path.dirname(os.path.abspath(args.variants))
+        for variant in variants:
+            if variant.get("dataset"):
+                variant["dataset"] = os.path.join(base, variant["dataset"])
+        build_variants(variants, args.output_dir, max_workers=args.jobs, force=args.force)
+    elif args.export:
+        formats = [fmt.strip() for fmt in args.export.split(",") if fmt.strip()]
+        for path in export_outputs(formats, args.export_dir, write_only=args.write_only, dataset=args.dataset,
+                                   force=args.force, cached_values=args.cached_values, backend=args.backend,
+                                   reproducible=args.reproducible):
+            print(f"✓ Wrote {path}")
+    else:
+        profile = "cprofile" if args.cprofile else "phases" if args.profile else None
+        reports = [fmt.strip() for fmt in (args.report or "").split(",") if fmt.strip()]
+        create_competitor_comparison(write_only=args.write_only, dataset=args.dataset, force=args.force,
+                                     cached_values=args.cached_values, profile=profile, backend=args.backend,
+                                     reproducible=args.reproducible, save_workers=args.save_workers,
+                                     reports=reports, report_dir=args.report_dir)
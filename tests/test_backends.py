@@ -0,0 +1,56 @@
+import copy
+import functools
+
+import pytest
+
+import create_competitor_comparison as generator
+from comparison import fidelity
+
+pytest.importorskip("xlsxwriter")
+
+
+@pytest.fixture(scope="module")
+def build():
+    return functools.partial(generator.backend_check_bytes, generator.load_dataset())
+
+
+@pytest.fixture(scope="module")
+def reference(build):
+    return fidelity.summarize(build("openpyxl"))
+
+
+@pytest.fixture(scope="module")
+def results(build):
+    return fidelity.check_backends(build, generator.BACKEND_CHECKS)
+
+
+def test_every_backend_is_checked(results):
+    assert set(results) == set(generator.BACKEND_CHECKS) - {"openpyxl"}
+
+
+@pytest.mark.parametrize("label", sorted(set(generator.BACKEND_CHECKS) - {"openpyxl"}))
+def test_backend_matches_openpyxl(results, label):
+    assert results[label] == []
+
+
+def test_summary_covers_merges_and_formatting(reference):
+    # The checks above only mean something if the summary sees what can go wrong
+    action_items = reference["sheets"]["Action Items"]
+    assert action_items["merged"]
+    cells = [cell for sheet in reference["sheets"].values() for cell in sheet["cells"].values()]
+    assert any(cell["fill"] for cell in cells)
+    assert any(cell["font"][2] for cell in cells)
+    assert any(any(cell["border"]) for cell in cells)
+
+
+def test_diff_reports_merges_fills_fonts_and_borders(reference):
+    sheet = reference["sheets"]["Action Items"]
+    ref = next(ref for ref, cell in sheet["cells"].items() if cell["fill"] and any(cell["border"]))
+    changed = copy.deepcopy(reference)
+    other = changed["sheets"]["Action Items"]
+    other["merged"] = other["merged"][1:]
+    other["cells"][ref].update(fill=None, font=("Arial", 9, False, False, None), border=(None,) * 4)
+    problems = fidelity.diff(reference, changed)
+    assert any(problem.startswith("Action Items: merged") for problem in problems)
+    for key in ("fill", "font", "border"):
+        assert any(problem.startswith(f"Action Items!{ref}: {key}:") for problem in problems)
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from comparison import bench
+
+
+def results(seconds, stdev, peak_kib=1000.0):
+    result = {"seconds": seconds, "seconds_stdev": stdev, "peak_kib": peak_kib}
+    return {"load": dict(result), "save": dict(result), "tabs": {}, "scaling": {}}
+
+
+def regressed(current, baseline):
+    return sorted(name for name, _, _ in bench.compare(current, baseline, 0.25))
+
+
+def test_slowdowns_within_the_noise_are_not_regressions():
+    # Over the tolerance, but under NOISE_FLOOR
+    assert regressed(results(0.03, 0.0), results(0.015, 0.0)) == []
+    # Over the tolerance and the floor, but within the spread of the runs
+    assert regressed(results(0.5, 0.1), results(0.3, 0.01)) == []
+    assert regressed(results(0.5, 0.01), results(0.3, 0.01)) == ["load/seconds", "save/seconds"]
+
+
+def test_baselines_without_the_spread_still_compare():
+    baseline = results(0.3, 0.0)
+    for section in ("load", "save"):
+        del baseline[section]["seconds_stdev"]
+    assert regressed(results(0.5, 0.01), baseline) == ["load/seconds", "save/seconds"]
+
+
+def test_change_from_a_zero_baseline_is_absolute():
+    assert bench.change(2.0, 3.0) == "+50%"
+    assert bench.change(0, 0.125) == "+0.125"
+    assert bench.change(0.0, 128.0) == "+128.000"
+
+
+def test_baseline_is_committed_at_its_max_rows():
+    with open(bench.BASELINE, encoding="utf-8") as f:
+        baseline = json.load(f)
+    assert baseline["meta"]["max_rows"] == bench.BASELINE_MAX_ROWS
+    assert bench.flatten(baseline)
+
+
+def test_baseline_from_another_max_rows_is_refused(capsys):
+    with pytest.raises(SystemExit):
+        bench.main(["--baseline", "--max-rows", "10"])
+    assert "was taken with --max-rows 1000" in capsys.readouterr().err
@@ -0,0 +1,19 @@
+import json
+import os
+
+import pytest
+
+import create_competitor_comparison as generator
+from comparison.dataset_files import dataset_json
+
+# Files the tools write: the importer's tabs, the matching benchmark and the KPI ingest
+WRITTEN_FILES = ["action_items.json", "core_differentiators.json", "live_kpis.json", "matching_performance.json",
+                 "quick_comparison.json", "revenue_streams.json", "revenue_summary.json"]
+
+
+@pytest.mark.parametrize("filename", WRITTEN_FILES)
+def test_written_files_keep_their_layout(filename):
+    with open(os.path.join(generator.DEFAULT_DATASET, filename), encoding="utf-8") as f:
+        text = f.read()
+    assert dataset_json(json.loads(text)) == text
+
@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+import create_competitor_comparison as generator
+from comparison.export import COLUMNAR_FORMATS, export_model, table_file_name, write_columnar, write_json
+
+
+@pytest.fixture(scope="module")
+def model():
+    data = generator.load_dataset()
+    return export_model(generator.tab_specs(data), data)
+
+
+def model_tables(model):
+    return [section for tab in model["tabs"] for section in tab["sections"] if "table" in section]
+
+
+def test_table_file_name_flattens_parameterized_tables():
+    assert table_file_name("streams") == "streams"
+    assert table_file_name("head_to_head/Eventbrite") == "head_to_head__Eventbrite"
+    assert table_file_name('head_to_head/A:B*"C"') == "head_to_head__A_B__C_"
+
+
+@pytest.mark.parametrize("fmt", sorted(COLUMNAR_FORMATS))
+def test_columnar_export_writes_every_table(model, fmt, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    paths = write_columnar(model, str(tmp_path), fmt)
+
+    tables = model_tables(model)
+    assert len(paths) == len(tables)
+    for section, path in zip(tables, paths):
+        assert os.path.dirname(path) == str(tmp_path)
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            table = pq.read_table(path)
+        else:
+            with pa.memory_map(path) as source:
+                table = pa.ipc.open_file(source).read_all()
+        assert table.column_names == section["columns"]
+        assert table.num_rows == len(section["rows"])
+
+
+def test_json_export_round_trips(model, tmp_path):
+    path = write_json(model, str(tmp_path / "model.json"))
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == json.loads(json.dumps(model))
@@ -0,0 +1,48 @@
+import json
+import math
+import shutil
+
+import pytest
+
+import create_competitor_comparison as generator
+from comparison.export import export_model, write_columnar
+from comparison.feature_matrix import FeatureMatrix
+
+
+def test_ranks_and_leaders():
+    matrix = FeatureMatrix(["Us", "Them", "Others"], ["Fees", "Payouts"], [
+        ("Fees", "Us", "Low", 3), ("Fees", "Them", "High", 1), ("Fees", "Others", "Low", 3),
+        ("Payouts", "Them", "Instant", 2),
+    ])
+    assert matrix.leader_names() == [["Us", "Others"], ["Them"]]
+    assert matrix.outcomes("Us") == ["tie", "loss"]
+    assert matrix.wins.tolist() == [1, 1, 1]
+    assert matrix.outright_wins.tolist() == [0, 1, 0]
+    assert matrix.get("Them", "Fees") == ("High", 1.0, 3)
+    assert matrix.get("Us", "Payouts") is None
+    features, outcomes = matrix.head_to_head("Us", "Them")
+    assert features.tolist() == [0, 1] and outcomes.tolist() == [1, -1]
+
+
+def test_rejects_a_pair_rated_twice():
+    with pytest.raises(ValueError, match="rated twice"):
+        FeatureMatrix(["Us"], ["Fees"], [("Fees", "Us", "Low", 3), ("Fees", "Us", "High", 1)])
+
+
+def test_unrated_competitor_exports(tmp_path):
+    """A competitor without ratings has no average rank: a blank cell, and still a numeric column"""
+    dataset = tmp_path / "dataset"
+    shutil.copytree(generator.DEFAULT_DATASET, dataset)
+    path = dataset / "feature_matrix.json"
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    doc["competitors"].append(["Newcomer", "Not rated yet"])
+    path.write_text(json.dumps(doc), encoding="utf-8")
+
+    data = generator.Dataset(str(dataset))
+    totals = {row.feature: row for row in data["feature_matrix_totals"]}
+    newcomer = len(doc["competitors"]) - 1
+    assert totals["Average rank"][f"competitor_{newcomer}"] is None
+    assert not math.isnan(totals["Average rank"]["competitor_0"])
+
+    pytest.importorskip("pyarrow")
+    write_columnar(export_model(generator.tab_specs(data), data), str(tmp_path / "out"), "parquet")
@@ -0,0 +1,20 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+import create_competitor_comparison as generator
+
+
+def test_compare_memory_leaves_the_current_directory_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    results = generator.compare_memory()
+    assert set(results) == {False, True}
+    assert os.listdir(tmp_path) == []
+
+
+def test_referral_notes_without_referred_revenue():
+    data = generator.load_dataset()
+    results = {name: np.zeros_like(column) for name, column in data.referrals.items()}
+    notes = generator.referral_notes_rows(SimpleNamespace(referral_settings=data.referral_settings, referrals=results))
+    assert "payouts cost n/a of the revenue" in notes[2].text
@@ -0,0 +1,50 @@
+import shutil
+
+import openpyxl
+import pytest
+
+import create_competitor_comparison as generator
+from comparison import importer
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "dataset"
+    shutil.copytree(generator.DEFAULT_DATASET, path)
+    return generator.load_dataset(str(path))
+
+
+def build(data, path):
+    generator.create_competitor_comparison(dataset=data, output=str(path), quiet=True, profile=False)
+    return str(path)
+
+
+def changes(data, path):
+    imported, warnings = importer.import_workbook(path, data)
+    assert warnings == []
+    return imported, importer.diff(importer.raw_tables(data), imported, importer.field_names(data))
+
+
+def test_unedited_workbook_imports_without_changes(dataset, tmp_path):
+    _, found = changes(dataset, build(dataset, tmp_path / "built.xlsx"))
+    assert found == []
+
+
+def test_edited_cell_round_trips_through_the_dataset(dataset, tmp_path):
+    path = build(dataset, tmp_path / "built.xlsx")
+    first = dataset["comparisons"][0]
+    wb = openpyxl.load_workbook(path)
+    cell = next(cell for row in wb["Quick Comparison"].iter_rows() for cell in row if cell.value == first.eventbrite)
+    cell.value = "~7% + $1.99"
+    wb.save(path)
+
+    imported, found = changes(dataset, path)
+    assert [(change["table"], change["change"], change["key"], change["new"]) for change in found] == [
+        ("comparisons", "changed", first.feature, "~7% + $1.99")
+    ]
+
+    importer.apply(dataset, imported)
+    data = generator.Dataset(dataset.path)
+    assert data["comparisons"][0].eventbrite == "~7% + $1.99"
+    _, found = changes(data, build(data, tmp_path / "rebuilt.xlsx"))
+    assert found == []
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import pytest
+
+import create_competitor_comparison as generator
+from comparison.manifest import manifest_path, read_manifest
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    path = str(tmp_path / "dataset")
+    shutil.copytree(generator.DEFAULT_DATASET, path)
+    return path
+
+
+def build(dataset, output, **options):
+    return generator.create_competitor_comparison(dataset=dataset, output=output, quiet=True, profile=False, **options)
+
+
+def test_unchanged_inputs_skip_the_build(dataset, tmp_path):
+    output = str(tmp_path / generator.OUTPUT_FILE)
+    assert build(dataset, output)
+    with open(output, "rb") as f:
+        content = f.read()
+    assert not build(dataset, output)
+    assert not build(generator.Dataset(dataset), output)
+    with open(output, "rb") as f:
+        assert f.read() == content
+    assert build(dataset, output, force=True)
+
+
+def test_edited_table_rebuilds_its_tab(dataset, tmp_path):
+    output = str(tmp_path / generator.OUTPUT_FILE)
+    assert build(dataset, output)
+    tabs = read_manifest(manifest_path(output))["tabs"]
+
+    path = os.path.join(dataset, "quick_comparison.json")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace("~6.6% + $1.79", "~7% + $1.99", 1))
+
+    assert build(generator.Dataset(dataset), output)
+    rebuilt = read_manifest(manifest_path(output))["tabs"]
+    assert [title for title in tabs if tabs[title] != rebuilt.get(title)] == ["Quick Comparison"]
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from comparison import live_metrics
+
+
+def write_export(path, docs):
+    with open(path, "w", encoding="utf-8") as f:
+        for doc in docs:
+            f.write(json.dumps(doc) + "\n")
+    return str(path)
+
+
+def soya(day, **metrics):
+    return {"collection": "soya_metrics", "id": f"uid-soya_{day}", "user_id": "uid-soya", "date": day, **metrics}
+
+
+def test_missing_kpis_are_none(tmp_path):
+    export = write_export(tmp_path / "export.ndjson", [soya("2026-10-01", user_signups=4, revenue_milestone=10.5)])
+    aggregate, _, _ = live_metrics.ingest(export)
+    rows = {row["kpi"]: row for row in live_metrics.kpi_rows(aggregate)}
+
+    assert rows["User signups"]["last_week"] == 4
+    # No earlier week to compare with, and no outreach documents at all
+    assert rows["User signups"]["previous_week"] == 0
+    assert rows["User signups"]["change"] is None
+    assert rows["Outreach to meeting rate"]["all_time"] is None
+
+    # Every column is numbers or None, which the columnar exports need
+    pa = pytest.importorskip("pyarrow")
+    pa.table({key: [row[key] for row in rows.values()] for key in next(iter(rows.values()))})
+
+
+def test_resumed_ingestion_matches_a_full_read(tmp_path):
+    """Split the fixture anywhere: a run resumed from the checkpoint gives exactly the full read's KPIs"""
+    with open(live_metrics.FIXTURE, encoding="utf-8") as f:
+        lines = f.readlines()
+    full, _, _ = live_metrics.ingest(live_metrics.FIXTURE, str(tmp_path / "full.checkpoint.json"), resume=False)
+    expected = live_metrics.kpi_rows(full)
+
+    export = tmp_path / "export.ndjson"
+    checkpoint = str(tmp_path / "export.checkpoint.json")
+    for split in range(len(lines) + 1):
+        export.write_text("".join(lines[:split]), encoding="utf-8")
+        live_metrics.ingest(str(export), checkpoint, resume=False)
+        export.write_text("".join(lines), encoding="utf-8")
+        resumed, start, _ = live_metrics.ingest(str(export), checkpoint)
+        assert start == len("".join(lines[:split]).encode("utf-8"))
+        assert live_metrics.kpi_rows(resumed) == expected
+        assert resumed.days == full.days
+
+
+def test_bundled_kpis_match_the_fixture(tmp_path):
+    aggregate, _, _ = live_metrics.ingest(live_metrics.FIXTURE, str(tmp_path / "checkpoint.json"), resume=False)
+    with open(f"{live_metrics.generator.DEFAULT_DATASET}/{live_metrics.RESULTS_FILE}", encoding="utf-8") as f:
+        assert json.load(f)["live_kpis"] == live_metrics.kpi_rows(aggregate)
+
+
+def test_rewritten_export_is_read_from_the_start(tmp_path):
+    export = tmp_path / "export.ndjson"
+    write_export(export, [soya("2026-10-01", user_signups=4), soya("2026-10-02", user_signups=5)])
+    live_metrics.ingest(str(export))
+    write_export(export, [soya("2026-10-01", user_signups=1)])
+    aggregate, start, records = live_metrics.ingest(str(export))
+    assert (start, records) == (0, 1)
+    assert aggregate.total("soya_metrics", "user_signups") == [1, 1]
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import pytest
+
+import create_competitor_comparison as generator
+from comparison.manifest import build_options, manifest_path, stale_reason
+
+
+@pytest.fixture
+def built(tmp_path, monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    dataset = str(tmp_path / "dataset")
+    shutil.copytree(generator.DEFAULT_DATASET, dataset)
+    output = str(tmp_path / generator.OUTPUT_FILE)
+    generator.create_competitor_comparison(dataset=generator.Dataset(dataset), output=output, quiet=True,
+                                           profile=False)
+    return output, dataset
+
+
+def test_fresh_build_is_up_to_date(built):
+    output, dataset = built
+    assert stale_reason(output, dataset, build_options()) is None
+    assert stale_reason(output, dataset, build_options(backend="xlsxwriter")) == "inputs changed"
+
+
+def test_edited_workbook_is_stale(built):
+    output, dataset = built
+    with open(output, "ab") as f:
+        f.write(b"\0")
+    assert stale_reason(output, dataset, build_options()) == "workbook modified since it was built"
+
+
+def test_edited_dataset_is_stale(built):
+    output, dataset = built
+    path = os.path.join(dataset, sorted(name for name in os.listdir(dataset) if name.endswith(".json"))[0])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert stale_reason(output, dataset, build_options()) == "inputs changed"
+
+
+def test_missing_files_are_stale(built):
+    output, dataset = built
+    os.remove(output)
+    assert stale_reason(output, dataset, build_options()) == "no workbook"
+    os.remove(manifest_path(output))
+    assert stale_reason(output, dataset, build_options()) == "no manifest"
@@ -0,0 +1,25 @@
+import create_competitor_comparison as generator
+from comparison.reproducible import reproducible_bytes
+
+
+def test_reproducible_builds_are_byte_identical(tmp_path, monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    data = generator.load_dataset()
+    content = generator.workbook_bytes(data, reproducible=True)
+    assert generator.workbook_bytes(data, reproducible=True) == content
+    assert reproducible_bytes(generator.workbook_bytes(data)) == content
+
+    # Saved to a file, the same bytes as in memory
+    output = str(tmp_path / generator.OUTPUT_FILE)
+    generator.create_competitor_comparison(dataset=data, output=output, quiet=True, profile=False, reproducible=True)
+    with open(output, "rb") as f:
+        assert f.read() == content
+
+
+def test_source_date_epoch_sets_the_timestamp(monkeypatch):
+    data = generator.load_dataset()
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    content = generator.workbook_bytes(data, reproducible=True)
+    assert content == generator.workbook_bytes(data, reproducible=True)
+    monkeypatch.delenv("SOURCE_DATE_EPOCH")
+    assert content != generator.workbook_bytes(data, reproducible=True)
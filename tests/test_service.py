@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import create_competitor_comparison as generator
+from comparison import layout
+from comparison.service import GeneratorService
+
+
+def test_concurrent_builds_share_a_dataset_and_the_wrap_cache(monkeypatch):
+    # A tiny cache is cleared over and over while other builds read it
+    monkeypatch.setattr(layout, "WRAP_CACHE_SIZE", 8)
+    data = generator.Dataset()
+    expected = generator.workbook_bytes(generator.Dataset(), reproducible=True)
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: generator.workbook_bytes(data, reproducible=True), range(8)))
+    assert results == [expected] * len(results)
+
+
+def test_service_coalesces_concurrent_requests():
+    service = GeneratorService(cache_size=4)
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: service.export_json({}), range(8)))
+    assert len(set(results)) == 1
+    stats = service.cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] + stats["coalesced"] == 7